@@ -0,0 +1,271 @@
+"""
+Offline benchmarks on a synthetic universe.
+
+Times the indicator, screener, backtest screener and simulator hot paths
+on deterministic synthetic bars and appends one JSON line per benchmark
+(wall time, peak traced memory, scale, commit) to --out, so runs from
+different commits can be compared with --compare.
+
+    python benchmarks/run_benchmarks.py --tickers 3000 --out bench.jsonl
+    python benchmarks/run_benchmarks.py --tickers 10000 --only indicators_panel screen_snapshot
+    python benchmarks/run_benchmarks.py --tickers 3000 --compare bench.jsonl
+"""
+
+import os
+import json
+import time
+import argparse
+import platform
+import subprocess
+import contextlib
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from continuation_screener.data.synthetic import SyntheticProvider, synthetic_daily, synthetic_intraday, synthetic_tickers
+from continuation_screener.data.indicators import add_emas, add_atr, add_rsi, panel_indicators
+from continuation_screener.data.intraday_bt import prepare_daily, prepare_intraday
+from continuation_screener.data.regime import regime_mask
+from continuation_screener.screener.run_screener import run_screener, screen_snapshot
+from continuation_screener.screener.run_screener_bt import screen_history
+from continuation_screener.simulator.backtester_oneday import backtest_windows, simulate_trade
+from continuation_screener.simulator.batch import simulate_batch
+
+AS_OF = pd.Timestamp('2024-06-28')
+LOOKBACK = pd.Timedelta(days=350)
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+
+class Context:
+    """
+    Lazily built inputs shared by the benchmarks. Building them is
+    never part of a timed run.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.provider = SyntheticProvider(args.tickers, seed=args.seed)
+        self._cache = {}
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    @property
+    def as_of(self):
+        def build():
+            mask = regime_mask(AS_OF - pd.Timedelta(days=120), AS_OF, provider=self.provider)
+            return mask[mask].index[-1] if mask.any() else AS_OF
+        return self._get('as_of', build)
+
+    @property
+    def panel(self):
+        return self._get('panel', lambda: synthetic_daily(
+            self.provider.tickers, self.as_of - LOOKBACK, self.as_of + pd.Timedelta(days=1), seed=self.args.seed))
+
+    @property
+    def compact_panel(self):
+        return self._get('compact_panel', lambda: synthetic_daily(
+            self.provider.tickers, self.as_of - LOOKBACK, self.as_of + pd.Timedelta(days=1), seed=self.args.seed, compact=True))
+
+    @property
+    def history(self):
+        start = self.bt_start - LOOKBACK
+        return self._get('history', lambda: synthetic_daily(
+            self.provider.tickers, start, self.as_of + pd.Timedelta(days=1), seed=self.args.seed))
+
+    @property
+    def bt_start(self):
+        return self.as_of - pd.offsets.BDay(self.args.bt_days - 1)
+
+    @property
+    def frames(self):
+        return self._get('frames', lambda: [
+            self.panel.xs(ticker, axis=1, level=1)[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+            for ticker in self.provider.tickers[:self.args.per_ticker]
+            ])
+
+    @property
+    def candidates(self):
+        def build():
+            eval_date = self.as_of - pd.offsets.BDay(10)
+            (daily_start, daily_end), (intraday_start, intraday_end) = backtest_windows(eval_date)
+
+            tickers = synthetic_tickers(self.args.candidates)
+            daily = synthetic_daily(tickers, daily_start, daily_end, seed=self.args.seed)
+
+            daily_frames, intraday_frames = [], []
+            for ticker in tickers:
+                daily_frames.append(prepare_daily(daily.xs(ticker, axis=1, level=1).copy()))
+                raw = synthetic_intraday(ticker, intraday_start - pd.Timedelta(days=5), intraday_end, seed=self.args.seed)
+                intraday_frames.append(prepare_intraday(raw, intraday_start))
+
+            return tickers, daily_frames, intraday_frames
+        return self._get('candidates', build)
+
+@benchmark('indicators_per_ticker')
+def bench_indicators_per_ticker(ctx):
+    frames = ctx.frames
+    def run():
+        for df in frames:
+            add_rsi(add_atr(add_emas(df)))
+    return run, {'items': len(frames)}
+
+@benchmark('indicators_panel')
+def bench_indicators_panel(ctx):
+    panel = ctx.panel
+    return lambda: panel_indicators(panel), {'items': ctx.args.tickers}
+
+@benchmark('screen_snapshot')
+def bench_screen_snapshot(ctx):
+    panel = ctx.panel
+    return lambda: screen_snapshot(panel), {'items': ctx.args.tickers}
+
+@benchmark('screen_snapshot_compact')
+def bench_screen_snapshot_compact(ctx):
+    panel = ctx.compact_panel
+    return lambda: screen_snapshot(panel), {'items': ctx.args.tickers}
+
+@benchmark('run_screener')
+def bench_run_screener(ctx):
+    as_of, provider = ctx.as_of, ctx.provider
+    def run():
+        with quiet():
+            run_screener(as_of, provider=provider)
+    return run, {'items': ctx.args.tickers}
+
+@benchmark('screen_history')
+def bench_screen_history(ctx):
+    history, start, end = ctx.history, ctx.bt_start, ctx.as_of
+    return lambda: screen_history(history, start, end), {'items': ctx.args.tickers * ctx.args.bt_days}
+
+@benchmark('entry_exits')
+def bench_entry_exits(ctx):
+    tickers, daily_frames, intraday_frames = ctx.candidates
+    def run():
+        for ticker, daily_df, intraday_df in zip(tickers, daily_frames, intraday_frames):
+            simulate_trade(ticker, daily_df, intraday_df)
+    return run, {'items': len(tickers)}
+
+@benchmark('simulate_batch')
+def bench_simulate_batch(ctx):
+    tickers, daily_frames, intraday_frames = ctx.candidates
+    return lambda: simulate_batch(tickers, daily_frames, intraday_frames), {'items': len(tickers)}
+
+def measure(run, repeat):
+    """
+    Best and mean wall time over repeat runs, then the peak traced
+    memory of one more run (tracing slows the code, so it is not timed).
+    """
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(times), sum(times) / len(times), peak
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline_path):
+    """
+    Prints each result against the latest baseline record of the same
+    benchmark at the same scale.
+    """
+
+    baseline = {}
+    with open(baseline_path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                baseline[(record['benchmark'], record['tickers'], record['days'], record.get('items'))] = record
+
+    print(f'{"benchmark":<26}{"base s":>10}{"now s":>10}{"ratio":>8}{"base MB":>10}{"now MB":>10}')
+    for record in results:
+        base = baseline.get((record['benchmark'], record['tickers'], record['days'], record.get('items')))
+        if base is None:
+            print(f'{record["benchmark"]:<26}{"-":>10}{record["seconds"]:>10.3f}{"-":>8}{"-":>10}{record["peak_mb"]:>10.1f}')
+            continue
+        ratio = record['seconds'] / base['seconds'] if base['seconds'] else float('nan')
+        print(f'{record["benchmark"]:<26}{base["seconds"]:>10.3f}{record["seconds"]:>10.3f}{ratio:>8.2f}{base["peak_mb"]:>10.1f}{record["peak_mb"]:>10.1f}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline synthetic-universe benchmarks.')
+    parser.add_argument('--tickers', type=int, default=3000, help='synthetic universe size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--bt-days', type=int, default=20, help='days of rolling backtest evaluation')
+    parser.add_argument('--per-ticker', type=int, default=500, help='tickers run through the per-ticker indicator loop')
+    parser.add_argument('--candidates', type=int, default=500, help='candidates run through entry/exits')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='benchmarks to run (default all)')
+    parser.add_argument('--out', help='JSON lines file to append results to')
+    parser.add_argument('--compare', help='JSON lines file of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    ctx = Context(args)
+    meta = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        run, extra = BENCHMARKS[name](ctx)
+        seconds, mean_seconds, peak = measure(run, args.repeat)
+
+        record = {
+            'benchmark': name,
+            'tickers': args.tickers,
+            'days': len(ctx.panel),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'seconds': round(seconds, 6),
+            'mean_seconds': round(mean_seconds, 6),
+            'peak_mb': round(peak / 2**20, 3),
+            **extra,
+            **meta,
+        }
+        results.append(record)
+
+        line = json.dumps(record)
+        print(line)
+        if args.out:
+            with open(args.out, 'a') as f:
+                f.write(line + '\n')
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return results
+
+if __name__ == '__main__':
+    main()
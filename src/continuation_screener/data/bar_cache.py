@@ -0,0 +1,185 @@
+import threading
+import pandas as pd
+from collections import OrderedDict
+
+class BarCache:
+    """
+    In-memory cache of raw bars keyed by (ticker, interval).
+
+    Each key holds sorted, non-overlapping [start, end) segments that have
+    already been fetched. A request is served from memory where covered and
+    only the uncovered gaps are fetched. Gap fetches reach `pad` into the
+    cached bars on either side, so a gap holding only a market holiday
+    still returns data instead of looking like a failed download. Keys are
+    evicted least recently used first once the cached frames exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, pad=pd.Timedelta(days=5)):
+        self.max_bytes = max_bytes
+        self.pad = pad
+        self._entries = OrderedDict()
+        self._bytes = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.failed_fetches = 0
+        self.evictions = 0
+
+    @property
+    def nbytes(self):
+        return sum(self._bytes.values())
+
+    def stats(self):
+        """
+        Returns hit/miss counters and memory use for sizing the cache.
+        """
+
+        with self._lock:
+            requests = self.hits + self.partial_hits + self.misses
+            return {
+                'requests': requests,
+                'hits': self.hits,
+                'partial_hits': self.partial_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'fetches': self.fetches,
+                'failed_fetches': self.failed_fetches,
+                'evictions': self.evictions,
+                'keys': len(self._entries),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes.clear()
+
+    @staticmethod
+    def _gaps(segments, start, end):
+        gaps = []
+        cursor = start
+        for seg_start, seg_end, _ in segments:
+            if seg_end <= cursor:
+                continue
+            if seg_start >= end:
+                break
+            if seg_start > cursor:
+                gaps.append((cursor, seg_start))
+            cursor = max(cursor, seg_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    @staticmethod
+    def _has_session(start, end):
+        return len(pd.bdate_range(start.normalize(), end - pd.Timedelta(microseconds=1))) > 0
+
+    @staticmethod
+    def _merge(segments):
+        segments = sorted(segments, key=lambda seg: seg[0])
+        merged = []
+        for seg_start, seg_end, df in segments:
+            if merged and seg_start <= merged[-1][1]:
+                prev_start, prev_end, prev_df = merged[-1]
+                frames = [f for f in (prev_df, df) if f is not None and not f.empty]
+                combined = pd.concat(frames) if frames else prev_df
+                if frames:
+                    combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+                merged[-1] = (prev_start, max(prev_end, seg_end), combined)
+            else:
+                merged.append((seg_start, seg_end, df))
+        return merged
+
+    @staticmethod
+    def _window(df, start, end):
+        index = df.index
+        if index.tz is not None and start.tzinfo is None:
+            index = index.tz_localize(None)
+        return df.loc[(index >= start) & (index < end)]
+
+    @staticmethod
+    def _frame_bytes(segments):
+        return int(sum(df.memory_usage(index=True, deep=True).sum() for _, _, df in segments if df is not None))
+
+    def _evict(self, keep):
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            del self._entries[key]
+            del self._bytes[key]
+            self.evictions += 1
+
+    def get(self, ticker, interval, start, end, fetch):
+        """
+        Returns bars for [start, end). fetch(gap_start, gap_end) is called for
+        every uncovered gap and must return a frame, or None on failure.
+        Returns None if any gap failed to download.
+        """
+
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        key = (ticker, interval)
+
+        with self._lock:
+            segments = list(self._entries.get(key, []))
+            gaps = self._gaps(segments, start, end)
+
+            # counters are shared by the prefetch threads
+            if not gaps:
+                self.hits += 1
+            elif len(gaps) == 1 and gaps[0] == (start, end):
+                self.misses += 1
+            else:
+                self.partial_hits += 1
+
+        failed = False
+        for gap_start, gap_end in gaps:
+            if not self._has_session(gap_start, gap_end):
+                segments.append((gap_start, gap_end, None))
+                continue
+
+            follows_cached = any(seg_end == gap_start for _, seg_end, _ in segments)
+            precedes_cached = any(seg_start == gap_end for seg_start, _, _ in segments)
+            fetch_start = gap_start - self.pad if follows_cached else gap_start
+            fetch_end = gap_end + self.pad if precedes_cached else gap_end
+
+            with self._lock:
+                self.fetches += 1
+            df = fetch(fetch_start, fetch_end)
+            if df is None:
+                with self._lock:
+                    self.failed_fetches += 1
+                failed = True
+                continue
+
+            segments.append((gap_start, gap_end, self._window(df, gap_start, gap_end)))
+
+        segments = self._merge(segments)
+
+        with self._lock:
+            self._entries[key] = segments
+            self._entries.move_to_end(key)
+            self._bytes[key] = self._frame_bytes(segments)
+            self._evict(keep=key)
+
+        if failed:
+            return None
+
+        frames = []
+        for seg_start, seg_end, df in segments:
+            if seg_end <= start or seg_start >= end or df is None:
+                continue
+            frames.append(self._window(df, start, end))
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
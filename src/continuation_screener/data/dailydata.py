@@ -1,131 +1,437 @@
-import yfinance as yf
-import logging
 import time
+import queue
+import threading
 import random
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
-logging.getLogger('yfinance').setLevel(logging.CRITICAL)
-logging.getLogger('yfinance.shared').setLevel(logging.CRITICAL)
+from continuation_screener.data.panel import Panel
+from continuation_screener.data.providers import default_provider
+from continuation_screener.utils.metrics import Metrics
 
 def complete(df, min_rows=15):
     """
     Checks if dataframe has enough historical data and no missing values.
     """
-    
+
     return (df is not None and
             not df.empty and
             not df.isna().any().any() and
             len(df) >= min_rows)
 
 
-def get_daily_data(tickers, as_of_date, batch_size=500, retries=3, bt_mode=False):
+def _download_batches(yf_tickers, start_date, end_date, validate, batch_size=500, retries=3, desc='Downloading Russell 3k Chart Data...', provider=None, metrics=None):
     """
-    Downloads historical daily data for a given list of tickers.
-    Uses batching and retry logic to bypass rate limiting issues.
+    The batch, retry and backoff loop shared by the daily downloaders.
+    validate(data, tickers) turns one provider.daily() result into
+    (validated data or None, [incomplete tickers]). Yields (validated, [])
+    for every batch with complete tickers, then (None, [failed tickers])
+    once the retries are done. Every batch is recorded in metrics.
     """
-    
-    as_of_date = pd.to_datetime(as_of_date).normalize()
 
-    lookback = 350
+    if provider is None:
+        provider = default_provider()
 
-    start_date = as_of_date - pd.Timedelta(days=lookback)
+    if metrics is None:
+        metrics = Metrics()
 
-    complete_data = []
     incomplete_data = []
 
-    delay = random.random()
-    retry_delay = delay + 2
+    delay = random.random() if provider.rate_limited else 0
+    retry_delay = delay + 2 if provider.rate_limited else 0
 
-    yf_tickers = [t.replace('.', '-') for t in tickers]
+    def download(batch, threads, retry=False):
+        started = time.perf_counter()
+        data = provider.daily(batch, start_date, end_date, threads=threads)
+        seconds = time.perf_counter() - started
+
+        if data is None or data.empty:
+            validated, failed = None, list(batch)
+        else:
+            validated, failed = validate(data, batch)
+
+        metrics.download_batch(data, len(batch), len(batch) - len(failed), seconds, retry)
+        incomplete_data.extend(failed)
+
+        return validated
 
-    pbar = tqdm(total=len(yf_tickers), desc='Downloading Russell 3k Chart Data...')
+    pbar = tqdm(total=len(yf_tickers), desc=desc)
 
     for i in range(0, len(yf_tickers), batch_size):
-        
+
         batch = yf_tickers[i:i + batch_size]
-        
-        data = yf.download(
-            batch,
-            start=start_date,
-            end=as_of_date + pd.Timedelta(days=1),
-            interval='1d',
-            progress=False,
-            threads=True,
-            auto_adjust=False,
-            back_adjust=False
-            )
 
-        for ticker in batch:
-            
-            pbar.update(1)
-            
-            try:
-                ticker_df = data.xs(ticker, level=1, axis=1)
-            except Exception:
-                incomplete_data.append(ticker)
-                continue
-
-            if complete(ticker_df):
-                ticker_df.columns = pd.MultiIndex.from_product(
-                    [ticker_df.columns, [ticker]]
-                )
-                complete_data.append(ticker_df)
-            else:
-                incomplete_data.append(ticker)
+        validated = download(batch, threads=True)
+        pbar.update(len(batch))
+
+        if validated is not None:
+            yield validated, []
 
         time.sleep(delay)
-    
+
     pbar.close()
 
-    print('Retrying failed tickers...')
+    if incomplete_data:
+        print('Retrying failed tickers...')
 
     retry_batch_count = 50
-    
+
     for i in range(retries):
-        
+
         if not incomplete_data:
             break
 
         retrybatch = incomplete_data[:retry_batch_count]
-        incomplete_data = incomplete_data[retry_batch_count:]
-
-        retrydata = yf.download(
-            retrybatch,
-            start=start_date,
-            end=as_of_date + pd.Timedelta(days=1),
-            interval='1d',
-            progress=False,
-            threads=False,
-            auto_adjust=False,
-            back_adjust=False
-        )
+        del incomplete_data[:retry_batch_count]
+
+        validated = download(retrybatch, threads=False, retry=True)
+
+        if validated is not None:
+            yield validated, []
+
+        time.sleep(retry_delay)
+        retry_delay *= 1.5
+
+    metrics.inc('download_failed_tickers_total', len(incomplete_data))
 
-        if retrydata is None or retrydata.empty:
-            incomplete_data.extend(retrybatch)
-            time.sleep(retry_delay)
+    yield None, list(incomplete_data)
+
+
+def _ticker_frames(data, batch, min_rows=15):
+    complete_data = {}
+    failed = []
+
+    for ticker in batch:
+
+        try:
+            ticker_df = data.xs(ticker, level=1, axis=1)
+        except Exception:
+            failed.append(ticker)
             continue
 
-        for ticker in retrybatch:
+        if complete(ticker_df, min_rows):
+            complete_data[ticker] = ticker_df
+        else:
+            failed.append(ticker)
 
-            try:
-                ticker_df = retrydata.xs(ticker, level=1, axis=1)
-            except Exception:
-                incomplete_data.append(ticker)
-                continue
-
-            if complete(ticker_df):
-                ticker_df.columns = pd.MultiIndex.from_product(
-                    [ticker_df.columns, [ticker]]
-                )
-                complete_data.append(ticker_df)
+    return complete_data or None, failed
+
+
+def iter_download_daily(yf_tickers, start_date, end_date, batch_size=500, retries=3, min_rows=15, desc='Downloading Russell 3k Chart Data...', provider=None, metrics=None):
+    """
+    Downloads daily bars for [start_date, end_date) in batches, yielding
+    ({ticker: df}, [failed tickers]) as each batch is validated.
+    Incomplete tickers are retried at the end with backoff; the last
+    yield carries the tickers that still failed. Every batch is
+    recorded in metrics.
+    """
+
+    batches = _download_batches(
+        yf_tickers, start_date, end_date,
+        lambda data, batch: _ticker_frames(data, batch, min_rows),
+        batch_size, retries, desc, provider, metrics
+        )
+
+    for complete_data, failed in batches:
+        yield complete_data or {}, failed
+
+
+def download_daily(yf_tickers, start_date, end_date, batch_size=500, retries=3, min_rows=15, desc='Downloading Russell 3k Chart Data...', provider=None, metrics=None):
+    """
+    Downloads daily bars for [start_date, end_date) in batches.
+    Uses retry logic with backoff to bypass rate limiting issues.
+    Returns ({ticker: df}, [failed tickers]).
+    """
+
+    complete_data = {}
+    incomplete_data = []
+
+    for batch, failed in iter_download_daily(yf_tickers, start_date, end_date, batch_size, retries, min_rows, desc, provider, metrics):
+        complete_data.update(batch)
+        incomplete_data.extend(failed)
+
+    return complete_data, incomplete_data
+
+
+def download_panel(yf_tickers, start_date, end_date, batch_size=500, retries=3, min_rows=15, desc='Downloading Russell 3k Chart Data...', provider=None, metrics=None):
+    """
+    download_daily into a compact Panel. Every batch result is reshaped
+    into float32 arrays at once and validated with array checks, so no
+    per-ticker frames are created. Returns (Panel, [failed tickers]).
+    """
+
+    def validate(data, batch):
+        panel = Panel.from_yfinance(data)
+        ok = panel.complete(min_rows)
+        passed = set(panel.tickers[ok])
+        return (panel.select(panel.tickers[ok]) if ok.any() else None), [ticker for ticker in batch if ticker not in passed]
+
+    panels = []
+    incomplete_data = []
+
+    for panel, failed in _download_batches(yf_tickers, start_date, end_date, validate, batch_size, retries, desc, provider, metrics):
+        if panel is not None:
+            panels.append(panel)
+        incomplete_data.extend(failed)
+
+    return Panel.concat(panels), incomplete_data
+
+
+def wide_panel(complete_data):
+    """
+    Joins {ticker: df} into one (field, ticker) wide frame.
+    """
+
+    frames = []
+    for ticker, ticker_df in complete_data.items():
+        ticker_df.columns = pd.MultiIndex.from_product(
+            [ticker_df.columns, [ticker]]
+        )
+        frames.append(ticker_df)
+
+    return pd.concat(frames, axis=1)
+
+
+def restated(df, last_bar, rtol=1e-6):
+    """
+    True when df's bar for the date of the stored last_bar is missing or
+    has a different Close or Adj Close, i.e. the provider has adjusted
+    the ticker's past prices (split or dividend) since it was stored.
+    """
+
+    dates = pd.DatetimeIndex(df.index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    rows = df.loc[dates.normalize() == last_bar.name]
+    if rows.empty:
+        return True
+
+    fields = [field for field in ('Close', 'Adj Close') if field in rows.columns and field in last_bar.index]
+    fetched = rows[fields].iloc[-1].to_numpy(dtype=np.float64)
+    stored = last_bar[fields].to_numpy(dtype=np.float64)
+
+    return not np.allclose(fetched, stored, rtol=rtol, atol=0)
+
+
+def update_store(store, yf_tickers, start_date, end_date, batch_size=500, retries=3, provider=None, metrics=None):
+    """
+    Brings the BarStore up to date for [start_date, end_date] (inclusive).
+    Tickers already covered from start_date only fetch the bars from their
+    last stored bar on; new tickers, or requests reaching further back than
+    the stored range, fetch the full range. The re-fetched last bar is
+    compared with the stored one and tickers whose past prices were
+    adjusted since are downloaded again over their whole stored range.
+    A tail holding only a market holiday returns just that last bar and
+    leaves the ticker up to date. Returns tickers that failed to update;
+    a readonly store fetches nothing and returns every ticker it is missing.
+    """
+
+    if metrics is None:
+        metrics = Metrics()
+
+    start_date = pd.to_datetime(start_date).normalize()
+    end_date = pd.to_datetime(end_date).normalize()
+
+    full = []
+    tails = {}
+
+    for ticker in yf_tickers:
+        covered_start, hwm = store.coverage(ticker)
+
+        if covered_start is None or covered_start > start_date:
+            full.append(ticker)
+        elif hwm < end_date and len(pd.bdate_range(hwm + pd.Timedelta(days=1), end_date)):
+            last_bar = store.last_bar(ticker)
+            if last_bar is None:
+                full.append(ticker)
             else:
-                incomplete_data.append(ticker)
+                tails.setdefault(last_bar.name, {})[ticker] = last_bar
 
-        time.sleep(retry_delay)
-        retry_delay *= 1.5
+    if store.readonly:
+        return full + [ticker for group in tails.values() for ticker in group]
+
+    failed = []
+
+    if full:
+        fetched, missing = download_daily(full, start_date, end_date + pd.Timedelta(days=1), batch_size, retries, provider=provider, metrics=metrics)
+        for ticker, df in fetched.items():
+            store.write(ticker, df, start_date, end_date)
+        failed.extend(missing)
+        store.save()
+
+    adjusted = {}
+
+    for last_day, group in tails.items():
+        fetched, missing = download_daily(
+            list(group),
+            last_day,
+            end_date + pd.Timedelta(days=1),
+            batch_size,
+            retries,
+            min_rows=1,
+            desc=f'Updating bars after {last_day.date()}...',
+            provider=provider,
+            metrics=metrics
+            )
+        for ticker, df in fetched.items():
+            if restated(df, group[ticker]):
+                adjusted.setdefault(store.coverage(ticker)[0], []).append(ticker)
+            else:
+                store.append(ticker, df, end_date)
+        failed.extend(missing)
+        store.save()
+
+    if adjusted:
+        count = sum(len(group) for group in adjusted.values())
+        print(f'{count} tickers had their history adjusted, downloading it again.')
+        metrics.inc('store_restated_tickers_total', count)
+
+    for covered_start, group in adjusted.items():
+        fetched, missing = download_daily(group, covered_start, end_date + pd.Timedelta(days=1), batch_size, retries, provider=provider, metrics=metrics)
+        for ticker, df in fetched.items():
+            store.write(ticker, df, covered_start, end_date)
+        failed.extend(missing)
+        store.save()
+
+    return failed
+
+
+def get_daily_data(tickers, as_of_date, batch_size=500, retries=3, bt_mode=False, start_date=None, store=None, provider=None, lookback=350, min_rows=15, compact=False, metrics=None):
+    """
+    Downloads historical daily data for a given list of tickers.
+    Uses batching and retry logic to bypass rate limiting issues.
+    Passing start_date extends the lookback so that every day from
+    start_date onward has a full indicator warm-up. With a BarStore only
+    the bars missing from the store are downloaded. Data comes from
+    provider (yfinance by default). lookback is the warm-up in calendar
+    days; incremental indicator updates only need the new bars, and
+    pass a lower min_rows to accept tickers with only a few of them.
+    compact=True returns a float32 Panel instead of the wide frame.
+    Download batches, retries and failures are recorded in metrics.
+    """
+
+    if metrics is None:
+        metrics = Metrics()
+
+    as_of_date = pd.to_datetime(as_of_date).normalize()
+
+    first_day = as_of_date if start_date is None else min(pd.to_datetime(start_date).normalize(), as_of_date)
+    start_date = first_day - pd.Timedelta(days=lookback)
+
+    yf_tickers = [t.replace('.', '-') for t in tickers]
+
+    if store is not None:
+        failed = update_store(store, yf_tickers, start_date, as_of_date, batch_size, retries, provider, metrics)
+        metrics.set('daily_failed_tickers', len(failed))
+
+        if failed:
+            print(f'{len(failed)} tickers failed to update, using stored bars where available.')
+
+        panel = store.read_panel(yf_tickers, start_date, as_of_date)
+
+        return Panel.from_frame(panel) if compact else panel
+
+    if compact:
+        panel, incomplete_data = download_panel(
+            yf_tickers,
+            start_date,
+            as_of_date + pd.Timedelta(days=1),
+            batch_size,
+            retries,
+            min_rows=min_rows,
+            provider=provider,
+            metrics=metrics
+            )
+
+        metrics.set('daily_failed_tickers', len(incomplete_data))
+
+        if incomplete_data:
+            print(f'{len(incomplete_data)} tickers failed after retries.')
+
+        return panel
+
+    complete_data, incomplete_data = download_daily(
+        yf_tickers,
+        start_date,
+        as_of_date + pd.Timedelta(days=1),
+        batch_size,
+        retries,
+        min_rows=min_rows,
+        provider=provider,
+        metrics=metrics
+        )
+
+    metrics.set('daily_failed_tickers', len(incomplete_data))
 
     if incomplete_data:
         print(f'{len(incomplete_data)} tickers failed after retries.')
 
-    return pd.concat(complete_data, axis=1)
+    return wide_panel(complete_data)
+
+
+def iter_daily_data(tickers, as_of_date, batch_size=500, retries=3, start_date=None, store=None, provider=None, prefetch=2, metrics=None, lookback=350):
+    """
+    Streaming version of get_daily_data. Yields one wide frame per
+    downloaded batch while the next batches download on a background
+    thread. At most prefetch batches wait in memory, so peak memory
+    stays at a few batches rather than the whole universe.
+    With a BarStore the store is updated first and read back in batches.
+    lookback is the warm-up in calendar days, as in get_daily_data.
+    """
+
+    as_of_date = pd.to_datetime(as_of_date).normalize()
+
+    first_day = as_of_date if start_date is None else min(pd.to_datetime(start_date).normalize(), as_of_date)
+    start_date = first_day - pd.Timedelta(days=lookback)
+
+    yf_tickers = [t.replace('.', '-') for t in tickers]
+
+    if store is not None:
+        failed = update_store(store, yf_tickers, start_date, as_of_date, batch_size, retries, provider, metrics)
+
+        if failed:
+            print(f'{len(failed)} tickers failed to update, using stored bars where available.')
+
+        for i in range(0, len(yf_tickers), batch_size):
+            panel = store.read_panel(yf_tickers[i:i + batch_size], start_date, as_of_date)
+            if not panel.empty:
+                yield panel
+        return
+
+    batches = queue.Queue(maxsize=prefetch)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for complete_data, failed in iter_download_daily(
+                    yf_tickers, start_date, as_of_date + pd.Timedelta(days=1), batch_size, retries, provider=provider, metrics=metrics):
+                if failed:
+                    print(f'{len(failed)} tickers failed after retries.')
+                if complete_data:
+                    batches.put(wide_panel(complete_data))
+                if stop.is_set():
+                    return
+            batches.put(done)
+        except Exception as e:
+            batches.put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = batches.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
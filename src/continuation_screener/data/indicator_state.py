@@ -0,0 +1,266 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from continuation_screener.data.indicators import panel_indicators, wilder_averages, ewm_alpha, ewm_step
+from continuation_screener.data.panel import panel_tickers, missing_rows
+
+# bars kept per ticker, enough for every rolling window of the screen
+STATE_TAIL = 20
+STATE_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+STATE_INDICATORS = ('EMA_9', 'EMA_20', 'EMA_50', 'EMA_200', 'TR', 'ATR_14', 'RSI_14')
+
+EMA_ALPHAS = {f'EMA_{period}': ewm_alpha(span=period) for period in (9, 20, 50, 200)}
+ATR_ALPHA = ewm_alpha(span=14)
+RSI_ALPHA = ewm_alpha(alpha=1/14)
+
+class IndicatorState:
+    """
+    Terminal indicator state of every ticker after the last screen.
+
+    For each ticker this keeps the date of its last bar, the number of
+    clean bars seen, Wilder's average gain / loss and the last STATE_TAIL
+    bars of OHLCV and indicators; the last tail row holds the terminal
+    EMAs, ATR and previous close. update() advances the recursions with
+    only the new bars, identical to recomputing over the whole history.
+    """
+
+    def __init__(self, tickers=(), date=None, n_bars=None, avg_gain=None, avg_loss=None, tail=None):
+        self.tickers = pd.Index(tickers, dtype=object)
+        n = len(self.tickers)
+
+        self.date = np.zeros(n, dtype='datetime64[D]') if date is None else np.asarray(date, dtype='datetime64[D]')
+        self.n_bars = np.zeros(n, dtype=np.int64) if n_bars is None else np.asarray(n_bars, dtype=np.int64)
+        self.avg_gain = np.zeros(n) if avg_gain is None else np.asarray(avg_gain, dtype=np.float64)
+        self.avg_loss = np.zeros(n) if avg_loss is None else np.asarray(avg_loss, dtype=np.float64)
+        self.tail = tail if tail is not None else {
+            name: np.zeros((STATE_TAIL, n)) for name in STATE_FIELDS + STATE_INDICATORS
+            }
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self.tickers
+
+    @classmethod
+    def from_panel(cls, panel, ind=None):
+        """
+        Builds state from a full-history wide panel. Only tickers with no
+        missing values and at least STATE_TAIL bars are kept.
+        """
+
+        tickers = panel_tickers(panel)
+
+        if len(panel) < STATE_TAIL:
+            return cls()
+
+        if ind is None:
+            ind = panel_indicators(panel)
+
+        clean = ~missing_rows(panel).any().to_numpy()
+        keep = tickers[clean]
+
+        avg_gain, avg_loss = wilder_averages(panel['Close'])
+
+        tail = {}
+        for name in STATE_FIELDS:
+            tail[name] = np.array(panel[name].reindex(columns=keep).to_numpy(dtype=np.float64)[-STATE_TAIL:])
+        for name in STATE_INDICATORS:
+            tail[name] = np.array(ind[name].reindex(columns=keep).to_numpy(dtype=np.float64)[-STATE_TAIL:])
+
+        last_day = panel.index[-1].normalize().to_datetime64()
+
+        return cls(
+            keep,
+            date=np.full(len(keep), last_day, dtype='datetime64[D]'),
+            n_bars=np.full(len(keep), len(panel)),
+            avg_gain=avg_gain.reindex(columns=keep).to_numpy()[-1],
+            avg_loss=avg_loss.reindex(columns=keep).to_numpy()[-1],
+            tail=tail,
+        )
+
+    @classmethod
+    def load(cls, root):
+        """
+        Reads the state saved under root, or an empty state.
+        """
+
+        path = os.path.join(root, 'indicator_state.npz')
+        if not os.path.exists(path):
+            return cls()
+
+        with np.load(path, allow_pickle=False) as f:
+            tail = {name: f[f'tail_{name}'] for name in STATE_FIELDS + STATE_INDICATORS}
+            return cls(f['tickers'].tolist(), f['date'], f['n_bars'], f['avg_gain'], f['avg_loss'], tail)
+
+    def save(self, root):
+        """
+        Atomically writes the state under root.
+        """
+
+        os.makedirs(root, exist_ok=True)
+
+        arrays = {f'tail_{name}': values for name, values in self.tail.items()}
+        fd, tmp = tempfile.mkstemp(dir=root, suffix='.npz')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(
+                f,
+                tickers=np.asarray(self.tickers, dtype=str),
+                date=self.date,
+                n_bars=self.n_bars,
+                avg_gain=self.avg_gain,
+                avg_loss=self.avg_loss,
+                **arrays
+                )
+        os.replace(tmp, os.path.join(root, 'indicator_state.npz'))
+
+    def select(self, keep):
+        """
+        Returns the state of the tickers where the boolean array keep is True.
+        """
+
+        return IndicatorState(
+            self.tickers[keep], self.date[keep], self.n_bars[keep],
+            self.avg_gain[keep], self.avg_loss[keep],
+            {name: values[:, keep] for name, values in self.tail.items()},
+            )
+
+    def merge(self, other):
+        """
+        Returns this state with other's tickers added or replaced.
+        """
+
+        keep = ~self.tickers.isin(other.tickers)
+        base = self.select(keep)
+
+        return IndicatorState(
+            base.tickers.append(other.tickers),
+            np.concatenate([base.date, other.date]),
+            np.concatenate([base.n_bars, other.n_bars]),
+            np.concatenate([base.avg_gain, other.avg_gain]),
+            np.concatenate([base.avg_loss, other.avg_loss]),
+            {name: np.concatenate([base.tail[name], other.tail[name]], axis=1) for name in self.tail},
+            )
+
+    def stale(self, as_of_date, max_age=5):
+        """
+        Boolean array of tickers whose last bar is after as_of_date or more
+        than max_age business days before it. These need a full recompute.
+        """
+
+        as_of = np.datetime64(pd.Timestamp(as_of_date).normalize().date(), 'D')
+        age = np.busday_count(self.date, as_of)
+
+        return (self.date > as_of) | (age > max_age)
+
+    def update(self, panel, rtol=1e-6):
+        """
+        Advances the state with the bars in a wide panel that starts at or
+        before every ticker's last stored date.
+
+        The stored last bar must be present in panel with the same close;
+        a different close means prices were adjusted (split or dividend)
+        since the state was built. Such tickers, tickers absent from panel
+        and tickers with missing values in their new bars are dropped from
+        the state and returned, so the caller can recompute them in full.
+        """
+
+        if len(self) == 0 or panel.empty:
+            return []
+
+        dates = panel.index.normalize().values.astype('datetime64[D]')
+        rows = {name: panel[name].reindex(columns=self.tickers).to_numpy(dtype=np.float64) for name in STATE_FIELDS}
+
+        n = len(self)
+        cols = np.arange(n)
+
+        pos = np.searchsorted(dates, self.date)
+        overlap = pos < len(dates)
+        overlap[overlap] = dates[pos[overlap]] == self.date[overlap]
+
+        ref_close = np.where(overlap, rows['Close'][np.minimum(pos, len(dates) - 1), cols], np.nan)
+        prev_close = self.tail['Close'][-1]
+        invalid = ~(overlap & np.isclose(ref_close, prev_close, rtol=rtol, atol=0))
+
+        for r in range(len(dates)):
+            bar = {name: values[r] for name, values in rows.items()}
+
+            apply = (dates[r] > self.date) & ~invalid
+            missing = np.isnan(np.vstack(list(bar.values()))).any(axis=0)
+            invalid |= apply & missing
+            apply &= ~missing
+
+            if not apply.any():
+                continue
+
+            new = self._step(bar)
+
+            for name, values in self.tail.items():
+                values[:, apply] = np.vstack([values[1:, apply], new[name][apply][None]])
+
+            self.avg_gain = np.where(apply, new['avg_gain'], self.avg_gain)
+            self.avg_loss = np.where(apply, new['avg_loss'], self.avg_loss)
+            self.date = np.where(apply, dates[r], self.date)
+            self.n_bars = self.n_bars + apply
+
+        dropped = list(self.tickers[invalid])
+        state = self.select(~invalid)
+        self.__dict__.update(state.__dict__)
+
+        return dropped
+
+    def _step(self, bar):
+        """
+        One bar of every indicator recursion, for all tickers at once.
+        """
+
+        last = {name: values[-1] for name, values in self.tail.items()}
+        prev_close = last['Close']
+
+        new = dict(bar)
+
+        for name, alpha in EMA_ALPHAS.items():
+            new[name] = ewm_step(last[name], bar['Close'], alpha)
+
+        truerange = np.fmax(
+            np.fmax(bar['High'] - bar['Low'], np.abs(bar['High'] - prev_close)),
+            np.abs(bar['Low'] - prev_close)
+            )
+        new['TR'] = truerange
+        new['ATR_14'] = ewm_step(last['ATR_14'], truerange, ATR_ALPHA)
+
+        delta = bar['Close'] - prev_close
+        new['avg_gain'] = ewm_step(self.avg_gain, np.maximum(delta, 0), RSI_ALPHA)
+        new['avg_loss'] = ewm_step(self.avg_loss, -np.minimum(delta, 0), RSI_ALPHA)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = new['avg_gain'] / new['avg_loss']
+            new['RSI_14'] = 100 - (100 / (1 + rs))
+
+        return new
+
+    def tail_panel(self):
+        """
+        Returns the stored tail as a wide (field, ticker) panel plus its
+        indicators, ready for screen_masks. Rows are positions, the last
+        row being each ticker's latest bar.
+        """
+
+        columns = pd.MultiIndex.from_product([list(STATE_FIELDS), self.tickers])
+        values = np.concatenate([self.tail[name] for name in STATE_FIELDS], axis=1)
+        panel = pd.DataFrame(values, columns=columns)
+
+        ind = {name: pd.DataFrame(self.tail[name], columns=self.tickers) for name in STATE_INDICATORS}
+
+        return panel, ind
+
+    def valid(self, as_of_date, min_rows=210):
+        """
+        Series of tickers that are current as of as_of_date with at least
+        min_rows clean bars, the state equivalent of the NaN test.
+        """
+
+        as_of = np.datetime64(pd.Timestamp(as_of_date).normalize().date(), 'D')
+        return pd.Series((self.date == as_of) & (self.n_bars >= min_rows), index=self.tickers)
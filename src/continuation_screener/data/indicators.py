@@ -1,11 +1,30 @@
+import numpy as np
 import pandas as pd
 
+from continuation_screener.data import kernels
+
+def ewm_mean(obj, span=None, alpha=None):
+    """
+    obj.ewm(span=span or alpha=alpha, adjust=False).mean() for a Series or
+    a (dates x tickers) frame, run by the active kernel backend (see
+    data.kernels). Single series stay on pandas under the numpy backend,
+    where a per-row loop over one column does not pay off.
+    """
+
+    if isinstance(obj, pd.Series):
+        if kernels.backend() != 'numba':
+            return obj.ewm(span=span, alpha=alpha, adjust=False).mean()
+        return pd.Series(kernels.ewm(obj.to_numpy(dtype=np.float64), ewm_alpha(span, alpha)), index=obj.index, name=obj.name)
+
+    values = kernels.ewm(obj.to_numpy(dtype=np.float64), ewm_alpha(span, alpha))
+    return pd.DataFrame(values, index=obj.index, columns=obj.columns)
+
 def add_ema(df, period, column='Close'):
     """
     Calculates Exponential Moving Average for a given period.
     """
     
-    df[f'EMA_{period}'] = df[column].ewm(span=period, adjust=False).mean()
+    df[f'EMA_{period}'] = ewm_mean(df[column], span=period)
     return df
 
 def add_emas(df):
@@ -31,7 +50,7 @@ def add_atr(df, period=14):
     truerange = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
 
     df['TR'] = truerange
-    df[f'ATR_{period}'] = df['TR'].ewm(span=period, adjust=False).mean()
+    df[f'ATR_{period}'] = ewm_mean(df['TR'], span=period)
     return df
 
 def add_rsi(df, period=14):
@@ -43,8 +62,8 @@ def add_rsi(df, period=14):
     gains = delta.clip(lower = 0)
     losses = -delta.clip(upper = 0)
 
-    avg_gain = gains.ewm(alpha=1/period, adjust=False).mean()
-    avg_loss = losses.ewm(alpha=1/period, adjust=False).mean()
+    avg_gain = ewm_mean(gains, alpha=1/period)
+    avg_loss = ewm_mean(losses, alpha=1/period)
 
     rs = avg_gain / avg_loss
     rsi = 100 - (100 / (1 + rs))
@@ -52,5 +71,85 @@ def add_rsi(df, period=14):
     df[f'RSI_{period}'] = rsi
 
     return df
-    
-    
+
+def panel_emas(close, periods=(9, 20, 50, 200)):
+    """
+    Calculates EMAs for every ticker of a (dates x tickers) close panel at once.
+    The recursions run in the kernel backend over the whole array.
+    """
+
+    return {f'EMA_{period}': ewm_mean(close, span=period) for period in periods}
+
+def panel_atr(high, low, close, period=14):
+    """
+    Calculates True Range and ATR for a (dates x tickers) panel.
+    NaN-aware max keeps the first bar identical to add_atr.
+    """
+
+    prev_close = close.shift()
+
+    truerange = np.fmax(
+        np.fmax(high - low, (high - prev_close).abs()),
+        (low - prev_close).abs()
+        )
+
+    return truerange, ewm_mean(truerange, span=period)
+
+def wilder_averages(close, period=14):
+    """
+    Wilder-smoothed average gain and loss of a (dates x tickers) close panel.
+    """
+
+    delta = close.diff()
+    gains = delta.clip(lower=0)
+    losses = -delta.clip(upper=0)
+
+    avg_gain = ewm_mean(gains, alpha=1/period)
+    avg_loss = ewm_mean(losses, alpha=1/period)
+
+    return avg_gain, avg_loss
+
+def panel_rsi(close, period=14):
+    """
+    Calculates Wilder's RSI for a (dates x tickers) close panel.
+    """
+
+    avg_gain, avg_loss = wilder_averages(close, period)
+
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+def panel_indicators(panel):
+    """
+    Computes EMA 9/20/50/200, ATR_14 and RSI_14 for the whole universe in
+    one batched pass. `panel` is anything where panel['Close'] returns a
+    (dates x tickers) frame, e.g. the wide frame from get_daily_data.
+    """
+
+    close = panel['Close']
+
+    ind = panel_emas(close)
+    ind['TR'], ind['ATR_14'] = panel_atr(panel['High'], panel['Low'], close)
+    ind['RSI_14'] = panel_rsi(close)
+
+    return ind
+
+def ewm_alpha(span=None, alpha=None):
+    """
+    Smoothing factor exactly as pandas derives it for ewm(span=) or ewm(alpha=).
+    """
+
+    com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+    return 1. / (1. + com)
+
+def ewm_step(prev, value, alpha):
+    """
+    Advances ewm(adjust=False).mean() by one observation. Matches pandas
+    bit for bit, so a terminal value carried forward day by day equals a
+    recompute over the full history.
+    """
+
+    old_wt = 1. - alpha
+    with np.errstate(invalid='ignore'):
+        stepped = (old_wt * prev + alpha * value) / (old_wt + alpha)
+    return np.where(np.isnan(prev), value, np.where(prev == value, prev, stepped))
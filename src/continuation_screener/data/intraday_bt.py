@@ -1,94 +1,150 @@
-import yfinance as yf
 import pandas as pd
 import time
 from continuation_screener.data.indicators import add_emas, add_atr
+from continuation_screener.data.dailydata import update_store
+from continuation_screener.data.providers import default_provider
 
-def intraday_bt(ticker, start, end, interval='15m', max_retries=2):
+INTRADAY_PRELOAD = pd.Timedelta(days=5)
+
+def prepare_intraday(df, start):
     """
-    Fetches Intraday, 15m candles for trade execution simulation.
-    Preloads 5 days of data to ensure ATR is stable.
+    Turns raw intraday bars into the simulator frame: OHLC with ATR_14,
+    naive New York timestamps, cut to bars from start onward.
+    Returns None if the bars are empty or incomplete.
     """
 
-    start = pd.to_datetime(start)
-    end = pd.to_datetime(end)
+    if df is None or df.empty or df.isnull().values.any():
+        return None
 
-    preload_start = start - pd.Timedelta(days=5)
-    
-    attempt = 0
-    while attempt <= max_retries:
-        df = yf.download(
-            ticker,
-            start=preload_start,
-            end=end,
-            interval=interval,
-            auto_adjust=False,
-            progress=False
-            )
+    df = df[['Open','High','Low','Close']].copy()
+    df.sort_index(inplace=True)
+
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+
+    df = add_atr(df, period=14)
+
+    return df.loc[df.index >= start]
+
+def prepare_daily(df):
+    """
+    Turns raw daily bars into the simulator frame: OHLCV with EMAs on a
+    normalized date index. Returns None if the bars are empty or incomplete.
+    """
 
-        if not df.empty and not df.isnull().values.any():
+    if df is None or df.empty or df.isnull().values.any():
+        return None
 
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.droplevel('Ticker')
-                
-            df = df[['Open','High','Low','Close']].copy()
-            df.sort_index(inplace=True)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.droplevel(1)
 
-            df.index = df.index.tz_localize(None)
+    df = df[['Open','High','Low','Close','Volume']].copy()
+    df.sort_index(inplace=True)
 
-            df = add_atr(df, period=14)
+    df = add_emas(df)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index = df.index.normalize()
 
-            df = df.loc[df.index >= start]
-            
+    return df
+
+def fetch_intraday(ticker, start, end, interval='15m', max_retries=2, provider=None, require_complete=True, cache=None):
+    """
+    Downloads raw intraday bars for [start, end) with retries.
+    With a BarCache only the part of the range not yet in memory is downloaded.
+    """
+
+    if provider is None:
+        provider = default_provider()
+
+    if cache is not None:
+        df = cache.get(
+            ticker, interval, start, end,
+            lambda gap_start, gap_end: fetch_intraday(ticker, gap_start, gap_end, interval, max_retries, provider, False)
+            )
+        if df is None or df.empty or (require_complete and df.isnull().values.any()):
+            return None
+        return df
+
+    attempt = 0
+    while attempt <= max_retries:
+        df = provider.intraday(ticker, start, end, interval)
+
+        if not df.empty and not (require_complete and df.isnull().values.any()):
             return df
 
         attempt += 1
         time.sleep(0.2 + (0.5 * attempt))
 
-    print(f'{ticker} 15m data failed to download after 3 attempts.')
     return None
 
-def daily_bt(ticker, start, end, max_retries=2, interval='1d'):
+def fetch_daily(ticker, start, end, max_retries=2, provider=None, store=None, require_complete=True, cache=None):
     """
-    Fetches Daily data for trade execution simulation.
+    Downloads raw daily bars for [start, end) with retries,
+    or reads them from a BarStore, fetching only what is missing.
+    A BarCache serves already fetched ranges from memory.
     """
 
-    start = pd.to_datetime(start)
-    end = pd.to_datetime(end) + pd.Timedelta(days=1)
+    if provider is None:
+        provider = default_provider()
 
-    attempt = 0
-    while attempt <= max_retries:
-        df = yf.download(
-            ticker,
-            start=start,
-            end=end,
-            interval=interval,
-            auto_adjust=False,
-            progress=False
+    if cache is not None:
+        df = cache.get(
+            ticker, '1d', start, end,
+            lambda gap_start, gap_end: fetch_daily(ticker, gap_start, gap_end, max_retries, provider, store, False)
             )
+        if df is None or df.empty or (require_complete and df.isnull().values.any()):
+            return None
+        return df
 
-        if not df.empty and not df.isnull().values.any():
-
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.droplevel(1)
-                
-            df = df[['Open','High','Low','Close','Volume']].copy()
-            df.sort_index(inplace=True)
-
-            df = add_emas(df)
-            df.index = df.index.tz_localize(None)
-            df.index = df.index.normalize()
+    if store is not None:
+        last_day = min(end - pd.Timedelta(days=1), pd.Timestamp.now().normalize())
+        update_store(store, [ticker], start, last_day, retries=max_retries, provider=provider)
+        return store.read(ticker, start, last_day)
 
-            if isinstance(df.index, pd.MultiIndex):
-                df.index = df.index.droplevel('Ticker')
-                
+    attempt = 0
+    while attempt <= max_retries:
+        df = provider.daily([ticker], start, end)
 
+        if not df.empty and not (require_complete and df.isnull().values.any()):
             return df
 
         attempt += 1
         time.sleep(0.5 + 0.5 * attempt)
 
-    print(f'{ticker} daily data failed to download after 3 attempts.')
     return None
 
+def intraday_bt(ticker, start, end, interval='15m', max_retries=2, provider=None, cache=None):
+    """
+    Fetches Intraday, 15m candles for trade execution simulation.
+    Preloads 5 days of data to ensure ATR is stable.
+    """
+
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end)
+
+    preload_start = start - INTRADAY_PRELOAD
+
+    df = prepare_intraday(fetch_intraday(ticker, preload_start, end, interval, max_retries, provider, cache=cache), start)
+
+    if df is None:
+        print(f'{ticker} 15m data failed to download after 3 attempts.')
+
+    return df
+
+def daily_bt(ticker, start, end, max_retries=2, interval='1d', store=None, provider=None, cache=None):
+    """
+    Fetches Daily data for trade execution simulation.
+    With a BarStore, bars are read from the store and only
+    the missing range is downloaded.
+    """
+
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end) + pd.Timedelta(days=1)
+
+    df = prepare_daily(fetch_daily(ticker, start, end, max_retries, provider, store, cache=cache))
+
+    if df is None:
+        print(f'{ticker} daily data failed to download after 3 attempts.')
 
-        
+    return df
@@ -0,0 +1,248 @@
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ('numpy', 'numba')
+
+def _first_true(mask):
+    """
+    Column of the first True in each row of a 2D mask, -1 where there is none.
+    """
+
+    pos = mask.argmax(axis=1)
+    return np.where(mask.any(axis=1), pos, -1)
+
+def ewm_numpy(values, alpha):
+    """
+    ewm(alpha=alpha, adjust=False).mean() down the rows of a 2D array,
+    one step per row vectorized over the columns. Follows pandas step
+    for step (including how NaN gaps decay the old weight), so results
+    are identical to the pandas ones.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(values)
+    if not len(values):
+        return out
+
+    old_wt_factor = 1. - alpha
+    weighted = values[0].copy()
+    old_wt = np.ones(values.shape[1:])
+    out[0] = weighted
+
+    for i in range(1, len(values)):
+        cur = values[i]
+        has = weighted == weighted
+        observed = has & (cur == cur)
+
+        old_wt = np.where(has, old_wt * old_wt_factor, old_wt)
+        with np.errstate(invalid='ignore'):
+            stepped = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+
+        weighted = np.where(observed & (weighted != cur), stepped, np.where(~has & (cur == cur), cur, weighted))
+        old_wt = np.where(observed, 1., old_wt)
+        out[i] = weighted
+
+    return out
+
+def entry_scan_numpy(low, close, atr, ema, session):
+    """
+    Column of the reclaim entry in each row of (candidates x bars) arrays,
+    -1 for none: the first close back at or above ema after the first
+    close below it, unless an EMA-touch bounce came first. Only bars where
+    session is True are considered.
+    """
+
+    cols = np.arange(close.shape[1])
+
+    with np.errstate(invalid='ignore'):
+        ema_col = ema[:, None]
+        ema_touch = np.abs(low - ema_col) <= 0.2 * atr
+        bounce = _first_true(session & ema_touch & (close > ema_col))
+        ema_break = _first_true(session & (close < ema_col))
+
+        after_break = cols[None, :] > ema_break[:, None]
+        reclaim = _first_true(session & after_break & (close >= ema_col))
+
+    entered = (ema_break >= 0) & ((bounce < 0) | (bounce > ema_break)) & (reclaim >= 0)
+    return np.where(entered, reclaim, -1)
+
+def exit_scan_numpy(close, stop_level, tp_level, known, final_col, entry_col):
+    """
+    First exit after entry_col in each row: stop (close below stop_level),
+    take profit (close at or above tp_level) or the max-hold bar final_col,
+    checked in that order and only on known bars. Returns the exit column
+    (-1 for none) and its type (0 stop, 1 take profit, 2 max hold).
+    """
+
+    cols = np.arange(close.shape[1])
+    after = (cols[None, :] > entry_col[:, None]) & known
+
+    with np.errstate(invalid='ignore'):
+        stop = after & (close < stop_level)
+        take_profit = after & (close >= tp_level[:, None])
+    final = after & (cols[None, :] == final_col[:, None])
+
+    hit = _first_true(stop | take_profit | final)
+
+    rows = np.arange(len(hit))
+    at = np.maximum(hit, 0)
+    kind = np.where(stop[rows, at], 0, np.where(take_profit[rows, at], 1, 2))
+
+    return hit, np.where(hit >= 0, kind, 2)
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _ewm_numba(values, alpha):
+        n, m = values.shape
+        out = np.empty((n, m))
+        if n == 0:
+            return out
+
+        old_wt_factor = 1. - alpha
+        weighted = values[0].copy()
+        old_wt = np.ones(m)
+        out[0] = weighted
+
+        for i in range(1, n):
+            for j in range(m):
+                cur = values[i, j]
+                w = weighted[j]
+                if w == w:
+                    old_wt[j] *= old_wt_factor
+                    if cur == cur:
+                        if w != cur:
+                            weighted[j] = (old_wt[j] * w + alpha * cur) / (old_wt[j] + alpha)
+                        old_wt[j] = 1.
+                elif cur == cur:
+                    weighted[j] = cur
+                out[i, j] = weighted[j]
+
+        return out
+
+    @numba.njit(cache=True)
+    def _entry_scan_numba(low, close, atr, ema, session):
+        n, width = close.shape
+        out = np.full(n, -1, dtype=np.int64)
+
+        for r in range(n):
+            level = ema[r]
+            broken = False
+            for c in range(width):
+                if not session[r, c]:
+                    continue
+                if not broken:
+                    if abs(low[r, c] - level) <= 0.2 * atr[r, c] and close[r, c] > level:
+                        break
+                    if close[r, c] < level:
+                        broken = True
+                elif close[r, c] >= level:
+                    out[r] = c
+                    break
+
+        return out
+
+    @numba.njit(cache=True)
+    def _exit_scan_numba(close, stop_level, tp_level, known, final_col, entry_col):
+        n, width = close.shape
+        hit = np.full(n, -1, dtype=np.int64)
+        kind = np.full(n, 2, dtype=np.int64)
+
+        for r in range(n):
+            for c in range(entry_col[r] + 1, width):
+                if not known[r, c]:
+                    continue
+                if close[r, c] < stop_level[r, c]:
+                    hit[r], kind[r] = c, 0
+                    break
+                if close[r, c] >= tp_level[r]:
+                    hit[r], kind[r] = c, 1
+                    break
+                if c == final_col[r]:
+                    hit[r], kind[r] = c, 2
+                    break
+
+        return hit, kind
+
+def _default_backend():
+    name = os.environ.get('CONTINUATION_SCREENER_KERNELS', 'auto')
+    if name == 'numpy' or numba is None:
+        return 'numpy'
+    return 'numba'
+
+_backend = _default_backend()
+
+def backend():
+    """
+    Name of the active kernel backend, 'numba' or 'numpy'.
+    """
+
+    return _backend
+
+def set_backend(name):
+    """
+    Switches the kernel backend. 'auto' picks numba when it is installed.
+    CONTINUATION_SCREENER_KERNELS sets the default the same way.
+    """
+
+    global _backend
+
+    if name == 'auto':
+        name = 'numba' if numba is not None else 'numpy'
+    if name not in BACKENDS:
+        raise ValueError(f'unknown kernel backend: {name}')
+    if name == 'numba' and numba is None:
+        raise ImportError('the numba backend needs numba installed (pip install numba)')
+
+    _backend = name
+
+def ewm(values, alpha):
+    """
+    ewm(alpha=alpha, adjust=False).mean() of a 1D or (dates x tickers) array.
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.ndim == 1
+    if flat:
+        values = values[:, None]
+
+    if _backend == 'numba':
+        out = _ewm_numba(np.ascontiguousarray(values), float(alpha))
+    else:
+        out = ewm_numpy(values, alpha)
+
+    return out[:, 0] if flat else out
+
+def entry_scan(low, close, atr, ema, session):
+    """
+    See entry_scan_numpy. The numba kernel walks each row bar by bar and
+    stops at the first decision instead of building full masks.
+    """
+
+    if _backend == 'numba':
+        return _entry_scan_numba(
+            np.ascontiguousarray(low, dtype=np.float64), np.ascontiguousarray(close, dtype=np.float64),
+            np.ascontiguousarray(atr, dtype=np.float64), np.ascontiguousarray(ema, dtype=np.float64),
+            np.ascontiguousarray(session, dtype=np.bool_)
+            )
+
+    return entry_scan_numpy(low, close, atr, ema, session)
+
+def exit_scan(close, stop_level, tp_level, known, final_col, entry_col):
+    """
+    See exit_scan_numpy.
+    """
+
+    if _backend == 'numba':
+        return _exit_scan_numba(
+            np.ascontiguousarray(close, dtype=np.float64), np.ascontiguousarray(stop_level, dtype=np.float64),
+            np.ascontiguousarray(tp_level, dtype=np.float64), np.ascontiguousarray(known, dtype=np.bool_),
+            np.ascontiguousarray(final_col, dtype=np.int64), np.ascontiguousarray(entry_col, dtype=np.int64)
+            )
+
+    return exit_scan_numpy(close, stop_level, tp_level, known, final_col, entry_col)
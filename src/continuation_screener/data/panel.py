@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+class _Rows:
+    """
+    Row-only .loc / .iloc for Panel, enough for date filtering and tails.
+    """
+
+    def __init__(self, panel, by_label):
+        self.panel = panel
+        self.by_label = by_label
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            raise TypeError('Panel only supports row selection, use select() for tickers')
+
+        rows = np.arange(len(self.panel.index))
+        if self.by_label and isinstance(key, slice):
+            rows = rows[self.panel.index.slice_indexer(key.start, key.stop, key.step)]
+        elif self.by_label and not (isinstance(key, (np.ndarray, pd.Series, list)) and np.asarray(key).dtype == bool):
+            rows = self.panel.index.get_indexer(pd.Index(np.atleast_1d(key)))
+            if (rows < 0).any():
+                raise KeyError(key)
+        else:
+            rows = rows[np.asarray(key) if not isinstance(key, slice) else key]
+
+        return self.panel.take(np.atleast_1d(rows))
+
+class Panel:
+    """
+    Dense daily bars for a universe: one float32 (fields x dates x tickers)
+    array plus the date index and a ticker -> column lookup.
+
+    panel['Close'] is a (dates x tickers) DataFrame viewing the array
+    without a copy, so the panel_* indicators and screener masks that read
+    the wide (field, ticker) frame from get_daily_data work on it as is.
+    Volume is kept as float32 too, which keeps missing bars as NaN.
+    """
+
+    def __init__(self, values, index, tickers, fields=PANEL_FIELDS):
+        self.values = values
+        self.index = pd.DatetimeIndex(index)
+        self.tickers = pd.Index(tickers)
+        self.fields = tuple(fields)
+        self._field_pos = {field: i for i, field in enumerate(self.fields)}
+
+    @classmethod
+    def from_yfinance(cls, data, dtype=np.float32):
+        """
+        Builds a panel from a yfinance style (field, ticker) wide frame
+        with a single reindex and reshape, no per-ticker frames.
+        """
+
+        if data is None or data.empty:
+            return cls(np.zeros((0, 0, 0), dtype=dtype), pd.DatetimeIndex([]), [], ())
+
+        present = data.columns.get_level_values(0).unique()
+        fields = [f for f in PANEL_FIELDS if f in present] + [f for f in present if f not in PANEL_FIELDS]
+        tickers = data.columns.get_level_values(1).unique()
+
+        full = pd.MultiIndex.from_product([fields, tickers])
+        if not data.columns.equals(full):
+            data = data.reindex(columns=full)
+
+        values = data.to_numpy(dtype=dtype).reshape(len(data), len(fields), len(tickers)).transpose(1, 0, 2)
+
+        return cls(np.ascontiguousarray(values), data.index, tickers, fields)
+
+    from_frame = from_yfinance
+
+    @classmethod
+    def concat(cls, panels):
+        """
+        Joins panels of different tickers on the union of their dates.
+        """
+
+        panels = [p for p in panels if len(p.tickers)]
+        if not panels:
+            return cls.from_yfinance(None)
+
+        index = panels[0].index
+        for p in panels[1:]:
+            index = index.union(p.index)
+
+        fields = panels[0].fields
+        tickers = panels[0].tickers.append([p.tickers for p in panels[1:]])
+
+        values = np.full((len(fields), len(index), len(tickers)), np.nan, dtype=panels[0].values.dtype)
+
+        col = 0
+        for p in panels:
+            rows = index.get_indexer(p.index)
+            for i, field in enumerate(fields):
+                values[i, rows, col:col + len(p.tickers)] = p.values[p._field_pos[field]]
+            col += len(p.tickers)
+
+        return cls(values, index, tickers, fields)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, field):
+        return field in self._field_pos
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return int(self.values.nbytes + self.index.nbytes)
+
+    def memory_usage(self):
+        """
+        Bytes held per field, plus the date index.
+        """
+
+        per_field = self.values[0].nbytes if len(self.fields) else 0
+        usage = pd.Series({field: per_field for field in self.fields}, dtype=np.int64)
+        usage['Index'] = self.index.nbytes
+        return usage
+
+    def __getitem__(self, field):
+        if field not in self._field_pos:
+            raise KeyError(field)
+        return pd.DataFrame(self.values[self._field_pos[field]], index=self.index, columns=self.tickers, copy=False)
+
+    @property
+    def loc(self):
+        return _Rows(self, by_label=True)
+
+    @property
+    def iloc(self):
+        return _Rows(self, by_label=False)
+
+    def take(self, rows):
+        """
+        Returns a panel of the given row positions.
+        """
+
+        return Panel(self.values[:, rows, :], self.index[rows], self.tickers, self.fields)
+
+    def select(self, tickers):
+        """
+        Returns a panel of the given tickers, in that order.
+        """
+
+        cols = self.tickers.get_indexer(pd.Index(tickers))
+        if (cols < 0).any():
+            raise KeyError([t for t, c in zip(tickers, cols) if c < 0])
+        return Panel(self.values[:, :, cols], self.index, self.tickers[cols], self.fields)
+
+    def copy(self):
+        return Panel(self.values.copy(), self.index.copy(), self.tickers.copy(), self.fields)
+
+    def ticker(self, ticker):
+        """
+        One ticker's bars as an OHLCV frame, like data.xs(ticker, level=1, axis=1).
+        """
+
+        col = self.tickers.get_loc(ticker)
+        return pd.DataFrame(self.values[:, :, col].T, index=self.index, columns=list(self.fields))
+
+    def missing(self):
+        """
+        (dates x tickers) frame, True where any field is missing.
+        """
+
+        return pd.DataFrame(np.isnan(self.values).any(axis=0), index=self.index, columns=self.tickers)
+
+    def complete(self, min_rows=15):
+        """
+        Boolean array of tickers with no missing values and at least
+        min_rows bars, the vectorized form of dailydata.complete.
+        """
+
+        if len(self) < min_rows:
+            return np.zeros(len(self.tickers), dtype=bool)
+        return ~np.isnan(self.values).any(axis=(0, 1))
+
+    def to_frame(self):
+        """
+        Converts back to the (field, ticker) wide frame, as float64.
+        """
+
+        columns = pd.MultiIndex.from_product([list(self.fields), self.tickers])
+        values = self.values.transpose(1, 0, 2).reshape(len(self.index), -1).astype(np.float64)
+        return pd.DataFrame(values, index=self.index, columns=columns)
+
+def panel_tickers(panel):
+    """
+    Tickers of a Panel or of a (field, ticker) wide frame, in column order.
+    """
+
+    if isinstance(panel, Panel):
+        return panel.tickers
+    return panel.columns.get_level_values(1).unique()
+
+def panel_fields(panel):
+    if isinstance(panel, Panel):
+        return list(panel.fields)
+    return list(panel.columns.get_level_values(0).unique())
+
+def missing_rows(panel):
+    """
+    (dates x tickers) frame, True where a ticker has any missing field.
+    """
+
+    if isinstance(panel, Panel):
+        return panel.missing()
+
+    tickers = panel_tickers(panel)
+    return panel.isna().T.groupby(level=1).any().T.reindex(columns=tickers)
+
+def select_tickers(panel, tickers):
+    """
+    The part of a Panel or wide frame covering tickers, in panel order.
+    """
+
+    if isinstance(panel, Panel):
+        return panel.select(panel.tickers[panel.tickers.isin(tickers)])
+    return panel.loc[:, panel.columns.get_level_values(1).isin(tickers)]
@@ -0,0 +1,222 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+import pandas as pd
+import yfinance as yf
+
+from continuation_screener.utils.get_iwv import get_iwv_tickers
+
+logging.getLogger('yfinance').setLevel(logging.CRITICAL)
+logging.getLogger('yfinance.shared').setLevel(logging.CRITICAL)
+
+INTRADAY_TZ = 'America/New_York'
+
+class MarketDataProvider(ABC):
+    """
+    Interface for every source of market data used by the screener and backtester.
+
+    daily() returns a frame with (field, ticker) columns like a multi-ticker
+    yf.download; intraday() returns single-level OHLCV columns indexed by
+    tz-aware New York timestamps. rate_limited tells the download loops
+    whether to sleep between batches. A subclass missing any of the
+    methods cannot be instantiated.
+    """
+
+    rate_limited = True
+
+    @abstractmethod
+    def daily(self, tickers, start, end, threads=True):
+        ...
+
+    @abstractmethod
+    def intraday(self, ticker, start, end, interval='15m'):
+        ...
+
+    @abstractmethod
+    def universe(self):
+        ...
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Live data from yfinance and the iShares IWV holdings file.
+    """
+
+    def daily(self, tickers, start, end, threads=True):
+        return yf.download(
+            tickers,
+            start=start,
+            end=end,
+            interval='1d',
+            progress=False,
+            threads=threads,
+            auto_adjust=False,
+            back_adjust=False
+            )
+
+    def intraday(self, ticker, start, end, interval='15m'):
+        df = yf.download(
+            ticker,
+            start=start,
+            end=end,
+            interval=interval,
+            auto_adjust=False,
+            progress=False
+            )
+
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.droplevel('Ticker')
+
+        return df
+
+    def universe(self):
+        return get_iwv_tickers()
+
+
+def _read_table(path_base, index_col):
+    """
+    Reads path_base.parquet if present, otherwise path_base.csv.
+    """
+
+    if os.path.exists(path_base + '.parquet'):
+        df = pd.read_parquet(path_base + '.parquet')
+        if index_col in df.columns:
+            df = df.set_index(index_col)
+        return df
+
+    if os.path.exists(path_base + '.csv'):
+        return pd.read_csv(path_base + '.csv', index_col=index_col)
+
+    return None
+
+
+class LocalProvider(MarketDataProvider):
+    """
+    Offline provider reading fixtures or a recorded session from a directory:
+
+        root/daily/<TICKER>.csv|.parquet               Date index, OHLCV columns
+        root/intraday/<interval>/<TICKER>.csv|.parquet  Datetime index, OHLC columns
+        root/universe.csv                              Ticker column
+    """
+
+    rate_limited = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def _daily_frame(self, ticker):
+        df = _read_table(os.path.join(self.root, 'daily', ticker), 'Date')
+        if df is None:
+            return None
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    def daily(self, tickers, start, end, threads=True):
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        start = pd.to_datetime(start)
+        end = pd.to_datetime(end)
+
+        frames = []
+        for ticker in tickers:
+            df = self._daily_frame(ticker)
+            if df is None:
+                continue
+            df = df.loc[(df.index >= start) & (df.index < end)]
+            df.columns = pd.MultiIndex.from_product([df.columns, [ticker]], names=['Price', 'Ticker'])
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, axis=1, sort=True)
+
+    def intraday(self, ticker, start, end, interval='15m'):
+        df = _read_table(os.path.join(self.root, 'intraday', interval, ticker), 'Datetime')
+        if df is None:
+            return pd.DataFrame()
+
+        index = pd.to_datetime(df.index, utc=True)
+        df.index = index.tz_convert(INTRADAY_TZ)
+        df = df.sort_index()
+
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        if start.tzinfo is None:
+            start = start.tz_localize(INTRADAY_TZ)
+        if end.tzinfo is None:
+            end = end.tz_localize(INTRADAY_TZ)
+
+        return df.loc[(df.index >= start) & (df.index < end)]
+
+    def universe(self):
+        path = os.path.join(self.root, 'universe.csv')
+        if not os.path.exists(path):
+            return []
+        return pd.read_csv(path)['Ticker'].dropna().astype(str).tolist()
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Wraps another provider and writes every response into the LocalProvider
+    layout under root, so a production run can be replayed offline exactly.
+    """
+
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self.rate_limited = inner.rate_limited
+
+    def _merge(self, path_base, df, index_label):
+        os.makedirs(os.path.dirname(path_base), exist_ok=True)
+
+        existing = _read_table(path_base, index_label)
+        if existing is not None:
+            existing.index = pd.to_datetime(existing.index, utc=index_label == 'Datetime')
+            if index_label == 'Datetime':
+                existing.index = existing.index.tz_convert(df.index.tz)
+            df = df.combine_first(existing)
+
+        df = df.sort_index()
+        df.index.name = index_label
+        df.to_csv(path_base + '.csv')
+
+    def daily(self, tickers, start, end, threads=True):
+        data = self.inner.daily(tickers, start, end, threads=threads)
+
+        if data is not None and not data.empty:
+            for ticker in data.columns.get_level_values(1).unique():
+                ticker_df = data.xs(ticker, level=1, axis=1).dropna(how='all')
+                self._merge(os.path.join(self.root, 'daily', ticker), ticker_df, 'Date')
+
+        return data
+
+    def intraday(self, ticker, start, end, interval='15m'):
+        df = self.inner.intraday(ticker, start, end, interval)
+
+        if df is not None and not df.empty:
+            self._merge(os.path.join(self.root, 'intraday', interval, ticker), df, 'Datetime')
+
+        return df
+
+    def universe(self):
+        tickers = self.inner.universe()
+
+        os.makedirs(self.root, exist_ok=True)
+        pd.DataFrame({'Ticker': tickers}).to_csv(os.path.join(self.root, 'universe.csv'), index=False)
+
+        return tickers
+
+
+_default_provider = None
+
+def default_provider():
+    """
+    Returns the shared yfinance provider used when none is passed in.
+    """
+
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = YFinanceProvider()
+    return _default_provider
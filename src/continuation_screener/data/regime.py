@@ -0,0 +1,95 @@
+import threading
+import pandas as pd
+
+from continuation_screener.data.dailydata import update_store
+from continuation_screener.data.providers import default_provider
+
+_cache = {}
+_lock = threading.Lock()
+
+def regime_from_close(close, window=200):
+    """
+    True on days the close is at or above its window-day SMA, the
+    condition the macro filter requires. Days without a full SMA are False.
+    """
+
+    sma = close.rolling(window=window).mean()
+    return (close >= sma) & sma.notna()
+
+def _adjusted_close(data):
+    # the regime is measured on dividend-adjusted closes, as yfinance's default
+    return data['Adj Close'] if 'Adj Close' in data.columns.get_level_values(0) else data['Close']
+
+def _fetch_close(symbol, start, end, store=None, provider=None):
+    if store is not None:
+        update_store(store, [symbol], start, end, provider=provider)
+        df = store.read(symbol, start, end)
+        return pd.Series(dtype=float) if df is None else _adjusted_close(df)
+
+    if provider is None:
+        provider = default_provider()
+
+    data = provider.daily([symbol], start, end + pd.Timedelta(days=1))
+    if data is None or data.empty:
+        return pd.Series(dtype=float)
+
+    close = _adjusted_close(data)
+    if isinstance(close, pd.DataFrame):
+        close = close[symbol] if symbol in close.columns else close.iloc[:, 0]
+
+    return close.dropna()
+
+def regime_mask(start_date, end_date, symbol='SPY', window=200, store=None, provider=None):
+    """
+    Per-day market regime for [start_date, end_date]: a boolean Series on
+    symbol's trading days, True where its adjusted close was at or above
+    its SMA. Computed once from the stored (or downloaded) history, with
+    enough warm-up for the SMA, and cached for the process; later calls
+    inside a cached range do not touch the network. A cached mask without
+    a bar for end_date that was computed before end_date was over is
+    computed again, so long-running processes pick up new sessions.
+    """
+
+    start_date = pd.to_datetime(start_date).normalize()
+    end_date = pd.to_datetime(end_date).normalize()
+
+    key = (symbol, window, store, provider)
+
+    with _lock:
+        cached = _cache.get(key)
+
+    stale = cached is not None and end_date > cached[3] and cached[4] < end_date + pd.Timedelta(days=1)
+
+    if cached is None or stale or start_date < cached[0] or end_date > cached[1]:
+        first = start_date if cached is None else min(start_date, cached[0])
+        last = end_date if cached is None else max(end_date, cached[1])
+
+        computed = pd.Timestamp.now()
+        warmup = pd.Timedelta(days=int(window * 1.5) + 30)
+        close = _fetch_close(symbol, first - warmup, last, store, provider)
+        close.index = pd.DatetimeIndex(close.index).tz_localize(None).normalize()
+
+        # last day with data, the mask says nothing about later days yet
+        data_end = close.index.max() if len(close) else first - pd.Timedelta(days=1)
+
+        cached = (first, last, regime_from_close(close.sort_index(), window), data_end, computed)
+        with _lock:
+            _cache[key] = cached
+
+    mask = cached[2]
+    return mask.loc[(mask.index >= start_date) & (mask.index <= end_date)]
+
+def regime_on(date, symbol='SPY', window=200, store=None, provider=None):
+    """
+    Regime of the last trading day on or before date.
+    False when there is no data to decide on.
+    """
+
+    date = pd.to_datetime(date).normalize()
+    mask = regime_mask(date - pd.Timedelta(days=10), date, symbol, window, store, provider)
+
+    return bool(mask.iloc[-1]) if len(mask) else False
+
+def clear_regime_cache():
+    with _lock:
+        _cache.clear()
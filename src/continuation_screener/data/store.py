@@ -0,0 +1,181 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+class BarStore:
+    """
+    Persistent columnar store of daily bars, one partition per ticker.
+    Every partition is a directory of .npy files (the date index plus one
+    file per field) so columns can be memory-mapped and sliced without
+    loading the whole history. manifest.json keeps each ticker's covered
+    range; 'end' is the high-water mark up to which bars have been fetched.
+    Writes only touch partitions, call save() to persist the manifest.
+    A readonly store refuses writes, so several processes can open the
+    same root while one of them (or none) keeps it up to date.
+    """
+
+    def __init__(self, root, readonly=False):
+        self.root = os.path.abspath(root)
+        self.readonly = readonly
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest_path = os.path.join(self.root, 'manifest.json')
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError(f'BarStore at {self.root} is read-only')
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path) as f:
+            return json.load(f)
+
+    def save(self):
+        """
+        Atomically writes the manifest to disk.
+        """
+
+        self._check_writable()
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp, self._manifest_path)
+
+    def _partition(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def __contains__(self, ticker):
+        return ticker in self.manifest
+
+    def tickers(self):
+        return sorted(self.manifest)
+
+    def coverage(self, ticker):
+        """
+        Returns the (start, end) range of dates already fetched for ticker,
+        or (None, None) when the ticker is not stored.
+        """
+
+        entry = self.manifest.get(ticker)
+        if entry is None:
+            return None, None
+        return pd.Timestamp(entry['start']), pd.Timestamp(entry['end'])
+
+    def high_water_mark(self, ticker):
+        return self.coverage(ticker)[1]
+
+    def read(self, ticker, start=None, end=None, mmap=True):
+        """
+        Reads stored bars for ticker between start and end (inclusive).
+        Only the requested rows are copied out of the memory-mapped columns.
+        """
+
+        if ticker not in self.manifest:
+            return None
+
+        path = self._partition(ticker)
+        mode = 'r' if mmap else None
+
+        dates = np.load(os.path.join(path, 'index.npy'), mmap_mode=mode)
+
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+
+        columns = {}
+        for field in self.manifest[ticker]['fields']:
+            values = np.load(os.path.join(path, f'{field}.npy'), mmap_mode=mode)
+            columns[field] = np.array(values[lo:hi])
+
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(np.array(dates[lo:hi]), name='Date'))
+
+    def last_bar(self, ticker):
+        """
+        The last stored bar of ticker as a Series named by its date,
+        or None when there is none.
+        """
+
+        if ticker not in self.manifest:
+            return None
+
+        dates = np.load(os.path.join(self._partition(ticker), 'index.npy'), mmap_mode='r')
+        if not len(dates):
+            return None
+
+        df = self.read(ticker, dates[-1], dates[-1])
+        return df.iloc[-1]
+
+    def read_panel(self, tickers, start=None, end=None):
+        """
+        Reads several tickers into the wide (field, ticker) frame
+        that get_daily_data returns.
+        """
+
+        frames = []
+        for ticker in tickers:
+            df = self.read(ticker, start, end)
+            if df is None or df.empty:
+                continue
+            df.columns = pd.MultiIndex.from_product([df.columns, [ticker]])
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+
+        return pd.concat(frames, axis=1)
+
+    def write(self, ticker, df, start, end):
+        """
+        Replaces the partition for ticker with df, covering [start, end].
+        """
+
+        self._check_writable()
+        df = df.sort_index()
+        df = df[[c for c in FIELDS if c in df.columns]]
+
+        path = self._partition(ticker)
+        tmp = path + '.tmp'
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+
+        np.save(os.path.join(tmp, 'index.npy'), df.index.values.astype('datetime64[ns]'))
+        for field in df.columns:
+            np.save(os.path.join(tmp, f'{field}.npy'), df[field].to_numpy())
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self.manifest[ticker] = {
+                'start': str(pd.Timestamp(start).date()),
+                'end': str(pd.Timestamp(end).date()),
+                'rows': len(df),
+                'fields': list(df.columns),
+            }
+
+    def append(self, ticker, df, end):
+        """
+        Appends bars newer than the stored high-water mark and advances it to end.
+        Bars that overlap the stored range are replaced by the new values.
+        """
+
+        start, _ = self.coverage(ticker)
+        stored = self.read(ticker, mmap=False)
+
+        if stored is not None and not df.empty:
+            stored = stored.loc[stored.index < df.index.min()]
+            df = pd.concat([stored, df[stored.columns]])
+        elif stored is not None:
+            df = stored
+
+        self.write(ticker, df, start, end)
@@ -0,0 +1,195 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+from continuation_screener.data.panel import Panel, PANEL_FIELDS
+from continuation_screener.data.providers import MarketDataProvider, INTRADAY_TZ
+
+# every synthetic series starts here, so any [start, end) window of a
+# ticker is the same slice of the same path whichever call produced it
+SYNTHETIC_EPOCH = pd.Timestamp('2015-01-02')
+
+# business days per drift regime; alternating trends give the trend
+# filters something to find
+TREND_DAYS = 60
+
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_MINUTES = 390
+
+def synthetic_tickers(n):
+    """
+    Deterministic ticker names S00000, S00001, ...
+    """
+
+    return [f'S{i:05d}' for i in range(n)]
+
+def _rng(seed, ticker, stream):
+    return np.random.default_rng([seed, zlib.crc32(ticker.encode()), stream])
+
+def _daily_arrays(ticker, n_days, seed=0):
+    """
+    (n_days x 6) float64 OHLC, Adj Close and Volume for the first n_days
+    business days from SYNTHETIC_EPOCH. Each component draws from its own
+    stream, so a shorter path is always a prefix of a longer one.
+    """
+
+    params = _rng(seed, ticker, 0)
+    if ticker == 'SPY':
+        price, drift, vol, swing, base_volume = 200.0, 0.0004, 0.009, 0.08, 8e7
+    else:
+        price = params.uniform(8, 250)
+        drift = params.uniform(-0.0002, 0.0004)
+        vol = params.uniform(0.008, 0.03)
+        swing = params.uniform(0.1, 0.4)
+        base_volume = np.exp(params.uniform(np.log(2e5), np.log(2e7)))
+
+    # the trend legs move the log price between random levels, so they
+    # swing the path without compounding into runaway prices
+    levels = swing * _rng(seed, ticker, 4).standard_normal(n_days // TREND_DAYS + 2)
+    drift = drift + np.repeat(np.diff(levels) / TREND_DAYS, TREND_DAYS)[:n_days]
+
+    returns = drift + vol * _rng(seed, ticker, 1).standard_normal(n_days)
+    close = price * np.exp(np.cumsum(returns))
+
+    candle = _rng(seed, ticker, 2).random((n_days, 3))
+    prev_close = np.concatenate([[price], close[:-1]])
+    open_ = prev_close * (1 + vol * (candle[:, 0] - 0.5))
+    high = np.maximum(open_, close) * (1 + vol * candle[:, 1] * 0.5)
+    low = np.minimum(open_, close) * (1 - vol * candle[:, 2] * 0.5)
+
+    volume = np.round(base_volume * np.exp(0.35 * _rng(seed, ticker, 3).standard_normal(n_days)))
+
+    return np.column_stack([open_, high, low, close, close, volume])
+
+def _business_days(start, end):
+    """
+    Business days in [start, end) and the position of the first one
+    counted from SYNTHETIC_EPOCH.
+    """
+
+    start = max(pd.Timestamp(start).normalize(), SYNTHETIC_EPOCH)
+    end = pd.Timestamp(end).normalize()
+
+    days = pd.bdate_range(start, end, inclusive='left')
+    offset = len(pd.bdate_range(SYNTHETIC_EPOCH, start, inclusive='left'))
+
+    return days, offset
+
+def synthetic_daily(tickers, start, end, seed=0, compact=False):
+    """
+    Daily OHLCV for tickers over the business days in [start, end), as
+    the (field, ticker) wide frame get_daily_data returns, or as a
+    float32 Panel with compact=True. tickers can be a count, in which
+    case synthetic_tickers(n) are generated. Same inputs, same bars.
+    """
+
+    if isinstance(tickers, int):
+        tickers = synthetic_tickers(tickers)
+
+    days, offset = _business_days(start, end)
+    n_days = len(days)
+
+    dtype = np.float32 if compact else np.float64
+    values = np.empty((len(PANEL_FIELDS), n_days, len(tickers)), dtype=dtype)
+
+    for j, ticker in enumerate(tickers):
+        values[:, :, j] = _daily_arrays(ticker, offset + n_days, seed)[offset:].T
+
+    if compact:
+        return Panel(values, days, tickers)
+
+    columns = pd.MultiIndex.from_product([list(PANEL_FIELDS), tickers], names=['Price', 'Ticker'])
+    wide = values.transpose(1, 0, 2).reshape(n_days, -1)
+
+    return pd.DataFrame(wide, index=days, columns=columns)
+
+def synthetic_intraday(ticker, start, end, interval='15m', seed=0):
+    """
+    Intraday OHLCV bars for one ticker over the regular sessions of the
+    business days in [start, end), indexed by tz-aware New York
+    timestamps like a provider's intraday(). Each session walks from the
+    day's synthetic open to its close inside the day's high/low range.
+    """
+
+    minutes = int(pd.Timedelta(interval).total_seconds() // 60)
+    n_bars = SESSION_MINUTES // minutes
+
+    days, offset = _business_days(start, end)
+    if not len(days):
+        return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+    daily = _daily_arrays(ticker, offset + len(days), seed)[offset:]
+
+    steps = np.arange(1, n_bars + 1) / n_bars
+    frames = []
+    for k, day in enumerate(days):
+        open_, high, low, close, _, volume = daily[k]
+        rng = _rng(seed, ticker, 5 + offset + k)
+
+        walk = np.cumsum(rng.standard_normal(n_bars))
+        bridge = walk - steps * walk[-1]
+        path = open_ + (close - open_) * steps + bridge * (high - low) / (2 * np.sqrt(n_bars))
+        path = np.clip(path, low, high)
+        path[-1] = close
+
+        bar_open = np.concatenate([[open_], path[:-1]])
+        wick = rng.random((n_bars, 2)) * (high - low) / n_bars
+        bar_high = np.minimum(np.maximum(bar_open, path) + wick[:, 0], high)
+        bar_low = np.maximum(np.minimum(bar_open, path) - wick[:, 1], low)
+        bar_volume = np.round(volume * rng.dirichlet(np.ones(n_bars)))
+
+        index = day + SESSION_OPEN + pd.to_timedelta(np.arange(n_bars) * minutes, unit='min')
+        frames.append(pd.DataFrame({
+            'Open': bar_open,
+            'High': bar_high,
+            'Low': bar_low,
+            'Close': path,
+            'Volume': bar_volume,
+        }, index=index))
+
+    df = pd.concat(frames)
+    df.index = df.index.tz_localize(INTRADAY_TZ)
+    df.index.name = 'Datetime'
+
+    return df
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Offline provider serving deterministic random-walk bars for a
+    universe of n_tickers synthetic names (plus SPY for the macro
+    filter), so the screener, backtest screener and simulator can run
+    at any scale without a network.
+    """
+
+    rate_limited = False
+
+    def __init__(self, n_tickers=3000, seed=0):
+        self.tickers = synthetic_tickers(n_tickers)
+        self.seed = seed
+
+    def daily(self, tickers, start, end, threads=True):
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        data = synthetic_daily(list(tickers), start, end, seed=self.seed)
+        return data if len(data) else pd.DataFrame()
+
+    def intraday(self, ticker, start, end, interval='15m'):
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        if start.tzinfo is not None:
+            start = start.tz_convert(INTRADAY_TZ).tz_localize(None)
+        if end.tzinfo is not None:
+            end = end.tz_convert(INTRADAY_TZ).tz_localize(None)
+
+        df = synthetic_intraday(ticker, start.normalize(), end.normalize() + pd.Timedelta(days=1), interval, self.seed)
+        if df.empty:
+            return df
+
+        start = start.tz_localize(INTRADAY_TZ)
+        end = end.tz_localize(INTRADAY_TZ)
+
+        return df.loc[(df.index >= start) & (df.index < end)]
+
+    def universe(self):
+        return list(self.tickers)
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from continuation_screener.data.panel import panel_tickers, panel_fields
+
+def shard_bounds(n_tickers, n_shards):
+    """
+    Splits n_tickers columns into at most n_shards contiguous (lo, hi) ranges.
+    """
+
+    n_shards = max(1, min(n_shards, n_tickers))
+    edges = np.linspace(0, n_tickers, n_shards + 1).round().astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+def write_shared_panel(panel, path):
+    """
+    Writes a (field, ticker) wide panel to path as one float64
+    (fields x dates x tickers) .npy file that workers memory-map.
+    Returns the metadata needed to rebuild frames from it.
+    """
+
+    fields = panel_fields(panel)
+    tickers = panel_tickers(panel)
+
+    arr = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(len(fields), len(panel), len(tickers)))
+    for i, field in enumerate(fields):
+        arr[i] = panel[field].reindex(columns=tickers).to_numpy(dtype=np.float64)
+    arr.flush()
+    del arr
+
+    return {'path': path, 'index': panel.index, 'fields': fields, 'tickers': tickers}
+
+def shard_frame(arr, meta, lo, hi):
+    """
+    Rebuilds the wide panel for tickers[lo:hi] from the shared array.
+    """
+
+    fields = meta['fields']
+    tickers = meta['tickers'][lo:hi]
+
+    values = np.concatenate([arr[i, :, lo:hi] for i in range(len(fields))], axis=1)
+    columns = pd.MultiIndex.from_product([fields, tickers])
+
+    return pd.DataFrame(values, index=meta['index'], columns=columns)
+
+_worker_panel = None
+_worker_meta = None
+
+def _init_worker(meta):
+    global _worker_panel, _worker_meta
+    _worker_meta = meta
+    _worker_panel = np.load(meta['path'], mmap_mode='r')
+
+def _screen_shard(task):
+    func, lo, hi, args = task
+    return func(shard_frame(_worker_panel, _worker_meta, lo, hi), *args)
+
+def screen_parallel(panel, func, args=(), workers=None, shards_per_worker=4):
+    """
+    Runs func(shard_panel, *args) over contiguous ticker shards of panel in
+    a process pool and returns the results in ticker order.
+
+    The panel is written once to a memory-mapped file that every worker
+    maps read-only, so only shard bounds travel with each task. func must
+    be a module-level function and must treat tickers independently.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    n_tickers = len(panel_tickers(panel))
+    bounds = shard_bounds(n_tickers, workers * shards_per_worker)
+
+    with tempfile.TemporaryDirectory(prefix='screen_') as tmp:
+        meta = write_shared_panel(panel, os.path.join(tmp, 'panel.npy'))
+
+        tasks = [(func, lo, hi, args) for lo, hi in bounds]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(meta,)) as pool:
+            return list(pool.map(_screen_shard, tasks))
@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import tempfile
+import pandas as pd
+
+from continuation_screener.data.indicators import panel_emas, panel_atr, panel_rsi
+from continuation_screener.data.panel import panel_tickers, missing_rows, select_tickers
+from continuation_screener.trend_screener import (
+    avg_volume_mask, stacked_emas_mask, balanced_atr_mask, balanced_rsi_mask, ema_bounce_counts
+)
+
+# calendar days of bars the liquidity gate needs (20 sessions plus holidays)
+LIQUIDITY_LOOKBACK = 45
+
+# rows every filter looks back over once indicators are warmed up
+PLAN_TAIL = 20
+
+GATES = ('vol', 'nan')
+DEFAULT_ORDER = ('ema', 'atr', 'rsi', 'bounce')
+
+STAGE_INDICATORS = {
+    'vol': (),
+    'nan': (),
+    'ema': ('EMA_9', 'EMA_20', 'EMA_50', 'EMA_200', 'ATR_14'),
+    'atr': ('ATR_14',),
+    'rsi': ('RSI_14',),
+    'bounce': ('EMA_9',),
+}
+
+def compute_indicator(panel, name):
+    """
+    Computes a single panel indicator by name.
+    """
+
+    close = panel['Close']
+
+    if name.startswith('EMA_'):
+        return panel_emas(close, (int(name[4:]),))[name]
+    if name == 'ATR_14':
+        return panel_atr(panel['High'], panel['Low'], close)[1]
+    if name == 'RSI_14':
+        return panel_rsi(close)
+
+    raise ValueError(f'unknown indicator: {name}')
+
+def stage_mask(name, panel, ind):
+    """
+    Last-row pass mask of one filter stage, plus the bounce scores for
+    the bounce stage. panel and ind only need the last PLAN_TAIL rows,
+    except for the NaN test which looks at the whole history.
+    """
+
+    if name == 'nan':
+        return ~missing_rows(panel).any(), None
+    if name == 'vol':
+        return avg_volume_mask(panel).iloc[-1], None
+    if name == 'ema':
+        return stacked_emas_mask(panel, ind).iloc[-1], None
+    if name == 'atr':
+        return balanced_atr_mask(panel, ind).iloc[-1], None
+    if name == 'rsi':
+        return balanced_rsi_mask(panel, ind).iloc[-1], None
+    if name == 'bounce':
+        scores = ema_bounce_counts(panel, ind).iloc[-1]
+        return scores >= 2, scores
+
+    raise ValueError(f'unknown stage: {name}')
+
+class FilterPlanner:
+    """
+    Runs the screen as a cascade over shrinking ticker sets.
+
+    The liquidity gate needs only recent closes and volume, so it runs
+    first and can prune the universe before any history is loaded. Each
+    later stage computes just the indicators it needs, for the tickers
+    still alive. Per-stage tickers evaluated, passed and seconds spent are
+    accumulated (and persisted to stats_path); once every indicator stage
+    has been measured they run cheapest-per-rejection first.
+    """
+
+    def __init__(self, stats_path=None):
+        self.stats_path = stats_path
+        self.stats = {}
+
+        if stats_path is not None and os.path.exists(stats_path):
+            with open(stats_path) as f:
+                self.stats = json.load(f)
+
+    def _record(self, name, evaluated, passed, seconds):
+        entry = self.stats.setdefault(name, {'runs': 0, 'evaluated': 0, 'passed': 0, 'seconds': 0.0})
+        entry['runs'] += 1
+        entry['evaluated'] += int(evaluated)
+        entry['passed'] += int(passed)
+        entry['seconds'] += float(seconds)
+
+    def selectivity(self):
+        """
+        Returns the accumulated stats per stage: pass rate, seconds per
+        evaluated ticker and the rank used for ordering (lower runs first).
+        """
+
+        rows = []
+        for name, entry in self.stats.items():
+            evaluated = max(entry['evaluated'], 1)
+            pass_rate = entry['passed'] / evaluated
+            cost = entry['seconds'] / evaluated
+            rows.append({
+                'stage': name,
+                'runs': entry['runs'],
+                'evaluated': entry['evaluated'],
+                'passed': entry['passed'],
+                'pass_rate': pass_rate,
+                'cost_per_ticker': cost,
+                'rank': cost / max(1 - pass_rate, 1e-9),
+            })
+
+        return pd.DataFrame(rows, columns=['stage', 'runs', 'evaluated', 'passed', 'pass_rate', 'cost_per_ticker', 'rank']).set_index('stage')
+
+    def order(self):
+        """
+        Order of the indicator stages for the next run.
+        """
+
+        if not all(name in self.stats for name in DEFAULT_ORDER):
+            return list(DEFAULT_ORDER)
+
+        rank = self.selectivity()['rank']
+        return sorted(DEFAULT_ORDER, key=lambda name: rank[name])
+
+    def stages(self):
+        """
+        Every stage in the order the next run applies them,
+        liquidity gate first.
+        """
+
+        return list(GATES) + self.order()
+
+    def save(self):
+        """
+        Atomically writes the accumulated stats to stats_path.
+        """
+
+        if self.stats_path is None:
+            return
+
+        root = os.path.dirname(os.path.abspath(self.stats_path))
+        os.makedirs(root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=root, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.stats, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.stats_path)
+
+    def gate(self, panel):
+        """
+        Applies the liquidity stage to a panel of recent bars.
+        Returns the surviving tickers and how many failed.
+        """
+
+        tickers = panel_tickers(panel)
+
+        start = time.perf_counter()
+        mask, _ = stage_mask('vol', panel.iloc[-PLAN_TAIL:], None)
+        passed = tickers[mask.reindex(tickers, fill_value=False).to_numpy(dtype=bool)]
+        self._record('vol', len(tickers), len(passed), time.perf_counter() - start)
+
+        return list(passed), len(tickers) - len(passed)
+
+    def run(self, panel, gated=False):
+        """
+        Runs the cascade on the last row of a full-history panel.
+        Returns the same (passing tickers, fails per stage) as
+        screen_snapshot; a ticker's failure is counted at the first
+        stage that rejects it, and fails is keyed in the order the
+        stages ran. With gated=True the liquidity stage is assumed to
+        have been applied by gate().
+        """
+
+        alive = panel_tickers(panel)
+
+        stages = self.stages()
+        fails = dict.fromkeys(stages, 0)
+
+        ind = {}
+        scores = None
+
+        for name in stages[1:] if gated else stages:
+            if not len(alive):
+                break
+
+            start = time.perf_counter()
+
+            sub = select_tickers(panel, alive)
+            for indicator in STAGE_INDICATORS[name]:
+                if indicator not in ind or not alive.isin(ind[indicator].columns).all():
+                    ind[indicator] = compute_indicator(sub, indicator)
+
+            tail_ind = {k: v.reindex(columns=alive).iloc[-PLAN_TAIL:] for k, v in ind.items()}
+            tail = sub if name == 'nan' else sub.iloc[-PLAN_TAIL:]
+
+            mask, stage_scores = stage_mask(name, tail, tail_ind)
+            if stage_scores is not None:
+                scores = stage_scores
+
+            passed = alive[mask.reindex(alive, fill_value=False).to_numpy(dtype=bool)]
+            self._record(name, len(alive), len(passed), time.perf_counter() - start)
+
+            fails[name] = len(alive) - len(passed)
+            alive = passed
+
+        strong = []
+        for ticker in alive:
+            strong.append({
+                'Ticker': ticker,
+                '# of EMA BOUNCES': int(scores[ticker])
+            })
+
+        return strong, fails
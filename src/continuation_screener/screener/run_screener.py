@@ -1,29 +1,190 @@
 import pandas as pd
-import numpy as np
-import yfinance as yf
 import pytz
-from tqdm import tqdm
 from datetime import datetime, timedelta
 
-from continuation_screener.utils.get_iwv import get_iwv_tickers
-from continuation_screener.data.dailydata import get_daily_data
-from continuation_screener.trend_screener import stacked_emas, balanced_atr, balanced_rsi, ema_bounce_score, avg_volume
+from continuation_screener.data.dailydata import get_daily_data, iter_daily_data
+from continuation_screener.data.indicator_state import IndicatorState
+from continuation_screener.data.indicators import panel_indicators
+from continuation_screener.data.panel import panel_tickers, missing_rows
+from continuation_screener.data.providers import default_provider
+from continuation_screener.data.regime import regime_on
+from continuation_screener.screener.parallel import screen_parallel
+from continuation_screener.screener.planner import LIQUIDITY_LOOKBACK
+from continuation_screener.trend_screener import screen_masks
+from continuation_screener.utils.metrics import Metrics
 
-def run_screener(as_of_date=None):
+FAIL_STAGES = ('nan', 'vol', 'ema', 'atr', 'rsi', 'bounce')
+
+def screen_snapshot(raw_data, ind=None, valid=None):
+    """
+    Runs the filter cascade on the last row of raw_data.
+    Returns the passing tickers, in column order, and the number
+    of tickers each stage removed. valid replaces the NaN test
+    when raw_data is only the tail of each ticker's history.
+    """
+
+    available = panel_tickers(raw_data)
+
+    if valid is None:
+        has_nan = missing_rows(raw_data).any().reindex(available)
+    else:
+        has_nan = ~valid.reindex(available, fill_value=False)
+
+    masks, scores = screen_masks(raw_data, ind)
+    last = {name: mask.iloc[-1].reindex(available) for name, mask in masks.items()}
+
+    alive = ~has_nan
+    fails = {'nan': int(has_nan.sum())}
+    for name in ('vol', 'ema', 'atr', 'rsi', 'bounce'):
+        fails[name] = int((alive & ~last[name]).sum())
+        alive &= last[name]
+
+    last_scores = scores.iloc[-1].reindex(available)
+
+    strong = []
+    for ticker in available[alive.to_numpy()]:
+        strong.append({
+            'Ticker': ticker,
+            '# of EMA BOUNCES': int(last_scores[ticker])
+        })
+
+    return strong, fails
+
+def merge_snapshots(results):
+    """
+    Combines screen_snapshot results from ticker shards, in shard order.
+    """
+
+    strong, fails = [], dict.fromkeys(FAIL_STAGES, 0)
+    for shard_strong, shard_fails in results:
+        strong.extend(shard_strong)
+        for name in FAIL_STAGES:
+            fails[name] += shard_fails[name]
+
+    return strong, fails
+
+def screen_with_state(tickers, as_of_date, state_dir, store=None, provider=None, max_age=5, metrics=None):
+    """
+    Screens from the indicator state persisted in state_dir.
+    Tickers with current state only download the bars since their last
+    run; new, stale or price-adjusted tickers are downloaded with the full
+    lookback and recomputed. The updated state is saved back.
+    Returns the screen_snapshot results of both groups.
+    """
+
+    yf_tickers = [t.replace('.', '-') for t in tickers]
+
+    state = IndicatorState.load(state_dir)
+    state = state.select(state.tickers.isin(yf_tickers) & ~state.stale(as_of_date, max_age))
+
+    dropped = []
+    if len(state):
+        new_bars = get_daily_data(
+            list(state.tickers), as_of_date, start_date=pd.Timestamp(state.date.min()),
+            store=store, provider=provider, lookback=0, min_rows=1, metrics=metrics
+            )
+        dropped = state.update(new_bars.loc[new_bars.index <= as_of_date])
+        print(f'Updated indicator state for {len(state)} tickers, {len(dropped)} need a full recompute.')
+
+    results = []
+
+    if len(state):
+        tail, ind = state.tail_panel()
+        results.append(screen_snapshot(tail, ind, state.valid(as_of_date)))
+
+    full = [t for t in yf_tickers if t not in state]
+    if full:
+        raw_data = get_daily_data(full, as_of_date=as_of_date, store=store, provider=provider, metrics=metrics)
+        raw_data = raw_data.loc[raw_data.index <= as_of_date]
+
+        if len(raw_data) >= 210:
+            ind = panel_indicators(raw_data)
+            results.append(screen_snapshot(raw_data, ind))
+            state = state.merge(IndicatorState.from_panel(raw_data, ind))
+
+    state.save(state_dir)
+
+    return merge_snapshots(results)
+
+def screen_planned(tickers, as_of_date, planner, store=None, provider=None, metrics=None):
+    """
+    Screens through a FilterPlanner. With a BarStore the liquidity gate
+    runs on the last few weeks of bars for the whole universe and the
+    full history is only read for the tickers that pass it.
+    """
+
+    gated = False
+    vol_fails = 0
+
+    if store is not None:
+        recent = get_daily_data(tickers, as_of_date, store=store, provider=provider, lookback=LIQUIDITY_LOOKBACK, metrics=metrics)
+        recent = recent.loc[recent.index <= as_of_date]
+        tickers, vol_fails = planner.gate(recent)
+        gated = True
+        print(f'{len(tickers)} tickers passed the liquidity gate.')
+
+    strong, fails = [], dict.fromkeys(planner.stages(), 0)
+
+    if tickers:
+        raw_data = get_daily_data(tickers, as_of_date=as_of_date, store=store, provider=provider, metrics=metrics)
+        raw_data = raw_data.loc[raw_data.index <= as_of_date]
+
+        if len(raw_data) >= 210:
+            strong, fails = planner.run(raw_data, gated=gated)
+
+    if gated:
+        fails['vol'] = vol_fails
+
+    planner.save()
+
+    return strong, fails
+
+def screen_stream(tickers, as_of_date, store=None, provider=None, metrics=None):
+    """
+    Screens each batch of daily bars as soon as it has downloaded,
+    while the next batch is still in flight. Passing tickers are
+    printed per batch and the results merged at the end.
+    """
+
+    results = []
+
+    for raw_data in iter_daily_data(tickers, as_of_date, store=store, provider=provider, metrics=metrics):
+        raw_data = raw_data.loc[raw_data.index <= as_of_date]
+
+        if len(raw_data) < 210:
+            continue
+
+        strong, fails = screen_snapshot(raw_data)
+        results.append((strong, fails))
+
+        if strong:
+            print('Passed:', ', '.join(row['Ticker'] for row in strong))
+
+    return merge_snapshots(results)
+
+def run_screener(as_of_date=None, store=None, provider=None, workers=1, state_dir=None, planner=None, stream=False, compact=False, universe=None, metrics=None):
     """
     Macro filter -> Data fetching -> Strategy filters.
     Returns DataFrame of passed tickers.
+    Pass a BarStore to read daily bars from the local store and a
+    MarketDataProvider to run against something other than yfinance.
+    workers > 1 screens ticker shards in that many processes,
+    None uses every core. With state_dir, indicators are carried over
+    from the previous run and only new bars are downloaded. A
+    FilterPlanner runs the cheap liquidity filter first and computes
+    indicators only for the tickers that survive it. stream=True
+    screens each download batch while the next one downloads.
+    compact=True screens a float32 Panel instead of the wide frame.
+    A UniverseStore serves the constituents from its local snapshot.
+    Stage timings, the filter funnel and download stats are recorded in
+    metrics and written out at the end of the run.
     """
     
-    spy = yf.download('SPY', period='300d', interval='1d', progress=False)
-    spy['SMA200'] = spy['Close'].rolling(window=200).mean()
+    if provider is None:
+        provider = default_provider()
 
-    current_spy = spy['Close'].iloc[-1].item()
-    current_sma = spy['SMA200'].iloc[-1].item()
-
-    if current_spy < current_sma:
-        print('Market is not suitable for continuation trading, buy some gold.')
-        return pd.DataFrame()
+    if metrics is None:
+        metrics = Metrics()
 
     if as_of_date is None:
         now_ny = datetime.now(pytz.timezone('US/Eastern'))
@@ -36,77 +197,59 @@ def run_screener(as_of_date=None):
     else:
         as_of_date = pd.to_datetime(as_of_date).normalize()
 
-    tickers = get_iwv_tickers()
-    
-    raw_data = get_daily_data(tickers, as_of_date=as_of_date)
+    with metrics.stage('regime'):
+        regime = regime_on(as_of_date, store=store, provider=provider)
 
-    available = raw_data.columns.get_level_values(1).unique()
+    metrics.set('regime_on', int(regime))
 
-    strong = []
-
-    fail_nan = 0
-    fail_vol = 0
-    fail_ema = 0
-    fail_atr = 0
-    fail_rsi = 0
-
-    max_retries = 5
-    retrydelay = 0.5
-
-    for ticker in tqdm(available, desc='Screening tickers...'):
-        
-        df = raw_data.xs(ticker, axis=1, level=1).copy()
+    if not regime:
+        print('Market is not suitable for continuation trading, buy some gold.')
+        metrics.write()
+        return pd.DataFrame()
 
-        if int(df.shape[0]) < 210:
-            continue
+    with metrics.stage('universe'):
+        tickers = universe.current() if universe is not None else provider.universe()
+    
+    strong, fails = [], dict.fromkeys(FAIL_STAGES, 0)
 
-        df = df.loc[df.index <= as_of_date].copy()
-        if df.empty or df.isna().any().any():
-            fail_nan += 1
-            continue
+    if state_dir is not None:
+        with metrics.stage('screen_state'):
+            strong, fails = screen_with_state(tickers, as_of_date, state_dir, store, provider, metrics=metrics)
 
-        if df.isna().any().any():
-            fail_nan += 1
-            continue
+    elif stream:
+        with metrics.stage('screen_stream'):
+            strong, fails = screen_stream(tickers, as_of_date, store, provider, metrics=metrics)
 
-        df = avg_volume(df)
-        if df is None:
-            fail_vol += 1
-            continue
+    elif planner is not None:
+        with metrics.stage('screen_planned'):
+            strong, fails = screen_planned(tickers, as_of_date, planner, store, provider, metrics=metrics)
 
-        df = stacked_emas(df)
-        if df is None:
-            fail_ema += 1
-            continue
+    else:
+        with metrics.stage('download'):
+            raw_data = get_daily_data(tickers, as_of_date=as_of_date, store=store, provider=provider, compact=compact, metrics=metrics)
 
-        df = balanced_atr(df)
-        if df is None:
-            fail_atr += 1
-            continue
+        raw_data = raw_data.loc[raw_data.index <= as_of_date]
 
-        df = balanced_rsi(df)
-        if df is None:
-            fail_rsi += 1
-            continue
+        with metrics.stage('screen'):
+            if len(raw_data) >= 210 and workers == 1:
+                strong, fails = screen_snapshot(raw_data)
+            elif len(raw_data) >= 210:
+                strong, fails = merge_snapshots(screen_parallel(raw_data, screen_snapshot, workers=workers))
 
-        score = ema_bounce_score(df)
-        if score is None:
-            continue
-
-        strong.append({
-            'Ticker': ticker,
-            '# of EMA BOUNCES': score
-        })
+    metrics.set('tickers_total', len(tickers))
+    metrics.set('tickers_passed', len(strong))
+    # fails is keyed in the order the stages ran, which a planner may change
+    stages = tuple(fails)
+    metrics.funnel(len(tickers), fails, stages, passed=len(strong))
+    metrics.write()
 
     final_df = pd.DataFrame(strong)
 
     print('~'*30)
     print("TOTAL:", len(tickers))
-    print("FAIL NAN TEST:", fail_nan)
-    print("FAIL VOL TEST:", fail_vol)
-    print("FAIL EMA TEST:", fail_ema)
-    print("FAIL ATR TEST:", fail_atr)
-    print("FAIL RSI TEST:", fail_rsi)
+    for name in stages:
+        if name != 'bounce':
+            print(f"FAIL {name.upper()} TEST:", fails[name])
     print('~'*30)
 
     if final_df.empty:
@@ -1,79 +1,55 @@
 import pandas as pd
-import yfinance as yf
-from tqdm import tqdm
 
-from continuation_screener.utils.get_iwv import get_iwv_tickers
 from continuation_screener.data.dailydata import get_daily_data
-from continuation_screener.trend_screener import stacked_emas, balanced_atr, balanced_rsi, ema_bounce_score, avg_volume
-
-def run_screener_bt(start_date, end_date):
+from continuation_screener.data.panel import panel_tickers
+from continuation_screener.data.providers import default_provider
+from continuation_screener.data.regime import regime_mask
+from continuation_screener.screener.parallel import screen_parallel
+from continuation_screener.trend_screener import screen_masks, history_mask
+from continuation_screener.utils.metrics import Metrics
+
+def screen_history(raw_data, start_day, end_day, window=300, min_rows=210, membership=None, regime=None):
     """
-    Simulates the screening process over a historical date range.
-    Generates a list of tickers to be processed by the simulator.
+    Evaluates every filter once over the full history and returns the
+    (date, Ticker) frame of passes for each trading day in [start_day, end_day].
+    A ticker is only considered on days with at least min_rows bars of history
+    and no missing values in the trailing window, and, given a (dates x tickers)
+    membership mask, only on days it was in the universe. Given a per-date
+    regime mask, days in a bad market regime pass nothing.
     """
 
-    spy = yf.download('SPY', period='300d', interval='1d', progress=False)
-    spy['SMA200'] = spy['Close'].rolling(window=200).mean()
+    raw_data = raw_data.copy()
+    raw_data.index = raw_data.index.normalize()
 
-    current_spy = spy['Close'].iloc[-1].item()
-    current_sma = spy['SMA200'].iloc[-1].item()
+    available = panel_tickers(raw_data)
 
-    if current_spy < current_sma:
-        print('Market is not suitable for continuation trading, buy some gold.')
-        return pd.DataFrame()
+    masks, scores = screen_masks(raw_data)
 
-    window = 300
+    passed = history_mask(raw_data, window, min_rows).to_numpy()
+    for mask in masks.values():
+        passed = passed & mask.reindex(columns=available).to_numpy()
 
-    start_day = pd.to_datetime(start_date).normalize()
-    end_day = pd.to_datetime(end_date).normalize()
+    if membership is not None:
+        passed = passed & membership.reindex(index=raw_data.index, columns=available, fill_value=False).to_numpy(dtype=bool)
+
+    if regime is not None:
+        passed = passed & regime.reindex(raw_data.index, fill_value=False).to_numpy(dtype=bool)[:, None]
 
-    tickers = get_iwv_tickers()
-    
-    raw_data_full = get_daily_data(tickers, end_day, bt_mode=True)
-
-    available = raw_data_full.columns.get_level_values(1).unique()
-    
-    section = raw_data_full.xs(available[0], axis=1, level=1)
-    eval_days = section.loc[
-        (section.index >= start_day) & (section.index <= end_day)
-        ].index.normalize()
-    
-    passes = []   
-    print('Rolling-window ticker evaluation...')
-
-    for ticker in tqdm(available, desc='Precomputing...'):
-        df = raw_data_full.xs(ticker, axis=1, level=1).copy()
-        df.index = df.index.normalize()
-
-        for day in eval_days:
-            df_slice = df.loc[df.index <= day].tail(window).copy()
-
-            if len(df_slice) < 210 or df_slice.isna().any().any():
-                continue
-
-            if avg_volume(df_slice) is None:
-                continue
-            if stacked_emas(df_slice) is None:
-                continue
-            if balanced_atr(df_slice) is None:
-                continue
-            if balanced_rsi(df_slice) is None:
-                continue
-
-            score = ema_bounce_score(df_slice)
-            if score is None:
-                continue
-
-            passes.append({
-                'date': day,
-                'Ticker': ticker,
-                '# of EMA BOUNCES': score,
-            })
-
-    if not passes:
+    eval_days = (raw_data.index >= start_day) & (raw_data.index <= end_day)
+    passed = passed[eval_days]
+
+    if not passed.any():
         return None
 
-    df_final = pd.DataFrame(passes)
+    # ticker-major order, matching the per-ticker loop this replaces
+    ticker_idx, day_idx = passed.T.nonzero()
+    score_values = scores.reindex(columns=available).to_numpy()[eval_days]
+
+    df_final = pd.DataFrame({
+        'date': raw_data.index[eval_days][day_idx],
+        'Ticker': available[ticker_idx],
+        '# of EMA BOUNCES': score_values[day_idx, ticker_idx].astype(int),
+    })
     df_final = df_final.sort_values(
         ['date', '# of EMA BOUNCES'],
         ascending = [True,False]
@@ -81,5 +57,89 @@ def run_screener_bt(start_date, end_date):
 
     return df_final
 
+def screen_history_parallel(raw_data, start_day, end_day, workers=None, membership=None, regime=None):
+    """
+    screen_history over ticker shards in a process pool.
+    Returns the same frame, in the same order, as the serial run.
+    """
+
+    raw_data = raw_data.copy()
+    raw_data.index = raw_data.index.normalize()
+
+    frames = [df for df in screen_parallel(raw_data, screen_history, (start_day, end_day, 300, 210, membership, regime), workers=workers) if df is not None]
+
+    if not frames:
+        return None
+
+    # shards arrive in ticker order and the sort is stable, so ties keep
+    # the ticker-major order of the serial run
+    return pd.concat(frames).sort_values(
+        ['date', '# of EMA BOUNCES'],
+        ascending = [True,False],
+        kind = 'stable'
+    )
+
+def run_screener_bt(start_date, end_date, store=None, provider=None, workers=1, compact=False, universe=None, metrics=None, lookback=350):
+    """
+    Simulates the screening process over a historical date range.
+    Generates a list of tickers to be processed by the simulator.
+    Indicators are computed once over the full history rather than
+    per day, see screen_history. Pass a BarStore to read daily
+    bars from the local store and a MarketDataProvider to run against
+    something other than yfinance. workers > 1 screens ticker shards
+    in that many processes, None uses every core. compact=True
+    screens a float32 Panel instead of the wide frame. With a
+    UniverseStore each day is screened against that day's constituents
+    instead of today's. The SPY regime is checked per day as well.
+    Stage timings and download stats are recorded in metrics and
+    written out at the end. lookback is the indicator warm-up in
+    calendar days downloaded before start_date.
+    """
+
+    if provider is None:
+        provider = default_provider()
+
+    if metrics is None:
+        metrics = Metrics(run='screener_bt')
+
+    start_day = pd.to_datetime(start_date).normalize()
+    end_day = pd.to_datetime(end_date).normalize()
+
+    with metrics.stage('regime'):
+        regime = regime_mask(start_day, end_day, store=store, provider=provider)
+
+    metrics.set('regime_days', len(regime))
+    metrics.set('regime_on_days', int(regime.sum()))
+
+    if not regime.any():
+        print('Market is not suitable for continuation trading, buy some gold.')
+        metrics.write()
+        return pd.DataFrame()
+
+    membership = None
+
+    with metrics.stage('universe'):
+        if universe is not None:
+            membership = universe.membership(pd.bdate_range(start_day, end_day))
+            membership.columns = [t.replace('.', '-') for t in membership.columns]
+            tickers = list(membership.columns)
+        else:
+            tickers = provider.universe()
+
+    metrics.set('tickers_total', len(tickers))
+
+    with metrics.stage('download'):
+        raw_data_full = get_daily_data(tickers, end_day, bt_mode=True, start_date=start_day, store=store, provider=provider, compact=compact, metrics=metrics, lookback=lookback)
+
+    print('Evaluating screen over full history...')
+
+    with metrics.stage('screen'):
+        if workers == 1:
+            candidates = screen_history(raw_data_full, start_day, end_day, membership=membership, regime=regime)
+        else:
+            candidates = screen_history_parallel(raw_data_full, start_day, end_day, workers, membership, regime)
+
+    metrics.set('candidates', 0 if candidates is None else len(candidates))
+    metrics.write()
 
-        
+    return candidates
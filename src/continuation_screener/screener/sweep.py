@@ -0,0 +1,128 @@
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from continuation_screener.data.indicators import panel_indicators
+from continuation_screener.data.panel import panel_tickers
+from continuation_screener.trend_screener import (
+    stacked_emas_features, stacked_emas_pass, atr_pct_average, rsi_average,
+    ema_bounce_counts, average_volume, avg_volume_pass, history_mask
+)
+
+SWEEP_DEFAULTS = {
+    'slope_thresh': 0.012,
+    'dist_thresh': 0.75,
+    'depth_thresh': -0.8,
+    'low_atr': 0.009,
+    'high_atr': 0.047,
+    'low_rsi': 50,
+    'high_rsi': 78,
+    'min_avg_vol': 1000000,
+    'min_price': 20.00,
+    'rvol_factor': 1.05,
+    'cushion': 0.005,
+}
+
+def sweep_features(panel, rows, cushions=(0.005,), ind=None, window=300, min_rows=210):
+    """
+    Precomputes every threshold-free screening input once and keeps only the
+    evaluated rows, as plain (rows x tickers) arrays.
+    """
+
+    if ind is None:
+        ind = panel_indicators(panel)
+
+    tickers = panel_tickers(panel)
+
+    def take(frame):
+        return frame.reindex(columns=tickers).to_numpy()[rows]
+
+    features = {name: take(frame) for name, frame in stacked_emas_features(panel, ind).items()}
+    features['atr_avg'] = take(atr_pct_average(panel, ind))
+    features['rsi_avg'] = take(rsi_average(ind))
+    features['close'] = take(panel['Close'])
+    features['volume'] = take(panel['Volume'])
+    features['avg_vol'] = take(average_volume(panel))
+    features['valid'] = take(history_mask(panel, window, min_rows))
+    features['bounces'] = {cushion: take(ema_bounce_counts(panel, ind, cushion=cushion)) for cushion in cushions}
+
+    return features
+
+def evaluate(features, params):
+    """
+    Applies one parameter combination to precomputed features.
+    Returns the (rows x tickers) pass mask.
+    """
+
+    p = {**SWEEP_DEFAULTS, **params}
+
+    with np.errstate(invalid='ignore'):
+        passed = features['valid'] & avg_volume_pass(
+            features['close'], features['volume'], features['avg_vol'],
+            p['min_avg_vol'], p['min_price'], p['rvol_factor']
+            )
+        passed &= stacked_emas_pass(features, p['slope_thresh'], p['dist_thresh'], p['depth_thresh'])
+        passed &= (features['atr_avg'] >= p['low_atr']) & (features['atr_avg'] <= p['high_atr'])
+        passed &= (features['rsi_avg'] >= p['low_rsi']) & (features['rsi_avg'] <= p['high_rsi'])
+        passed &= features['bounces'][p['cushion']] >= 2
+
+    return passed
+
+_worker_features = None
+
+def _init_worker(features):
+    global _worker_features
+    _worker_features = features
+
+def _count(combos, features=None):
+    features = _worker_features if features is None else features
+
+    results = []
+    for params in combos:
+        passed = evaluate(features, params)
+        results.append({
+            **params,
+            'candidates': int(passed.sum()),
+            'tickers': int(passed.any(axis=0).sum()),
+            'days': int(passed.any(axis=1).sum()),
+        })
+    return results
+
+def sweep(panel, grid, start_day=None, end_day=None, processes=None, chunk_size=64):
+    """
+    Evaluates every combination of the screener thresholds in grid
+    (name -> list of values, names from SWEEP_DEFAULTS) against one set of
+    precomputed indicators. Without a date range only the last row is
+    screened, as in run_screener. Combinations are spread across a process
+    pool; processes=1 runs inline. Returns one row per combination with
+    the number of passing (date, ticker) candidates.
+    """
+
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f'unknown sweep parameters: {sorted(unknown)}')
+
+    index = panel.index.normalize()
+    if start_day is None and end_day is None:
+        rows = np.arange(len(index))[-1:]
+    else:
+        start_day = index[0] if start_day is None else pd.to_datetime(start_day).normalize()
+        end_day = index[-1] if end_day is None else pd.to_datetime(end_day).normalize()
+        rows = np.flatnonzero((index >= start_day) & (index <= end_day))
+
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+    cushions = tuple(grid.get('cushion', [SWEEP_DEFAULTS['cushion']]))
+    features = sweep_features(panel, rows, cushions)
+
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+
+    if processes == 1 or len(chunks) <= 1:
+        results = [r for chunk in chunks for r in _count(chunk, features)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(features,)) as pool:
+            results = [r for chunk_results in pool.map(_count, chunks) for r in chunk_results]
+
+    return pd.DataFrame(results, columns=names + ['candidates', 'tickers', 'days'])
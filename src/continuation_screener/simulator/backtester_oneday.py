@@ -3,9 +3,10 @@ import time
 from continuation_screener.simulator.entry_exit import entry, exits
 from continuation_screener.data.intraday_bt import intraday_bt, daily_bt
 
-def backtest_ticker(ticker, eval_date, debug=False):
+def backtest_windows(eval_date):
     """
-    Simulates Trade for single ticker based on entry/exit markers.
+    Returns the daily and intraday (start, end) windows backtest_ticker
+    requests for a given eval date.
     """
 
     day_of = pd.to_datetime(eval_date)
@@ -16,8 +17,34 @@ def backtest_ticker(ticker, eval_date, debug=False):
     intraday_start = day_of
     intraday_end = day_of + pd.Timedelta(days=11)
 
-    daily_df = daily_bt(ticker, daily_start, daily_end)
-    intraday_df = intraday_bt(ticker, intraday_start, intraday_end)
+    return (daily_start, daily_end), (intraday_start, intraday_end)
+
+def backtest_frames(ticker, eval_date, store=None, provider=None, cache=None):
+    """
+    Prepared (daily_df, intraday_df) for a ticker's eval date, either
+    None when the data could not be fetched.
+    """
+
+    (daily_start, daily_end), (intraday_start, intraday_end) = backtest_windows(eval_date)
+
+    daily_df = daily_bt(ticker, daily_start, daily_end, store=store, provider=provider, cache=cache)
+    intraday_df = intraday_bt(ticker, intraday_start, intraday_end, provider=provider, cache=cache)
+
+    return daily_df, intraday_df
+
+def backtest_ticker(ticker, eval_date, debug=False, store=None, provider=None, cache=None):
+    """
+    Simulates Trade for single ticker based on entry/exit markers.
+    """
+
+    daily_df, intraday_df = backtest_frames(ticker, eval_date, store=store, provider=provider, cache=cache)
+
+    return simulate_trade(ticker, daily_df, intraday_df, debug=debug)
+
+def simulate_trade(ticker, daily_df, intraday_df, debug=False):
+    """
+    Runs entry/exit logic on already prepared daily and intraday frames.
+    """
 
     if daily_df is None or intraday_df is None:
         if debug == True:
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from continuation_screener.data import kernels
+
+EXIT_TYPES = ('stop', 'take_profit', 'max_hold_exit')
+
+TRADE_DTYPE = np.dtype([
+    ('candidate', np.int64),
+    ('ticker', 'U12'),
+    ('entry_time', 'datetime64[ns]'),
+    ('entry_price', np.float64),
+    ('exit_time', 'datetime64[ns]'),
+    ('exit_price', np.float64),
+    ('exit_type', np.int8),
+])
+
+NS_PER_DAY = 86_400_000_000_000
+
+def _last_true(mask):
+    pos = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    return np.where(mask.any(axis=1), pos, -1)
+
+def stack_intraday(intraday_frames):
+    """
+    Pads every candidate's intraday session into aligned (candidates x bars)
+    arrays. Missing candidates and padding are NaN / NaT.
+    """
+
+    n = len(intraday_frames)
+    width = max((len(df) for df in intraday_frames if df is not None), default=0)
+
+    times = np.full((n, width), np.iinfo(np.int64).min, dtype=np.int64)
+    low = np.full((n, width), np.nan)
+    close = np.full((n, width), np.nan)
+    atr = np.full((n, width), np.nan)
+    n_bars = np.zeros(n, dtype=np.int64)
+
+    for i, df in enumerate(intraday_frames):
+        if df is None or df.empty:
+            continue
+        k = len(df)
+        n_bars[i] = k
+        times[i, :k] = df.index.values.astype('datetime64[ns]').view(np.int64)
+        low[i, :k] = df['Low'].to_numpy()
+        close[i, :k] = df['Close'].to_numpy()
+        atr[i, :k] = df['ATR_14'].to_numpy()
+
+    return times, low, close, atr, n_bars
+
+def lookup_daily_ema(daily_frames, bar_days):
+    """
+    Returns the daily EMA_9 for every (candidate, bar) and whether that
+    bar's day exists in the candidate's daily frame, via one sorted-key search.
+    """
+
+    n, width = bar_days.shape
+
+    cand, days, ema = [], [], []
+    for i, df in enumerate(daily_frames):
+        if df is None or df.empty:
+            continue
+        cand.append(np.full(len(df), i, dtype=np.int64))
+        days.append(df.index.values.astype('datetime64[ns]').view(np.int64) // NS_PER_DAY)
+        ema.append(df['EMA_9'].to_numpy(dtype=np.float64))
+
+    if not cand:
+        return np.full((n, width), np.nan), np.zeros((n, width), dtype=bool)
+
+    span = 1 << 32
+    keys = np.concatenate(cand) * span + np.concatenate(days)
+    ema = np.concatenate(ema)
+
+    order = np.argsort(keys, kind='stable')
+    keys, ema = keys[order], ema[order]
+
+    bar_keys = np.arange(n, dtype=np.int64)[:, None] * span + bar_days
+    pos = np.clip(np.searchsorted(keys, bar_keys), 0, len(keys) - 1)
+    known = keys[pos] == bar_keys
+
+    return np.where(known, ema[pos], np.nan), known
+
+def simulate_batch(tickers, daily_frames, intraday_frames, max_hold=8):
+    """
+    Resolves entries and exits for every candidate at once.
+
+    Same rules as entry()/exits(): on the first session day an EMA break
+    followed by a reclaim is an entry unless a bounce came first; afterwards
+    the first stop, take-profit or final max-hold bar closes the trade.
+    Returns a TRADE_DTYPE structured array with one row per candidate that entered.
+    """
+
+    times, low, close, atr, n_bars = stack_intraday(intraday_frames)
+    n, width = close.shape
+
+    if n == 0 or width == 0:
+        return np.zeros(0, dtype=TRADE_DTYPE)
+
+    has_bars = n_bars > 0
+    cols = np.arange(width)
+
+    bar_days = np.where(cols < n_bars[:, None], times // NS_PER_DAY, -1)
+    daily_ema9, known_day = lookup_daily_ema(daily_frames, bar_days)
+
+    first_day = bar_days[:, 0]
+    session = (bar_days == first_day[:, None]) & has_bars[:, None]
+
+    ema_entry = daily_ema9[:, 0]
+    session_nan = (session & (np.isnan(low) | np.isnan(close) | np.isnan(atr))).any(axis=1)
+    eligible = has_bars & known_day[:, 0] & ~np.isnan(ema_entry) & ~session_nan
+
+    reclaim = kernels.entry_scan(low, close, atr, ema_entry, session)
+    entered = eligible & (reclaim >= 0)
+
+    rows = np.flatnonzero(entered)
+    entry_col = reclaim[rows]
+
+    entry_price = close[rows, entry_col]
+    entry_day = first_day[rows]
+
+    max_exit_day = np.busday_offset(entry_day.astype('datetime64[D]'), max_hold, roll='forward').astype(np.int64)
+
+    sub_days = bar_days[rows]
+    sub_close = close[rows]
+    sub_known = known_day[rows]
+
+    with np.errstate(invalid='ignore'):
+        stop_level = daily_ema9[rows] - (atr[rows] * 1.5)
+        tp_level = entry_price * (1 + 0.04)
+
+    final_col = _last_true(sub_days == max_exit_day[:, None])
+
+    hit, exit_type = kernels.exit_scan(sub_close, stop_level, tp_level, sub_known, final_col, entry_col)
+    exit_col = np.where(hit >= 0, hit, n_bars[rows] - 1)
+
+    trades = np.zeros(len(rows), dtype=TRADE_DTYPE)
+    trades['candidate'] = rows
+    trades['ticker'] = np.asarray(tickers, dtype=str)[rows] if len(rows) else []
+    trades['entry_time'] = times[rows, entry_col].view('datetime64[ns]')
+    trades['entry_price'] = entry_price
+    trades['exit_time'] = times[rows, exit_col].view('datetime64[ns]')
+    trades['exit_price'] = close[rows, exit_col]
+    trades['exit_type'] = exit_type
+
+    return trades
+
+def trade_record(trade):
+    """
+    Converts one TRADE_DTYPE row into the dict backtest_ticker returns.
+    """
+
+    entry_price = trade['entry_price']
+    exit_price = trade['exit_price']
+
+    return {
+        'Ticker' : str(trade['ticker']),
+        'Entry Time' : pd.Timestamp(trade['entry_time']),
+        'Entry Price' : round(float(entry_price), 2),
+        'Entry Method' : 'reclaim',
+        'Exit Time' : pd.Timestamp(trade['exit_time']),
+        'Exit Price' : round(float(exit_price), 2),
+        'Exit Type' : EXIT_TYPES[trade['exit_type']],
+        'Net' : round(float(exit_price - entry_price), 2),
+        }
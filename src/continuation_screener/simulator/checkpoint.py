@@ -0,0 +1,166 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+
+from continuation_screener.data.providers import default_provider
+from continuation_screener.simulator.backtester_oneday import backtest_windows
+
+CHECKPOINT_FORMAT = 1
+
+# what simulate_trade does with each candidate; part of the key so a
+# checkpoint written under other rules is never reused
+STRATEGY_PARAMS = {
+    'entry': 'reclaim',
+    'max_hold': 8,
+    'interval': '15m',
+    'stop_atr': 1.5,
+    'take_profit': 0.04,
+    'daily_window': 60,
+    'hold_window': 11,
+}
+
+OUTCOMES = ('trade', 'no_entry', 'data_failure')
+
+TIME_FIELDS = ('Entry Time', 'Exit Time')
+
+def data_version(provider=None, store=None):
+    """
+    Identifies where bars come from: the provider class with its simple
+    settings (root, seed, ...) and the store root.
+    """
+
+    if provider is None:
+        provider = default_provider()
+
+    settings = {k: v for k, v in sorted(vars(provider).items()) if isinstance(v, (str, int, float, bool))}
+    version = {'provider': type(provider).__name__, **settings}
+    if store is not None:
+        version['store'] = store.root
+
+    return version
+
+def checkpoint_key(params=None, version=None):
+    payload = {'format': CHECKPOINT_FORMAT, 'strategy': STRATEGY_PARAMS, 'params': params or {}, 'data': version or {}}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def outcome_of(record, daily_df, intraday_df):
+    if record is not None:
+        return 'trade'
+    if daily_df is None or intraday_df is None or daily_df.empty or intraday_df.empty:
+        return 'data_failure'
+    return 'no_entry'
+
+class Checkpoint:
+    """
+    Append-only JSON lines log of per-(day, ticker) backtest outcomes:
+    the trade, no entry, or a data failure. Every line carries a key
+    hashed from the strategy rules, params and the data version, and
+    only lines under the current key are loaded, so changing any of
+    them starts fresh in the same file.
+
+    run_backtester(checkpoint=...) skips candidates already logged as a
+    trade or no entry and logs the rest as they finish, so a crashed
+    run resumes where it stopped and moving end_date forward only
+    evaluates the new days. Data failures are logged but retried.
+    Outcomes whose backtest window reaches today are not logged, their
+    bars are not final yet. A torn last line from a crash is ignored.
+    """
+
+    def __init__(self, path, provider=None, store=None, params=None, version=None):
+        self.path = path
+        self.version = data_version(provider, store) if version is None else version
+        self.key = checkpoint_key(params, self.version)
+
+        self.outcomes = {}
+        self._file = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('key') != self.key:
+                    continue
+                self.outcomes[(pd.Timestamp(entry['day']), entry['ticker'])] = (entry['outcome'], entry.get('trade'))
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def outcome(self, day, ticker):
+        found = self.outcomes.get((pd.Timestamp(day).normalize(), ticker))
+        return None if found is None else found[0]
+
+    def done(self, day, ticker):
+        return self.outcome(day, ticker) in ('trade', 'no_entry')
+
+    def trade(self, day, ticker):
+        """
+        The logged trade record for a candidate (a fresh dict with
+        Timestamps restored), None for anything else.
+        """
+
+        found = self.outcomes.get((pd.Timestamp(day).normalize(), ticker))
+        if found is None or found[1] is None:
+            return None
+
+        record = dict(found[1])
+        units = record.pop('_units', {})
+        for field in TIME_FIELDS:
+            record[field] = pd.Timestamp(record[field]).as_unit(units.get(field, 'ns'))
+        return record
+
+    def counts(self):
+        counts = dict.fromkeys(OUTCOMES, 0)
+        for outcome, _ in self.outcomes.values():
+            counts[outcome] += 1
+        return counts
+
+    def record(self, day, ticker, record, daily_df=None, intraday_df=None):
+        """
+        Logs the outcome of simulating one candidate. Returns the outcome,
+        or None when the window is still open and nothing was logged.
+        """
+
+        day = pd.Timestamp(day).normalize()
+        if backtest_windows(day)[1][1] >= pd.Timestamp.now().normalize():
+            return None
+
+        outcome = outcome_of(record, daily_df, intraday_df)
+        trade = None
+        if record is not None:
+            trade = {k: v.isoformat() if isinstance(v, pd.Timestamp) else v for k, v in record.items()}
+            trade['_units'] = {k: record[k].unit for k in TIME_FIELDS}
+
+        line = json.dumps({'key': self.key, 'day': day.strftime('%Y-%m-%d'), 'ticker': ticker, 'outcome': outcome, 'trade': trade}, default=str)
+
+        with self._lock:
+            if self._file is None:
+                root = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(root, exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.outcomes[(day, ticker)] = (outcome, trade)
+
+        return outcome
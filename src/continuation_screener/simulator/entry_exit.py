@@ -1,30 +1,47 @@
+import numpy as np
 import pandas as pd
-import time
+
+from continuation_screener.data import kernels
+
+def first_true(mask, start=0):
+    """
+    Position of the first True in mask at or after start, or None.
+    """
+
+    hits = np.flatnonzero(mask[start:])
+    return start + int(hits[0]) if len(hits) else None
 
 def entry(intraday_df, daily_df, debug=False, mode='backtest'):
     """
     Returns Entry markers based on EMA reclaim.
     Testing found that for this strategy, bounces tend to result
     in negative return expectancy, and subsequently are particularly avoided.
+    Bars are scanned as arrays: the first EMA break is found, any bounce
+    before it cancels the setup, and the first close back above the daily
+    EMA_9 after the break is the entry (see kernels.entry_scan).
+    intraday_df must be sorted by time.
     """
-    
+
     if intraday_df.empty or daily_df.empty:
         if debug: print('empty dataframes')
         return None, None, None
 
+    days = intraday_df.index.normalize()
+
     if mode == 'backtest':
-        today_date = intraday_df.index[0].normalize()
-    else:  
-        today_date = intraday_df.index[-1].normalize()
+        today_date = days[0]
+    else:
+        today_date = days[-1]
 
-    intraday_df = intraday_df[intraday_df.index.normalize() == today_date].copy()
+    lo = days.searchsorted(today_date, side='left')
+    hi = days.searchsorted(today_date, side='right')
 
-    if intraday_df.empty:
+    if lo == hi:
         if debug:
             print(f'No intraday data for {today_date}')
-            return None, None, None
+        return None, None, None
 
-    entry_day = intraday_df.index[0].normalize()
+    entry_day = today_date
 
     if entry_day not in daily_df.index:
         if debug: print('entry_day not in daily_df', entry_day)
@@ -32,56 +49,47 @@ def entry(intraday_df, daily_df, debug=False, mode='backtest'):
 
     daily_ema9 = daily_df.loc[entry_day, 'EMA_9']
 
+    session = intraday_df.iloc[lo:hi]
+
     if debug:
         print('Entry day:', entry_day)
         print('Daily EMA9:', daily_ema9)
-        print('Intraday Row Count:', len(intraday_df))
-        print(intraday_df[['Low','Close','ATR_14']].head())
+        print('Intraday Row Count:', len(session))
+        print(session[['Low','Close','ATR_14']].head())
         print(daily_df[['Low','Close','EMA_9']].head())
 
-    if pd.isna(daily_ema9) or intraday_df[['Low','Close','ATR_14']].isnull().values.any():
-        if debug: print('NaNs in Ema or intraday ATR or Prices')    
+    if pd.isna(daily_ema9) or session[['Low','Close','ATR_14']].isnull().values.any():
+        if debug: print('NaNs in Ema or intraday ATR or Prices')
         return None, None, None
 
-    ema_break = False
-
-    for time, row in intraday_df.iterrows():
-        low = row['Low']
-        close = row['Close']
-        atr = row['ATR_14']
-
-        cushion = 0.2 * atr
+    low = session['Low'].to_numpy()
+    close = session['Close'].to_numpy()
+    atr = session['ATR_14'].to_numpy()
 
-        ema_touch = abs(low - daily_ema9) <= cushion
+    reclaim = int(kernels.entry_scan(
+        low[None, :], close[None, :], atr[None, :], np.array([daily_ema9], dtype=np.float64), np.ones((1, len(close)), dtype=bool)
+        )[0])
 
+    if reclaim < 0:
         if debug:
-            print(time)
-            print('Low', low, 'Close:', close, 'ATR:', atr)
-            print('EMA9:', daily_ema9)
-            print('Cushion:', cushion)
-            print('ema_touch:', ema_touch)
-            print('ema broken? (it shouldnt be yet):', ema_break)
-
-        if not ema_break:
-            if ema_touch and close > daily_ema9:
-                if debug: print('Entry triggered - bounce')
-                return None, None, None
-            elif close < daily_ema9:
-                if debug: print('Ema broken, watching for reclaim...')
-                ema_break = True
-
-        else:
-            if close >= daily_ema9:
-                if debug: print('Entry triggered, reclaimed')
-                return time, close, 'reclaim'
-
-    if debug: print('No entry found')
-    return None, None, None
+            bounce = first_true((np.abs(low - daily_ema9) <= 0.2 * atr) & (close > daily_ema9))
+            ema_break = first_true(close < daily_ema9)
+            if ema_break is None or (bounce is not None and bounce < ema_break):
+                print('Entry triggered - bounce' if bounce is not None else 'No entry found')
+            else:
+                print('Ema broken at', session.index[ema_break], 'but never reclaimed')
+        return None, None, None
+
+    if debug: print('Entry triggered, reclaimed at', session.index[reclaim])
+    return session.index[reclaim], close[reclaim], 'reclaim'
 
 def exits(entry_time, entry_price, intraday_df, daily_df, max_hold=8, debug=False):
     """
     Returns Exit markers given a breach of stop loss, a hold period
     greater than max_hold, or take profit.
+    Each bar after entry is checked against its day's daily EMA_9 as arrays;
+    the first stop, take-profit or final max-hold bar wins, in that order
+    (see kernels.exit_scan). intraday_df must be sorted by time.
     """
 
     if intraday_df.empty or daily_df.empty or entry_time not in intraday_df.index:
@@ -89,34 +97,33 @@ def exits(entry_time, entry_price, intraday_df, daily_df, max_hold=8, debug=Fals
 
     entry_loc = intraday_df.index.get_loc(entry_time)
     entry_day = entry_time.normalize()
-    max_exit_day = (entry_day + pd.offsets.BDay(max_hold))
-
-    for time in intraday_df.index[entry_loc + 1:]:
-        row = intraday_df.loc[time]
-        close = row['Close']
-        atr = row['ATR_14']
+    max_exit_day = (entry_day + pd.offsets.BDay(max_hold)).normalize()
 
-        candle_day = time.normalize()
+    days = intraday_df.index.normalize()
+    close = intraday_df['Close'].to_numpy()
+    atr = intraday_df['ATR_14'].to_numpy()
 
-        if candle_day not in daily_df.index:
-            continue
+    daily_pos = daily_df.index.get_indexer(days)
+    known_day = daily_pos >= 0
+    daily_ema9 = np.where(known_day, daily_df['EMA_9'].to_numpy()[daily_pos], np.nan)
 
-        daily_ema9 = daily_df.loc[candle_day, 'EMA_9']
+    stop_level = daily_ema9 - (atr * 1.5)
+    tp_level = entry_price * (1 + 0.04)
 
-        stop_level = daily_ema9 - (atr * 1.5)
-        if close < stop_level:
-            return time, close, 'stop'
+    final_col = days.searchsorted(max_exit_day, side='right') - 1
+    if final_col < 0 or days[final_col] != max_exit_day:
+        final_col = -1
+        if debug: print(f'Final_candles are empty for {max_exit_day}')
 
-        tp_level = entry_price * (1 + 0.04)
-        if close >= tp_level:
-            return time, close, 'take_profit'
+    hit, kind = kernels.exit_scan(
+        close[None, :], stop_level[None, :], np.array([tp_level], dtype=np.float64),
+        known_day[None, :], np.array([final_col]), np.array([entry_loc])
+        )
+    hit, kind = int(hit[0]), int(kind[0])
 
-        final_candles = intraday_df[intraday_df.index.normalize() == max_exit_day.normalize()]
-        if not final_candles.empty and time == final_candles.index[-1]:
-            return time, close, 'max_hold_exit'
-        elif debug == True and final_candles.empty:
-            print(f'Final_candles are empty for {max_exit_day}')
-        
+    if hit >= 0:
+        time = intraday_df.index[hit]
+        return time, close[hit], ('stop', 'take_profit', 'max_hold_exit')[kind]
 
     last_time = intraday_df.index[-1]
     return last_time, intraday_df.loc[last_time, 'Close'], 'max_hold_exit'
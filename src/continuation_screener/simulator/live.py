@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+
+from continuation_screener.data.indicators import ewm_alpha, ewm_step
+
+EMA_ALPHA = ewm_alpha(span=9)
+ATR_ALPHA = ewm_alpha(span=14)
+
+REPLAY_COLUMNS = ['Datetime', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+def _step(prev, value, alpha):
+    return float(ewm_step(prev, value, alpha))
+
+class _TickerState:
+    __slots__ = (
+        'daily', 'last_daily_day', 'rolled_ema', 'start', 'session',
+        'phase', 'atr', 'prev_close', 'day', 'last_time', 'last_close', 'last_known',
+        'entry_time', 'entry_price', 'max_exit_day',
+    )
+
+    def __init__(self, daily_df, start):
+        self.start = start
+        self.session = None
+        self.phase = 'warmup'
+        self.atr = np.nan
+        self.prev_close = np.nan
+        self.day = None
+        self.last_time = None
+        self.last_close = np.nan
+        self.last_known = False
+        self.entry_time = None
+        self.entry_price = None
+        self.max_exit_day = None
+        self.set_daily(daily_df)
+
+    def set_daily(self, daily_df):
+        ema = daily_df['EMA_9'] if daily_df is not None and not daily_df.empty else pd.Series(dtype=float)
+        days = pd.DatetimeIndex(ema.index).normalize()
+        self.daily = dict(zip(days, ema.to_numpy(dtype=float)))
+        self.last_daily_day = days.max() if len(days) else pd.Timestamp.min
+        self.rolled_ema = float(ema.iloc[-1]) if len(ema) else np.nan
+
+class LiveSignalEngine:
+    """
+    Streams 15m bars for a watch list and emits the same reclaim entries
+    and stop / take-profit / max-hold exits as entry() and exits(), with
+    O(1) work per bar instead of rescanning the session.
+
+    Each watched ticker carries its running intraday ATR_14, the daily
+    EMA_9 by date, an EMA-break flag for its entry session and, once
+    entered, the open position. Bars before the entry session only warm
+    up the ATR. Bars must arrive in time order per ticker, as naive (or
+    tz-aware, converted to) New York timestamps.
+
+    On days after the last row of the daily frame (live trading), the
+    EMA_9 is provisional: the last known value stepped with each later
+    day's final close and with the current bar's close, i.e. what the
+    daily EMA would be if the session closed now. Replaying history with
+    complete daily frames gives exactly the trades of simulate_trade.
+    """
+
+    def __init__(self, max_hold=8, interval='15m', session_close=pd.Timedelta(hours=16), on_signal=None):
+        self.max_hold = max_hold
+        self.interval = pd.Timedelta(interval)
+        self.session_close = pd.Timedelta(session_close)
+        self.on_signal = on_signal
+
+        self.states = {}
+        self.trades = []
+
+    def watch(self, ticker, daily_df, session=None):
+        """
+        Starts watching ticker for a reclaim entry on its first session on
+        or after session (the first day it receives bars when None).
+        daily_df needs an EMA_9 column on a date index. Watching a ticker
+        that holds a position only refreshes its daily EMAs.
+        """
+
+        state = self.states.get(ticker)
+        if state is not None and state.entry_time is not None:
+            state.set_daily(daily_df)
+            return
+
+        start = pd.Timestamp(session).normalize() if session is not None else None
+        self.states[ticker] = _TickerState(daily_df, start)
+
+    def watch_many(self, tickers, daily_frames, session=None):
+        """
+        watch() for every ticker of a run_screener result, with
+        daily_frames mapping ticker to its daily frame.
+        """
+
+        for ticker in tickers:
+            self.watch(ticker, daily_frames.get(ticker), session)
+
+    def unwatch(self, ticker):
+        self.states.pop(ticker, None)
+
+    @property
+    def positions(self):
+        """
+        {ticker: (entry time, entry price)} of the open positions.
+        """
+
+        return {t: (s.entry_time, s.entry_price) for t, s in self.states.items() if s.entry_time is not None}
+
+    def _daily_ema(self, state, day, close):
+        ema = state.daily.get(day)
+        if ema is not None:
+            return ema
+        if day <= state.last_daily_day:
+            return None
+        return _step(state.rolled_ema, close, EMA_ALPHA)
+
+    def _emit(self, signal):
+        if self.on_signal is not None:
+            self.on_signal(signal)
+        return signal
+
+    def _close(self, ticker, state, time, price, method):
+        entry_price = state.entry_price
+        trade = {
+            'Ticker': ticker,
+            'Entry Time': state.entry_time,
+            'Entry Price': round(float(entry_price), 2),
+            'Entry Method': 'reclaim',
+            'Exit Time': time,
+            'Exit Price': round(float(price), 2),
+            'Exit Type': method,
+            'Net': round(float(price - entry_price), 2),
+        }
+        self.trades.append(trade)
+
+        state.entry_time = state.entry_price = state.max_exit_day = None
+        state.phase = 'done'
+
+        return self._emit({'Ticker': ticker, 'Time': time, 'Signal': 'exit', 'Price': float(price), 'Type': method, 'Trade': trade})
+
+    def on_bar(self, ticker, time, high, low, close):
+        """
+        Feeds one bar and returns the signals it triggers (a list of
+        dicts with Ticker, Time, Signal 'entry' or 'exit', Price, Type).
+        """
+
+        state = self.states.get(ticker)
+        if state is None:
+            return []
+
+        time = pd.Timestamp(time)
+        if time.tzinfo is not None:
+            time = time.tz_convert('America/New_York').tz_localize(None)
+        day = time.normalize()
+
+        signals = []
+
+        if state.day is not None and day != state.day:
+            if state.entry_time is not None and state.day == state.max_exit_day and state.last_known:
+                # the previous bar was the last one of the max-hold day
+                signals.append(self._close(ticker, state, state.last_time, state.last_close, 'max_hold_exit'))
+            if state.day > state.last_daily_day:
+                state.rolled_ema = _step(state.rolled_ema, state.last_close, EMA_ALPHA)
+
+        prev_close = state.prev_close
+        tr = high - low if np.isnan(prev_close) else max(high - low, abs(high - prev_close), abs(low - prev_close))
+        state.atr = _step(state.atr, tr, ATR_ALPHA)
+        state.prev_close = close
+
+        ema = self._daily_ema(state, day, close)
+        known = ema is not None
+
+        if state.entry_time is not None:
+            if known:
+                final = day == state.max_exit_day and time + self.interval >= day + self.session_close
+                if close < ema - state.atr * 1.5:
+                    signals.append(self._close(ticker, state, time, close, 'stop'))
+                elif close >= state.entry_price * (1 + 0.04):
+                    signals.append(self._close(ticker, state, time, close, 'take_profit'))
+                elif final:
+                    signals.append(self._close(ticker, state, time, close, 'max_hold_exit'))
+
+        elif state.phase != 'done':
+            signals.extend(self._entry(ticker, state, time, day, low, close, ema))
+
+        state.day = day
+        state.last_time = time
+        state.last_close = close
+        state.last_known = known
+
+        return signals
+
+    def _entry(self, ticker, state, time, day, low, close, ema):
+        if state.session is None:
+            if state.start is not None and day < state.start:
+                return []
+            state.session = day
+            state.phase = 'watching'
+        elif day != state.session:
+            state.phase = 'done'
+            return []
+
+        if ema is None or np.isnan(ema) or np.isnan(low) or np.isnan(close) or np.isnan(state.atr):
+            state.phase = 'done'
+            return []
+
+        if state.phase == 'watching':
+            if abs(low - ema) <= 0.2 * state.atr and close > ema:
+                state.phase = 'done'
+            elif close < ema:
+                state.phase = 'broken'
+            return []
+
+        if close >= ema:
+            state.phase = 'open'
+            state.entry_time = time
+            state.entry_price = close
+            state.max_exit_day = (day + pd.offsets.BDay(self.max_hold)).normalize()
+            return [self._emit({'Ticker': ticker, 'Time': time, 'Signal': 'entry', 'Price': float(close), 'Type': 'reclaim'})]
+
+        return []
+
+    def finish(self):
+        """
+        Closes every open position at its last bar as a max-hold exit, as
+        exits() does when the data ends first. Returns the exit signals.
+        """
+
+        return [
+            self._close(ticker, state, state.last_time, state.last_close, 'max_hold_exit')
+            for ticker, state in self.states.items() if state.entry_time is not None
+            ]
+
+def replay_frame(intraday_frames):
+    """
+    Interleaves {ticker: intraday frame} into one long frame of bars in
+    time order, the layout read_replay() loads.
+    """
+
+    frames = []
+    for ticker, df in intraday_frames.items():
+        if df is None or df.empty:
+            continue
+        bars = df.reset_index()
+        bars = bars.rename(columns={bars.columns[0]: 'Datetime'})
+        bars['Ticker'] = ticker
+        frames.append(bars.reindex(columns=REPLAY_COLUMNS))
+
+    if not frames:
+        return pd.DataFrame(columns=REPLAY_COLUMNS)
+
+    return pd.concat(frames, ignore_index=True).sort_values('Datetime', kind='stable').reset_index(drop=True)
+
+def read_replay(path):
+    """
+    Loads a replay csv with Datetime, Ticker and OHLC columns.
+    """
+
+    bars = pd.read_csv(path)
+    bars['Datetime'] = pd.to_datetime(bars['Datetime'])
+    return bars.sort_values('Datetime', kind='stable').reset_index(drop=True)
+
+def replay(engine, bars):
+    """
+    Feeds a long frame of bars (replay_frame / read_replay) through the
+    engine, then closes what is still open. Returns every signal.
+    """
+
+    signals = []
+    for ticker, time, high, low, close in zip(bars['Ticker'], bars['Datetime'], bars['High'], bars['Low'], bars['Close']):
+        signals.extend(engine.on_bar(ticker, time, float(high), float(low), float(close)))
+
+    signals.extend(engine.finish())
+    return signals
@@ -0,0 +1,181 @@
+import heapq
+import numpy as np
+import pandas as pd
+
+class PortfolioSimulator:
+    """
+    Replays independent trades (the dicts backtest_ticker / collect_trades
+    produce) through one account with limited capital and slots.
+
+    Entries are taken in time order; open positions wait in a heap keyed
+    by exit time and every exit due at or before the next entry is
+    settled first, so capital and slots are freed before they are reused
+    (exits win ties). Each entry gets allocation x current equity, capped
+    by the free cash, and is skipped when max_positions are open, the
+    ticker is already held or not even one share is affordable. Open
+    positions are carried at cost, so equity moves at exits. Sorting the
+    trades is the only O(n log n) step, the heap holds at most
+    max_positions entries.
+    """
+
+    def __init__(self, capital=100_000, max_positions=10, allocation=0.1, fractional=False):
+        self.capital = capital
+        self.max_positions = max_positions
+        self.allocation = allocation
+        self.fractional = fractional
+
+        self.fills = pd.DataFrame()
+        self.rejected = pd.DataFrame()
+        self.equity = pd.DataFrame()
+
+    def run(self, trades):
+        """
+        Simulates the account. Returns (fills, equity): the accepted trades
+        with Shares, Cost, PnL and the equity after their exit, and the
+        time-indexed Equity, Cash, Positions and Drawdown after every event.
+        Rejected trades and their reason are kept in self.rejected.
+        """
+
+        trades = pd.DataFrame(trades)
+        if trades.empty:
+            self.fills, self.rejected, self.equity = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+            return self.fills, self.equity
+
+        trades = trades.sort_values('Entry Time', kind='stable').reset_index(drop=True)
+
+        tickers = trades['Ticker'].tolist()
+        entry_time = pd.to_datetime(trades['Entry Time']).tolist()
+        exit_time = pd.to_datetime(trades['Exit Time']).tolist()
+        entry_price = trades['Entry Price'].to_numpy(dtype=np.float64)
+        exit_price = trades['Exit Price'].to_numpy(dtype=np.float64)
+
+        cash = float(self.capital)
+        invested = 0.0
+        held = set()
+        open_heap = []
+
+        shares = np.zeros(len(trades))
+        pnl = np.full(len(trades), np.nan)
+        equity_after = np.full(len(trades), np.nan)
+        reasons = {}
+
+        times, equity, cash_path, positions = [], [], [], []
+
+        def record(time):
+            times.append(time)
+            equity.append(cash + invested)
+            cash_path.append(cash)
+            positions.append(len(open_heap))
+
+        def settle(until):
+            nonlocal cash, invested
+            while open_heap and (until is None or open_heap[0][0] <= until):
+                time, i = heapq.heappop(open_heap)
+                cost = shares[i] * entry_price[i]
+                proceeds = shares[i] * exit_price[i]
+                cash += proceeds
+                invested -= cost
+                pnl[i] = proceeds - cost
+                held.discard(tickers[i])
+                record(time)
+                equity_after[i] = cash + invested
+
+        record(entry_time[0])
+
+        for i in range(len(trades)):
+            settle(entry_time[i])
+
+            if tickers[i] in held:
+                reasons[i] = 'holding'
+                continue
+            if len(open_heap) >= self.max_positions:
+                reasons[i] = 'max_positions'
+                continue
+
+            budget = min(self.allocation * (cash + invested), cash)
+            size = budget / entry_price[i] if self.fractional else np.floor(budget / entry_price[i])
+            if size <= 0:
+                reasons[i] = 'cash'
+                continue
+
+            shares[i] = size
+            cash -= size * entry_price[i]
+            invested += size * entry_price[i]
+            held.add(tickers[i])
+            heapq.heappush(open_heap, (exit_time[i], i))
+            record(entry_time[i])
+
+        settle(None)
+
+        accepted = shares > 0
+        fills = trades.loc[accepted].copy()
+        fills['Shares'] = shares[accepted]
+        fills['Cost'] = shares[accepted] * entry_price[accepted]
+        fills['PnL'] = pnl[accepted]
+        fills['Equity After'] = equity_after[accepted]
+
+        rejected = trades.loc[~accepted].copy()
+        rejected['Reason'] = [reasons[i] for i in np.flatnonzero(~accepted)]
+
+        curve = pd.DataFrame({'Equity': equity, 'Cash': cash_path, 'Positions': positions}, index=pd.DatetimeIndex(times, name='Time'))
+        curve = curve[~curve.index.duplicated(keep='last')]
+        curve['Drawdown'] = curve['Equity'] / curve['Equity'].cummax() - 1
+
+        self.fills, self.rejected, self.equity = fills, rejected, curve
+        return fills, curve
+
+def daily_equity(equity):
+    """
+    End-of-day equity on business days from the first to the last event.
+    """
+
+    if equity.empty:
+        return pd.Series(dtype=float)
+
+    series = equity['Equity']
+    days = pd.bdate_range(series.index[0].normalize(), series.index[-1].normalize())
+    daily = series.groupby(series.index.normalize()).last()
+    return daily.reindex(days).ffill()
+
+def portfolio_summary(fills, equity, capital, rejected=None, risk_free=0.05):
+    """
+    Account-level metrics from the equity curve: total and annualized
+    return, max drawdown and the Sharpe ratio of daily equity returns.
+    """
+
+    daily = daily_equity(equity)
+    if daily.empty:
+        return pd.DataFrame({'Metric': [], 'Value': []})
+
+    final = float(daily.iloc[-1])
+    total_return = final / capital - 1
+
+    years = max(len(daily) / 252, 1 / 252)
+    annual_return = (final / capital) ** (1 / years) - 1
+
+    returns = daily.pct_change().dropna()
+    std = returns.std()
+    sharpe = (returns.mean() * 252 - risk_free) / (std * np.sqrt(252)) if std > 0 and len(returns) > 1 else 0.0
+
+    return pd.DataFrame({
+        'Metric': [
+            'Trades Taken',
+            'Trades Skipped',
+            'Final Equity ($)',
+            'Total Return',
+            'Annualized Return',
+            'Max Drawdown',
+            'Max Open Positions',
+            'Daily Sharpe Ratio',
+        ],
+        'Value': [
+            len(fills),
+            0 if rejected is None else len(rejected),
+            f'{final:.2f}',
+            f'{total_return:.2%}',
+            f'{annual_return:.2%}',
+            f'{equity["Drawdown"].min():.2%}',
+            int(equity['Positions'].max()),
+            f'{sharpe:.2f}',
+        ],
+    })
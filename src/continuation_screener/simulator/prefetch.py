@@ -0,0 +1,140 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from continuation_screener.data.intraday_bt import (
+    INTRADAY_PRELOAD, fetch_daily, fetch_intraday, prepare_daily, prepare_intraday
+)
+from continuation_screener.simulator.backtester_oneday import backtest_windows
+
+def merge_ranges(ranges):
+    """
+    Merges overlapping or touching (start, end) ranges.
+    """
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return [tuple(r) for r in merged]
+
+def _slice(df, start, end):
+    if df is None:
+        return None
+    return df.loc[(df.index >= start) & (df.index < end)]
+
+def _naive_index(df):
+    if df is not None and getattr(df.index, 'tz', None) is not None:
+        df = df.copy()
+        df.index = df.index.tz_localize(None)
+    return df
+
+class Prefetcher:
+    """
+    Downloads the chart data for every backtest candidate up front.
+
+    Candidate windows are merged per ticker so overlapping ranges are fetched
+    once, and fetches run on a bounded thread pool in candidate order.
+    get() hands back exactly the frames daily_bt/intraday_bt would produce,
+    blocking only until that ticker's downloads have finished. Raw data is
+    released after a ticker's last candidate has been served, or skipped
+    through release(). Merged ranges are fetched without require_complete,
+    so NaN bars are not retried; prepare_daily/prepare_intraday still
+    reject a candidate whose own window has them.
+    """
+
+    def __init__(self, candidates, max_workers=8, store=None, provider=None, interval='15m', cache=None):
+        self.candidates = list(candidates)
+        self.max_workers = max_workers
+        self.store = store
+        self.provider = provider
+        self.interval = interval
+        self.cache = cache
+
+        self._remaining = {}
+        self._futures = {}
+        self._pool = None
+
+    def _plan(self):
+        daily, intraday, order = {}, {}, []
+
+        for day, ticker in self.candidates:
+            (d_start, d_end), (i_start, i_end) = backtest_windows(day)
+
+            if ticker not in daily:
+                order.append(ticker)
+            daily.setdefault(ticker, []).append((d_start, d_end + pd.Timedelta(days=1)))
+            intraday.setdefault(ticker, []).append((i_start - INTRADAY_PRELOAD, i_end))
+            self._remaining[ticker] = self._remaining.get(ticker, 0) + 1
+
+        return order, daily, intraday
+
+    def _fetch(self, ticker, daily_ranges, intraday_ranges):
+        daily = [
+            (start, end, fetch_daily(ticker, start, end, provider=self.provider, store=self.store, require_complete=False, cache=self.cache))
+            for start, end in merge_ranges(daily_ranges)
+            ]
+        intraday = [
+            (start, end, _naive_index(fetch_intraday(ticker, start, end, self.interval, provider=self.provider, require_complete=False, cache=self.cache)))
+            for start, end in merge_ranges(intraday_ranges)
+            ]
+        return daily, intraday
+
+    def start(self):
+        order, daily, intraday = self._plan()
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        for ticker in order:
+            self._futures[ticker] = self._pool.submit(self._fetch, ticker, daily[ticker], intraday[ticker])
+
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _covering(segments, start, end):
+        for seg_start, seg_end, df in segments:
+            if seg_start <= start and end <= seg_end:
+                return _slice(df, start, end)
+        return None
+
+    def get(self, ticker, eval_date):
+        """
+        Returns (daily_df, intraday_df) for one candidate; either is None
+        when its download failed, as with daily_bt / intraday_bt.
+        """
+
+        daily_segments, intraday_segments = self._futures[ticker].result()
+
+        (d_start, d_end), (i_start, i_end) = backtest_windows(eval_date)
+
+        daily_df = prepare_daily(self._covering(daily_segments, d_start, d_end + pd.Timedelta(days=1)))
+        intraday_df = prepare_intraday(
+            self._covering(intraday_segments, i_start - INTRADAY_PRELOAD, i_end),
+            i_start
+            )
+
+        self.release(ticker)
+
+        return daily_df, intraday_df
+
+    def release(self, ticker):
+        """
+        Counts one of ticker's candidates as served; call it for candidates
+        skipped without get() so the ticker's data is still released.
+        """
+
+        self._remaining[ticker] -= 1
+        if self._remaining[ticker] == 0:
+            del self._futures[ticker]
@@ -1,35 +1,29 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from tqdm import tqdm
 
 from continuation_screener.screener.run_screener_bt import run_screener_bt
-from continuation_screener.simulator.backtester_oneday import backtest_ticker
-
-def run_backtester(start_date=None, end_date=None):
+from continuation_screener.simulator.backtester_oneday import backtest_frames, simulate_trade
+from continuation_screener.simulator.prefetch import Prefetcher
+from continuation_screener.simulator.batch import simulate_batch, trade_record
+from continuation_screener.simulator.portfolio import portfolio_summary
+from continuation_screener.simulator.stats import trade_metrics, confidence_intervals
+from continuation_screener.utils.metrics import Metrics
+
+def collect_trades(candidates, simulate, skip=None):
     """
-    Simulates trades given a start and end date. Naturally, maximizes window
-    possible under yfinance restrictions. See readme for backtest data for
-    longer periods.
+    Walks screened (day, ticker) candidates in order, simulating each with
+    simulate(i, day, ticker) and keeping one trade per ticker per day.
+    Candidates passed over without simulating go to skip(i, day, ticker).
     """
 
-    end_dt = pd.to_datetime(end_date) if end_date else datetime.now()
-    cutoff = end_dt - timedelta(days=11)
-    start_dt = pd.to_datetime(start_date) if start_date else datetime.now() - timedelta(days=59)  
-
-    ticker_df = run_screener_bt(start_dt.strftime('%m-%d-%Y'), cutoff.strftime('%m-%d-%Y'))
-
-    if ticker_df is None:
-        print('run_screener_bt failed, ticker_df is empty.')
-        return pd.DataFrame(), pd.DataFrame()
-
     trades = []
 
     traded_today = set()
     executed_trades = set()
     current_day = None
 
-    for (day, ticker) in tqdm(ticker_df.index, desc='Processing Through Days...'):
+    for i, (day, ticker) in enumerate(tqdm(candidates, desc='Processing Through Days...')):
 
         if current_day != day.date():
             traded_today.clear()
@@ -42,9 +36,11 @@ def run_backtester(start_date=None, end_date=None):
         trade_marker = (day.date(), base)
 
         if trade_marker in traded_today:
+            if skip is not None:
+                skip(i, day, ticker)
             continue
-        
-        bt_data = backtest_ticker(ticker, day)
+
+        bt_data = simulate(i, day, ticker)
 
         if bt_data is not None:
             trade_id = (bt_data['Ticker'], bt_data['Entry Time'])
@@ -64,39 +60,155 @@ def run_backtester(start_date=None, end_date=None):
             leverage = 10 #approximate
             option_return = bt_return * leverage
             bt_data['Option Net ($)'] = 1000 * option_return
+
+            bt_data['Hold_Time'] = (bt_data['Exit Time'] - bt_data['Entry Time']) / pd.Timedelta(days=1)
             
             trades.append(bt_data)
 
-    df_trades = pd.DataFrame(trades)
+    return trades
 
-    if df_trades.empty:
-        print('Error forming df_trades')
+def run_backtester(start_date=None, end_date=None, store=None, provider=None, max_workers=8, cache=None, engine='loop', metrics=None, portfolio=None, bootstrap=0, checkpoint=None, trade_store=None, run=None):
+    """
+    Simulates trades given a start and end date. Naturally, maximizes window
+    possible under yfinance restrictions. See readme for backtest data for
+    longer periods. Pass a BarStore to read daily bars from the local store
+    and a MarketDataProvider (e.g. LocalProvider) to run offline.
+    Chart data for all candidates is prefetched on max_workers threads;
+    max_workers=0 downloads serially inside the loop. A BarCache keeps
+    fetched bars in memory so repeated windows are not downloaded again.
+    engine='batch' simulates every candidate in one vectorized pass
+    (see simulator.batch) instead of one at a time. Stage timings,
+    trade counts and bar cache hits are recorded in metrics.
+    Pass a PortfolioSimulator as portfolio to also replay the trades
+    through one account with limited capital and positions; its
+    account-level rows are appended to the summary and the fills and
+    equity curve are left on the simulator. bootstrap=N adds a 95% CI
+    column from N bootstrap resamples of the trades (see simulator.stats).
+    With a Checkpoint, candidates it already holds are not simulated
+    again and every new outcome is logged as soon as it is known.
+    With a TradeStore the trades and summary are archived under run
+    (by default named after the date range).
+    """
+
+    if metrics is None:
+        metrics = Metrics(run='backtester')
+
+    end_dt = pd.to_datetime(end_date) if end_date else datetime.now()
+    cutoff = end_dt - timedelta(days=11)
+    start_dt = pd.to_datetime(start_date) if start_date else datetime.now() - timedelta(days=59)  
+
+    with metrics.stage('screen_bt'):
+        ticker_df = run_screener_bt(start_dt.strftime('%m-%d-%Y'), cutoff.strftime('%m-%d-%Y'), store=store, provider=provider, metrics=metrics)
+
+    if ticker_df is None:
+        print('run_screener_bt failed, ticker_df is empty.')
+        metrics.write()
         return pd.DataFrame(), pd.DataFrame()
 
-    win_rate = (df_trades['Return %'] > 0).mean()
-    avg_win = df_trades[df_trades['Return %'] > 0]['Return %'].mean()
-    avg_loss = df_trades[df_trades['Return %'] <= 0]['Return %'].mean()
+    candidates = list(ticker_df.index)
+
+    pending = candidates
+    if checkpoint is not None:
+        pending = [(day, ticker) for day, ticker in candidates if not checkpoint.done(day, ticker)]
+        print(f'Checkpoint: {len(candidates) - len(pending)} of {len(candidates)} candidates already evaluated')
+        metrics.set('checkpoint_hits', len(candidates) - len(pending))
+
+    def checkpointed(evaluate):
+        # evaluate(i, day, ticker) -> (trade or None, daily_df, intraday_df)
+        def simulate(i, day, ticker):
+            if checkpoint is not None and checkpoint.done(day, ticker):
+                return checkpoint.trade(day, ticker)
+            record, daily_df, intraday_df = evaluate(i, day, ticker)
+            if checkpoint is not None:
+                checkpoint.record(day, ticker, record, daily_df, intraday_df)
+            return record
+        return simulate
+
+    with metrics.stage('simulate'):
+        if engine == 'batch':
+            with Prefetcher(pending, max(max_workers, 1), store=store, provider=provider, cache=cache) as prefetcher:
+                frames = {(day, ticker): prefetcher.get(ticker, day) for day, ticker in pending}
+
+            batch = simulate_batch(
+                [ticker for _, ticker in pending],
+                [frames[c][0] for c in pending],
+                [frames[c][1] for c in pending]
+                )
+            by_candidate = {pending[i]: trade for i, trade in zip(batch['candidate'].tolist(), batch)}
+
+            trades = collect_trades(
+                candidates,
+                checkpointed(lambda i, day, ticker: (
+                    trade_record(by_candidate[(day, ticker)]) if (day, ticker) in by_candidate else None,
+                    *frames[(day, ticker)]
+                    ))
+                )
+
+        elif max_workers:
+            with Prefetcher(pending, max_workers, store=store, provider=provider, cache=cache) as prefetcher:
+                def evaluate(i, day, ticker):
+                    daily_df, intraday_df = prefetcher.get(ticker, day)
+                    return simulate_trade(ticker, daily_df, intraday_df), daily_df, intraday_df
+
+                # candidates deduped away still count towards releasing their ticker
+                queued = set(pending)
+
+                def skip(i, day, ticker):
+                    if (day, ticker) in queued:
+                        prefetcher.release(ticker)
+
+                trades = collect_trades(candidates, checkpointed(evaluate), skip)
+
+        else:
+            def evaluate(i, day, ticker):
+                daily_df, intraday_df = backtest_frames(ticker, day, store=store, provider=provider, cache=cache)
+                return simulate_trade(ticker, daily_df, intraday_df), daily_df, intraday_df
+
+            trades = collect_trades(candidates, checkpointed(evaluate))
+
+    metrics.set('candidates', len(candidates))
+    metrics.set('trades', len(trades))
+
+    if cache is not None:
+        print('Bar cache:', cache.stats())
+        metrics.cache(cache.stats())
+
+    metrics.write()
+
+    df_trades, summary_df = summarize_trades(trades, start_dt, end_dt, bootstrap, portfolio)
+
+    if trade_store is not None and not df_trades.empty:
+        if run is None:
+            run = f'{start_dt:%Y_%m_%d}_to_{end_dt:%Y_%m_%d}'
+        trade_store.write(df_trades, run, summary=summary_df)
 
-    expectancy = (win_rate * avg_win) + ((1 - win_rate) * avg_loss)
+    return df_trades, summary_df
 
-    gross_profit = df_trades[df_trades['Net'] > 0]['Net'].sum()
-    gross_loss = abs(df_trades[df_trades['Net'] <= 0]['Net'].sum())
-    profit_factor = gross_profit / gross_loss if gross_loss != 0 else float('inf')
+def summarize_trades(trades, start_dt, end_dt, bootstrap=0, portfolio=None):
+    """
+    Builds (df_trades, summary_df) from collect_trades output for a
+    backtest over [start_dt, end_dt]. See run_backtester for bootstrap
+    and portfolio.
+    """
+
+    df_trades = pd.DataFrame(trades)
+
+    if df_trades.empty:
+        print('Error forming df_trades')
+        return pd.DataFrame(), pd.DataFrame()
 
     bond_rt = 0.05
     days_total = max((end_dt - start_dt).days, 1)
     year_convert = days_total / 365.25
-    trades_yearly = len(df_trades) / year_convert
 
-    est_annual_return = expectancy * trades_yearly
+    returns = df_trades['Return %'].to_numpy()
+    net = df_trades['Net'].to_numpy()
+    point = trade_metrics(returns, net, year_convert, risk_free=bond_rt)
 
-    std = df_trades['Return %'].std()
-    if std > 0 and len(df_trades) > 1:
-        sharpe = (est_annual_return - bond_rt) / (std * np.sqrt(trades_yearly))
-    else:
-        sharpe = 0.0
+    win_rate, avg_win, avg_loss = point['win_rate'], point['avg_win'], point['avg_loss']
+    expectancy, profit_factor = point['expectancy'], point['profit_factor']
+    est_annual_return, sharpe = point['annual_return'], point['sharpe']
 
-    
     summary = {
         'Metric': [
             'Total Trades',
@@ -134,6 +246,32 @@ def run_backtester(start_date=None, end_date=None):
 
     summary_df = pd.DataFrame(summary)
 
+    if bootstrap:
+        ci = confidence_intervals(returns, net, year_convert, resamples=bootstrap, risk_free=bond_rt)
+        rows = {
+            'Win Rate': ('win_rate', '.2%'),
+            'Avg Win %': ('avg_win', '.2%'),
+            'Avg Loss %': ('avg_loss', '.2%'),
+            'Profit Factor (Gross)': ('profit_factor', '.2f'),
+            'Expectancy (Per Trade)': ('expectancy', '.2%'),
+            'Est. Annual Return': ('annual_return', '.2%'),
+            'Annualized Sharpe Ratio': ('sharpe', '.2f'),
+        }
+        summary_df['95% CI'] = [
+            f'{ci.loc[rows[m][0], "Low"]:{rows[m][1]}} to {ci.loc[rows[m][0], "High"]:{rows[m][1]}}' if m in rows else ''
+            for m in summary_df['Metric']
+            ]
+
+    if portfolio is not None:
+        fills, equity = portfolio.run(df_trades)
+        account = portfolio_summary(fills, equity, portfolio.capital, portfolio.rejected, risk_free=bond_rt)
+        account['Metric'] = 'Portfolio ' + account['Metric']
+        account['Note'] = ''
+        account.loc[0, 'Note'] = f'{portfolio.max_positions} positions max, {portfolio.allocation:.0%} of equity each'
+        if bootstrap:
+            account['95% CI'] = ''
+        summary_df = pd.concat([summary_df, account], ignore_index=True)
+
     return df_trades, summary_df
 
 if __name__ == '__main__':
@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from continuation_screener.data.store import BarStore
+from continuation_screener.data.regime import regime_mask
+from continuation_screener.data.dailydata import update_store
+from continuation_screener.data.providers import default_provider
+from continuation_screener.screener.run_screener_bt import run_screener_bt
+from continuation_screener.simulator.backtester_oneday import backtest_windows, simulate_trade
+from continuation_screener.simulator.prefetch import Prefetcher
+from continuation_screener.simulator.batch import simulate_batch, trade_record
+from continuation_screener.simulator.run_backtester import collect_trades, summarize_trades
+from continuation_screener.utils.metrics import Metrics
+
+LOOKBACK = 350
+
+def date_shards(start_day, end_day, n_shards):
+    """
+    Splits the business days of [start_day, end_day] into at most n_shards
+    contiguous (first, last) day ranges.
+    """
+
+    days = pd.bdate_range(pd.to_datetime(start_day).normalize(), pd.to_datetime(end_day).normalize())
+    n_shards = max(1, min(n_shards, len(days)))
+    return [(chunk[0], chunk[-1]) for chunk in np.array_split(days, n_shards) if len(chunk)]
+
+def simulate_candidates(candidates, store=None, provider=None, max_workers=4, engine='batch'):
+    """
+    Trade record (or None) for every (day, ticker) candidate, in order,
+    without any dedupe; collect_trades applies that afterwards.
+    """
+
+    if not candidates:
+        return []
+
+    with Prefetcher(candidates, max(max_workers, 1), store=store, provider=provider) as prefetcher:
+        frames = [prefetcher.get(ticker, day) for day, ticker in candidates]
+
+    if engine == 'batch':
+        batch = simulate_batch(
+            [ticker for _, ticker in candidates],
+            [daily_df for daily_df, _ in frames],
+            [intraday_df for _, intraday_df in frames]
+            )
+        by_candidate = dict(zip(batch['candidate'].tolist(), batch))
+        return [trade_record(by_candidate[i]) if i in by_candidate else None for i in range(len(candidates))]
+
+    return [simulate_trade(ticker, *frame) for (_, ticker), frame in zip(candidates, frames)]
+
+def _backtest_shard(task):
+    first, last, lookback, store_root, provider, max_workers, engine = task
+
+    # every shard opens its own read-only view, the parent already filled it
+    store = None if store_root is None else BarStore(store_root, readonly=True)
+
+    ticker_df = run_screener_bt(first, last, store=store, provider=provider, lookback=lookback)
+    if ticker_df is None or ticker_df.empty:
+        return [], []
+
+    candidates = list(ticker_df.index)
+    return candidates, simulate_candidates(candidates, store, provider, max_workers, engine)
+
+def refresh_store(store, tasks, provider=None, metrics=None):
+    """
+    Brings store up to date for everything the shard tasks will read:
+    the universe over the union of their warm-up and screening ranges
+    plus the trade windows after them, and the regime history.
+    """
+
+    if provider is None:
+        provider = default_provider()
+
+    first = min(task[0] - pd.Timedelta(days=task[2]) for task in tasks)
+    first = min(first, backtest_windows(tasks[0][0])[0][0])
+    last = min(backtest_windows(tasks[-1][1])[0][1], pd.Timestamp.now().normalize())
+
+    tickers = [t.replace('.', '-') for t in provider.universe()]
+    failed = update_store(store, tickers, first, last, provider=provider, metrics=metrics)
+    if failed:
+        print(f'{len(failed)} tickers failed to update, shards will use stored bars where available.')
+
+    regime_mask(tasks[0][0], tasks[-1][1], store=store, provider=provider)
+    store.save()
+
+def run_backtester_sharded(start_date=None, end_date=None, shards=None, workers=None, store=None, provider=None,
+                           max_workers=4, engine='batch', warmup=None, metrics=None, bootstrap=0, portfolio=None):
+    """
+    run_backtester with the screening window split into date shards, each
+    screened and simulated in its own process.
+
+    By default every shard warms its indicators up from the same first
+    day the single run would (start_date minus the 350-day lookback), so
+    the EMA_200 recursions and screen passes are identical and so are
+    the trades. warmup=N gives each shard only N calendar days of
+    warm-up instead: far less data for late shards, at the cost of EMAs
+    that differ slightly from the single run near shard starts, which
+    can flip borderline screen passes and so the trades.
+
+    With a store it is refreshed once here for the union of the shard
+    ranges, so the shared warm-up history is downloaded only once;
+    shards only read it, each through its own read-only BarStore on
+    the same root.
+
+    Shards return every candidate's trade un-deduped; the parent walks
+    them in date order through collect_trades, so the one-trade-per-day
+    and repeated-entry checks see the whole run and behave exactly as
+    in run_backtester at shard boundaries. workers=1 runs the shards
+    inline; None uses every core. The provider must be picklable.
+    """
+
+    if metrics is None:
+        metrics = Metrics(run='backtester_sharded')
+
+    end_dt = pd.to_datetime(end_date) if end_date else datetime.now()
+    cutoff = end_dt - timedelta(days=11)
+    start_dt = pd.to_datetime(start_date) if start_date else datetime.now() - timedelta(days=59)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shards is None:
+        shards = workers
+
+    bounds = date_shards(start_dt, cutoff, shards)
+    origin = bounds[0][0] if bounds else pd.Timestamp(start_dt).normalize()
+
+    store_root = None if store is None else store.root
+
+    tasks = [
+        (first, last, LOOKBACK + (first - origin).days if warmup is None else warmup, store_root, provider, max_workers, engine)
+        for first, last in bounds
+        ]
+
+    metrics.set('shards', len(tasks))
+
+    if store is not None and tasks:
+        with metrics.stage('store'):
+            refresh_store(store, tasks, provider, metrics)
+
+    with metrics.stage('shards'):
+        if workers == 1 or len(tasks) <= 1:
+            results = [_backtest_shard(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                results = list(executor.map(_backtest_shard, tasks))
+
+    candidates = [c for shard_candidates, _ in results for c in shard_candidates]
+    records = [r for _, shard_records in results for r in shard_records]
+
+    with metrics.stage('merge'):
+        trades = collect_trades(candidates, lambda i, day, ticker: records[i])
+
+    metrics.set('candidates', len(candidates))
+    metrics.set('trades', len(trades))
+    metrics.write()
+
+    return summarize_trades(trades, start_dt, end_dt, bootstrap, portfolio)
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+METRICS = ('win_rate', 'avg_win', 'avg_loss', 'profit_factor', 'expectancy', 'annual_return', 'sharpe')
+
+def trade_metrics(returns, net, years, risk_free=0.05):
+    """
+    The run_backtester summary metrics for a 1D array of trade returns
+    (and per-share nets), or for every row of 2D (samples x trades)
+    arrays at once. years is the length of the backtest window; the
+    annual return scales the expectancy by the trades per year.
+    Returns {metric: float or array}.
+    """
+
+    returns = np.asarray(returns, dtype=np.float64)
+    net = np.asarray(net, dtype=np.float64)
+    flat = returns.ndim == 1
+    if flat:
+        returns, net = returns[None, :], net[None, :]
+
+    n = returns.shape[1]
+    wins = returns > 0
+    n_wins = wins.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        win_rate = n_wins / n
+        avg_win = np.where(wins, returns, 0).sum(axis=1) / n_wins
+        avg_loss = np.where(wins, 0, returns).sum(axis=1) / (n - n_wins)
+
+        expectancy = np.where(n_wins > 0, win_rate * avg_win, 0) + np.where(n_wins < n, (1 - win_rate) * avg_loss, 0)
+
+        gross_profit = np.where(net > 0, net, 0).sum(axis=1)
+        gross_loss = np.abs(np.where(net > 0, 0, net).sum(axis=1))
+        profit_factor = np.where(gross_loss != 0, gross_profit / gross_loss, np.inf)
+
+        trades_yearly = n / max(years, 1e-9)
+        annual_return = expectancy * trades_yearly
+
+        std = returns.std(axis=1, ddof=1) if n > 1 else np.zeros(len(returns))
+        sharpe = np.where((std > 0) & (n > 1), (annual_return - risk_free) / (std * np.sqrt(trades_yearly)), 0.)
+
+    out = {
+        'win_rate': win_rate,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'profit_factor': profit_factor,
+        'expectancy': expectancy,
+        'annual_return': annual_return,
+        'sharpe': sharpe,
+    }
+
+    if flat:
+        return {k: float(v[0]) for k, v in out.items()}
+    return out
+
+def _batches(resamples, n, batch):
+    if batch is None:
+        # keep each (batch x trades) index matrix around 4M entries
+        batch = max(1, min(resamples, 4_000_000 // max(n, 1)))
+    for start in range(0, resamples, batch):
+        yield min(batch, resamples - start)
+
+def bootstrap_metrics(returns, net, years, resamples=10_000, risk_free=0.05, seed=0, batch=None):
+    """
+    Bootstrap distributions of trade_metrics: resamples draws of the
+    trades with replacement, evaluated batch rows at a time.
+    Returns {metric: array of length resamples}.
+    """
+
+    returns = np.asarray(returns, dtype=np.float64)
+    net = np.asarray(net, dtype=np.float64)
+    n = len(returns)
+
+    rng = np.random.default_rng(seed)
+    parts = {k: [] for k in METRICS}
+
+    for size in _batches(resamples, n, batch):
+        idx = rng.integers(0, n, size=(size, n))
+        for k, v in trade_metrics(returns[idx], net[idx], years, risk_free).items():
+            parts[k].append(v)
+
+    return {k: np.concatenate(v) if v else np.empty(0) for k, v in parts.items()}
+
+def confidence_intervals(returns, net, years, resamples=10_000, level=0.95, risk_free=0.05, seed=0, batch=None):
+    """
+    Point estimates with percentile bootstrap intervals, one row per metric
+    (Estimate, Low, High, Std). Resamples where a metric is undefined (no
+    wins, no losses) are left out of its interval.
+    """
+
+    estimate = trade_metrics(returns, net, years, risk_free)
+    dist = bootstrap_metrics(returns, net, years, resamples, risk_free, seed, batch)
+    tail = (1 - level) / 2
+
+    rows = []
+    for k in METRICS:
+        values = dist[k][np.isfinite(dist[k])]
+        if len(values):
+            low, high = np.quantile(values, [tail, 1 - tail])
+            std = values.std(ddof=1) if len(values) > 1 else 0.
+        else:
+            low = high = std = np.nan
+        rows.append((k, estimate[k], low, high, std))
+
+    return pd.DataFrame(rows, columns=['Metric', 'Estimate', 'Low', 'High', 'Std']).set_index('Metric')
+
+def drawdown_distribution(returns, paths=10_000, size=1.0, seed=0, batch=None):
+    """
+    Monte-Carlo max drawdowns of the compounded equity curve when the
+    trades arrive in a random order (drawn with replacement), risking
+    size of equity per trade. Returns an array of paths drawdowns (<= 0).
+    """
+
+    returns = np.asarray(returns, dtype=np.float64)
+    n = len(returns)
+
+    rng = np.random.default_rng(seed)
+    out = []
+
+    for rows in _batches(paths, n, batch):
+        idx = rng.integers(0, n, size=(rows, n))
+        equity = np.cumprod(1 + size * returns[idx], axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 1.)
+        out.append(np.minimum((equity / peak - 1).min(axis=1), 0.))
+
+    return np.concatenate(out) if out else np.empty(0)
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of values in O(1)
+    memory (Welford). update() takes a whole chunk at once and folds it
+    in with the parallel merge of Chan et al., so per-value Python loops
+    are not needed; merge() combines accumulators from different workers.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count, mean, m2, low, high):
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        mean = values.mean()
+        self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+        return self
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def var(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.var))
+
+class TradeStats:
+    """
+    Streaming version of trade_metrics. Feed each variant's trades in
+    chunks (or merge per-worker accumulators) and drop the frames; only
+    a handful of sums is kept, and metrics() gives the same numbers as
+    trade_metrics over all trades seen.
+    """
+
+    def __init__(self):
+        self.returns = RunningStats()
+        self.wins = 0
+        self.win_sum = 0.
+        self.loss_sum = 0.
+        self.gross_profit = 0.
+        self.gross_loss = 0.
+
+    @property
+    def count(self):
+        return self.returns.count
+
+    def update(self, returns, net):
+        returns = np.asarray(returns, dtype=np.float64)
+        net = np.asarray(net, dtype=np.float64)
+        wins = returns > 0
+
+        self.returns.update(returns)
+        self.wins += int(wins.sum())
+        self.win_sum += float(returns[wins].sum())
+        self.loss_sum += float(returns[~wins].sum())
+        self.gross_profit += float(net[net > 0].sum())
+        self.gross_loss += float(-net[net <= 0].sum())
+        return self
+
+    def update_trades(self, df_trades):
+        """
+        update() from a collect_trades / run_backtester trade frame.
+        """
+
+        if df_trades is None or df_trades.empty:
+            return self
+        return self.update(df_trades['Return %'].to_numpy(), df_trades['Net'].to_numpy())
+
+    def merge(self, other):
+        self.returns.merge(other.returns)
+        self.wins += other.wins
+        self.win_sum += other.win_sum
+        self.loss_sum += other.loss_sum
+        self.gross_profit += other.gross_profit
+        self.gross_loss += other.gross_loss
+        return self
+
+    def metrics(self, years, risk_free=0.05):
+        n = self.count
+        if not n:
+            return {k: np.nan for k in METRICS}
+
+        losses = n - self.wins
+        win_rate = self.wins / n
+        avg_win = self.win_sum / self.wins if self.wins else np.nan
+        avg_loss = self.loss_sum / losses if losses else np.nan
+        expectancy = (win_rate * avg_win if self.wins else 0.) + ((1 - win_rate) * avg_loss if losses else 0.)
+
+        trades_yearly = n / max(years, 1e-9)
+        annual_return = expectancy * trades_yearly
+        std = self.returns.std
+
+        return {
+            'win_rate': win_rate,
+            'avg_win': avg_win,
+            'avg_loss': avg_loss,
+            'profit_factor': self.gross_profit / self.gross_loss if self.gross_loss != 0 else np.inf,
+            'expectancy': expectancy,
+            'annual_return': annual_return,
+            'sharpe': (annual_return - risk_free) / (std * np.sqrt(trades_yearly)) if std > 0 and n > 1 else 0.,
+        }
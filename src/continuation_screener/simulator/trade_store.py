@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+TIME_COLUMNS = ('Entry Time', 'Exit Time')
+VALUE_COLUMNS = ('Entry Price', 'Exit Price', 'Net', 'Return %', 'Option Net ($)', 'Hold_Time')
+CATEGORY_COLUMNS = ('Run', 'Ticker', 'Entry Method', 'Exit Type')
+
+# column order of run_backtester trades, with the run they came from last
+COLUMNS = (
+    'Ticker', 'Entry Time', 'Entry Price', 'Entry Method', 'Exit Time',
+    'Exit Price', 'Exit Type', 'Net', 'Return %', 'Option Net ($)', 'Hold_Time', 'Run',
+)
+
+AGGREGATE_BY = {'month': None, 'exit_type': 'Exit Type', 'ticker': 'Ticker', 'run': 'Run'}
+
+def _file(column):
+    return column.replace(' ', '_').replace('%', 'pct').replace('($)', 'usd').lower() + '.npy'
+
+def _end_of(end):
+    end = pd.Timestamp(end)
+    # a bare date includes the whole day
+    return end + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns') if end == end.normalize() else end
+
+def trade_columns(df_trades):
+    """
+    Fills the derived trade columns collect_trades adds (Return %,
+    Option Net ($), Hold_Time in days) where they are missing, e.g.
+    in older CSV exports, and parses the time columns.
+    """
+
+    df = df_trades.copy()
+    for column in TIME_COLUMNS:
+        df[column] = pd.to_datetime(df[column])
+        if df[column].dt.tz is not None:
+            df[column] = df[column].dt.tz_convert('America/New_York').dt.tz_localize(None)
+
+    if 'Return %' not in df:
+        df['Return %'] = df['Exit Price'] / df['Entry Price'] - 1
+    if 'Option Net ($)' not in df:
+        df['Option Net ($)'] = 1000 * df['Return %'] * 10
+    if 'Hold_Time' not in df:
+        df['Hold_Time'] = (df['Exit Time'] - df['Entry Time']) / pd.Timedelta(days=1)
+    if 'Entry Method' not in df:
+        df['Entry Method'] = 'reclaim'
+
+    return df
+
+class TradeStore:
+    """
+    Columnar archive of backtest trades, partitioned by entry month.
+    Every partition is a directory of .npy files: datetime64[ns] entry
+    and exit times, float64 prices and returns, and int32 codes for the
+    run, ticker, entry method and exit type, whose labels live in
+    manifest.json next to each run's summary and row counts.
+
+    query() and aggregate() only open the months inside the requested
+    range, memory-map the columns, filter on the codes first and copy
+    out just the matching rows of the columns asked for. Writing a run
+    again replaces its rows. Rewritten months go to new directories and
+    only saving the manifest switches to them, together with any new
+    codes, so a crash mid-write leaves the previous state readable.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest_path = os.path.join(self.root, 'manifest.json')
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {'categories': {c: [] for c in CATEGORY_COLUMNS}, 'partitions': {}, 'runs': {}}
+        with open(self._manifest_path) as f:
+            return json.load(f)
+
+    def save(self):
+        """
+        Atomically writes the manifest to disk.
+        """
+
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp, self._manifest_path)
+
+    def _partition(self, month):
+        entry = self.manifest['partitions'].get(month, {})
+        return os.path.join(self.root, entry.get('dir', month))
+
+    def runs(self):
+        return sorted(self.manifest['runs'])
+
+    def months(self):
+        return sorted(self.manifest['partitions'])
+
+    def summary(self, run):
+        """
+        The summary frame stored with run, None when there is none.
+        """
+
+        records = self.manifest['runs'].get(run, {}).get('summary')
+        return None if records is None else pd.DataFrame(records)
+
+    def _codes(self, column, values):
+        labels = self.manifest['categories'][column]
+        lookup = {label: code for code, label in enumerate(labels)}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            value = str(value)
+            if value not in lookup:
+                lookup[value] = len(labels)
+                labels.append(value)
+            codes[i] = lookup[value]
+        return codes
+
+    def _lookup(self, column, values):
+        labels = self.manifest['categories'][column]
+        wanted = {values} if isinstance(values, str) else set(values)
+        return np.array([code for code, label in enumerate(labels) if label in wanted], dtype=np.int32)
+
+    def _read_partition(self, month, columns, mmap=True):
+        path = self._partition(month)
+        mode = 'r' if mmap else None
+        return {c: np.load(os.path.join(path, _file(c)), mmap_mode=mode) for c in columns}
+
+    def _write_partition(self, month, arrays):
+        path = tempfile.mkdtemp(dir=self.root, prefix=month + '.')
+        for column, values in arrays.items():
+            np.save(os.path.join(path, _file(column)), values)
+        return os.path.basename(path)
+
+    def write(self, df_trades, run, summary=None, params=None):
+        """
+        Stores a run_backtester trade frame (and its summary) as run,
+        replacing whatever run held before, and saves the manifest.
+        """
+
+        df = trade_columns(df_trades).sort_values('Entry Time', kind='stable')
+        stored = TIME_COLUMNS + VALUE_COLUMNS + CATEGORY_COLUMNS
+
+        new = {c: df[c].to_numpy().astype('datetime64[ns]') for c in TIME_COLUMNS}
+        new.update({c: df[c].to_numpy(dtype=np.float64) for c in VALUE_COLUMNS})
+        new.update({c: self._codes(c, df[c].tolist()) for c in ('Ticker', 'Entry Method', 'Exit Type')})
+        new['Run'] = self._codes('Run', [run] * len(df))
+
+        run_code = self._codes('Run', [run])[0]
+        months = pd.DatetimeIndex(df['Entry Time']).strftime('%Y-%m').to_numpy()
+        touched = set(months) | {m for m, entry in self.manifest['partitions'].items() if run in entry['runs']}
+
+        # new partitions go into fresh directories and the old ones are only
+        # removed once the manifest pointing at the new ones is saved
+        stale = []
+
+        for month in sorted(touched):
+            if month in self.manifest['partitions']:
+                old = self._read_partition(month, stored, mmap=False)
+                keep = old['Run'] != run_code
+                arrays = {c: np.concatenate([old[c][keep], new[c][months == month]]) for c in stored}
+                stale.append(self._partition(month))
+            else:
+                arrays = {c: new[c][months == month] for c in stored}
+
+            order = np.argsort(arrays['Entry Time'], kind='stable')
+            arrays = {c: v[order] for c, v in arrays.items()}
+
+            if not len(order):
+                self.manifest['partitions'].pop(month, None)
+                continue
+
+            labels = self.manifest['categories']['Run']
+            self.manifest['partitions'][month] = {
+                'dir': self._write_partition(month, arrays),
+                'rows': len(order),
+                'runs': sorted({labels[code] for code in np.unique(arrays['Run'])}),
+            }
+
+        self.manifest['runs'][run] = {
+            'rows': len(df),
+            'start': str(df['Entry Time'].min()) if len(df) else None,
+            'end': str(df['Entry Time'].max()) if len(df) else None,
+            'written': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'params': params,
+            'summary': None if summary is None else json.loads(summary.to_json(orient='records')),
+        }
+        self.save()
+
+        for path in stale:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def import_csv(self, trades_path, summary_path=None, run=None):
+        """
+        Loads a backtest_trades_*.csv export (and its summary csv) as run,
+        by default named after the file.
+        """
+
+        if run is None:
+            run = os.path.splitext(os.path.basename(trades_path))[0].replace('backtest_trades_', '')
+
+        summary = pd.read_csv(summary_path, keep_default_na=False) if summary_path is not None else None
+        self.write(pd.read_csv(trades_path), run, summary=summary)
+        return run
+
+    def _months_in(self, start, end):
+        months = self.months()
+        if start is not None:
+            months = [m for m in months if m >= pd.Timestamp(start).strftime('%Y-%m')]
+        if end is not None:
+            months = [m for m in months if m <= _end_of(end).strftime('%Y-%m')]
+        return months
+
+    def _scan(self, columns, start=None, end=None, tickers=None, exit_types=None, runs=None):
+        filters = {
+            'Ticker': None if tickers is None else self._lookup('Ticker', tickers),
+            'Exit Type': None if exit_types is None else self._lookup('Exit Type', exit_types),
+            'Run': None if runs is None else self._lookup('Run', runs),
+        }
+        lo = None if start is None else np.datetime64(pd.Timestamp(start), 'ns')
+        hi = None if end is None else np.datetime64(_end_of(end), 'ns')
+
+        parts = {c: [] for c in columns}
+
+        for month in self._months_in(start, end):
+            needed = set(columns) | {c for c, codes in filters.items() if codes is not None} | {'Entry Time'}
+            arrays = self._read_partition(month, needed)
+
+            mask = np.ones(len(arrays['Entry Time']), dtype=bool)
+            if lo is not None:
+                mask &= arrays['Entry Time'] >= lo
+            if hi is not None:
+                mask &= arrays['Entry Time'] <= hi
+            for column, codes in filters.items():
+                if codes is not None:
+                    mask &= np.isin(arrays[column], codes)
+
+            if not mask.any():
+                continue
+            for c in columns:
+                parts[c].append(np.array(arrays[c][mask]))
+
+        out = {}
+        for c in columns:
+            values = np.concatenate(parts[c]) if parts[c] else np.empty(0, dtype=self._dtype(c))
+            if c in CATEGORY_COLUMNS:
+                values = pd.Categorical.from_codes(values, categories=self.manifest['categories'][c])
+            out[c] = values
+
+        return pd.DataFrame(out, columns=list(columns))
+
+    @staticmethod
+    def _dtype(column):
+        if column in TIME_COLUMNS:
+            return 'datetime64[ns]'
+        if column in CATEGORY_COLUMNS:
+            return np.int32
+        return np.float64
+
+    def query(self, start=None, end=None, tickers=None, exit_types=None, runs=None, columns=None):
+        """
+        Trades entered between start and end (inclusive, a bare date
+        covers the whole day), optionally only for some tickers, exit
+        types and runs, in entry order. Tickers, exit types and runs come
+        back as categoricals. columns picks a subset to read.
+        """
+
+        columns = COLUMNS if columns is None else tuple(columns)
+        return self._scan(columns, start, end, tickers, exit_types, runs)
+
+    def aggregate(self, by='month', start=None, end=None, tickers=None, exit_types=None, runs=None):
+        """
+        Trade count, win rate, average return, nets and average hold time
+        per entry month, exit type, ticker or run, over the same filters
+        as query(). Only the columns involved are read.
+        """
+
+        if by not in AGGREGATE_BY:
+            raise ValueError(f'cannot aggregate by {by}, use one of {sorted(AGGREGATE_BY)}')
+
+        group = AGGREGATE_BY[by]
+        columns = ('Entry Time', 'Return %', 'Net', 'Option Net ($)', 'Hold_Time') + ((group,) if group else ())
+        df = self._scan(columns, start, end, tickers, exit_types, runs)
+
+        key = df['Entry Time'].dt.to_period('M').rename('Month') if group is None else df[group]
+        df['Win'] = df['Return %'] > 0
+
+        grouped = df.groupby(key, observed=True)
+        return pd.DataFrame({
+            'Trades': grouped.size(),
+            'Win Rate': grouped['Win'].mean(),
+            'Avg Return %': grouped['Return %'].mean(),
+            'Net': grouped['Net'].sum(),
+            'Option Net ($)': grouped['Option Net ($)'].sum(),
+            'Avg Hold (days)': grouped['Hold_Time'].mean(),
+        })
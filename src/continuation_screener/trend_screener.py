@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
-from continuation_screener.data.indicators import add_emas, add_atr, add_rsi
+from continuation_screener.data.indicators import add_emas, add_atr, add_rsi, panel_indicators
+from continuation_screener.data.panel import missing_rows
 
 def stacked_emas(df, period=7, slope_thresh=0.012, dist_thresh=0.75, depth_thresh=-0.8, debug=False, bt=False):
     """
@@ -145,7 +147,7 @@ def ema_bounce_score(df, period=14, cushion=0.005, bt=False):
     else:
         return int(scorecomp) if passes else None
     
-def avg_volume(df, min_avg_vol=1000000, min_price=20.00, bt=False):
+def avg_volume(df, min_avg_vol=1000000, min_price=20.00, rvol_factor=1.05, bt=False):
     """
     Ensuring sufficient liquidity and minimum price floor.
     """
@@ -163,7 +165,7 @@ def avg_volume(df, min_avg_vol=1000000, min_price=20.00, bt=False):
 
     liquidity = avg_vol >= min_avg_vol
 
-    rvol = signal >= (avg_vol * 1.05)
+    rvol = signal >= (avg_vol * rvol_factor)
 
     passes = liquidity and rvol and price_pass
 
@@ -173,6 +175,155 @@ def avg_volume(df, min_avg_vol=1000000, min_price=20.00, bt=False):
     else:
         return df if passes else None
 
-    
+def stacked_emas_features(panel, ind):
+    """
+    Threshold-free inputs of stacked_emas for every (date, ticker).
+    """
 
-    
+    close = panel['Close']
+    ema9 = ind['EMA_9']
+    atr = ind['ATR_14']
+
+    ema9_prior = ema9.shift(13)
+
+    return {
+        'macro': close > ind['EMA_200'],
+        'ema_slope': (ema9 - ema9_prior) / ema9_prior,
+        'ema_stacked': (
+            (ema9 > ind['EMA_20']) &
+            (ind['EMA_20'] > ind['EMA_50'])
+        ).astype(float).rolling(14).min() == 1,
+        'ema9_distance': (close - ema9) / atr,
+        'ema_respect': (close > ema9).astype(float).rolling(14).min() == 1,
+        'depth': ((panel['Low'] - ema9) / atr).rolling(14).min(),
+        }
+
+def stacked_emas_pass(features, slope_thresh=0.012, dist_thresh=0.75, depth_thresh=-0.8):
+    """
+    Applies the stacked_emas thresholds to stacked_emas_features.
+    """
+
+    return (
+        features['ema_stacked'] &
+        ~(features['ema_slope'] < slope_thresh) &
+        features['ema_respect'] &
+        ~(features['depth'] < depth_thresh) &
+        ~(features['ema9_distance'] > dist_thresh) &
+        features['macro']
+        )
+
+def stacked_emas_mask(panel, ind, slope_thresh=0.012, dist_thresh=0.75, depth_thresh=-0.8):
+    """
+    Panel version of stacked_emas. Returns a (dates x tickers) boolean frame,
+    each row being the result stacked_emas would give on history up to that date.
+    """
+
+    return stacked_emas_pass(stacked_emas_features(panel, ind), slope_thresh, dist_thresh, depth_thresh)
+
+def atr_pct_average(panel, ind):
+    """
+    7-bar mean of ATR_14/Close per (date, ticker).
+    """
+
+    return (ind['ATR_14'] / panel['Close']).rolling(7, min_periods=1).mean()
+
+def balanced_atr_mask(panel, ind, low_atr=0.009, high_atr=0.047):
+    """
+    Panel version of balanced_atr.
+    """
+
+    atr_avg = atr_pct_average(panel, ind)
+
+    return (atr_avg >= low_atr) & (atr_avg <= high_atr)
+
+def rsi_average(ind):
+    """
+    7-bar mean of RSI_14 per (date, ticker).
+    """
+
+    return ind['RSI_14'].rolling(7, min_periods=1).mean()
+
+def balanced_rsi_mask(panel, ind, low_rsi=50, high_rsi=78):
+    """
+    Panel version of balanced_rsi.
+    """
+
+    rsi_avg = rsi_average(ind)
+
+    return (rsi_avg >= low_rsi) & (rsi_avg <= high_rsi)
+
+def ema_bounce_counts(panel, ind, period=14, cushion=0.005):
+    """
+    Panel version of ema_bounce_score. Counts bounces over the last
+    `period` bars, excluding the two most recent.
+    """
+
+    ema9 = ind['EMA_9']
+
+    touch_bounce = (
+        (panel['Low'] >= ema9 * (1 - cushion)) &
+        (panel['Low'] <= ema9 * (1 + cushion)) &
+        (panel['Close'] > ema9) &
+        (panel['Close'] > panel['Open'])
+        )
+
+    return touch_bounce.astype(float).rolling(period - 2).sum().shift(2)
+
+def average_volume(panel):
+    """
+    20-bar mean of Volume per (date, ticker).
+    """
+
+    return panel['Volume'].rolling(20, min_periods=1).mean()
+
+def avg_volume_pass(close, volume, avg_vol, min_avg_vol=1000000, min_price=20.00, rvol_factor=1.05):
+    """
+    Applies the avg_volume thresholds to prices, volume and 20-bar average volume.
+    """
+
+    price_pass = close >= min_price
+    liquidity = avg_vol >= min_avg_vol
+    rvol = volume >= (avg_vol * rvol_factor)
+
+    return liquidity & rvol & price_pass
+
+def avg_volume_mask(panel, min_avg_vol=1000000, min_price=20.00, rvol_factor=1.05):
+    """
+    Panel version of avg_volume.
+    """
+
+    return avg_volume_pass(panel['Close'], panel['Volume'], average_volume(panel), min_avg_vol, min_price, rvol_factor)
+
+def history_mask(panel, window=300, min_rows=210):
+    """
+    (dates x tickers) mask of days where a ticker has at least min_rows bars
+    of history and no missing values in the trailing window.
+    """
+
+    nan_rows = missing_rows(panel)
+    clean = nan_rows.astype(float).rolling(window, min_periods=1).max() == 0
+
+    enough = np.arange(1, len(panel) + 1) >= min_rows
+
+    return pd.DataFrame(clean.to_numpy() & enough[:, None], index=clean.index, columns=clean.columns)
+
+def screen_masks(panel, ind=None):
+    """
+    Evaluates every strategy filter on a (dates x tickers) panel.
+    Returns the pass masks in screening order plus the bounce scores.
+    """
+
+    if ind is None:
+        ind = panel_indicators(panel)
+
+    scores = ema_bounce_counts(panel, ind)
+
+    masks = {
+        'vol': avg_volume_mask(panel),
+        'ema': stacked_emas_mask(panel, ind),
+        'atr': balanced_atr_mask(panel, ind),
+        'rsi': balanced_rsi_mask(panel, ind),
+        'bounce': scores >= 2,
+        }
+
+    return masks, scores
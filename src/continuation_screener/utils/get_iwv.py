@@ -3,48 +3,70 @@ import requests
 from io import StringIO
 import re
 
-def get_iwv_tickers():
+IWV_URL = "https://www.ishares.com/us/products/239714/ishares-russell-3000-etf/1467271812596.ajax?fileType=csv&fileName=IWV_holdings&dataType=fund"
+
+def parse_iwv_holdings(csv_data):
     """
-    Scrapes the IShares Russell 3000 ETF holdings to get a current list
-    of the 3000 largest publicly traded US companies.
+    Parses the iShares holdings csv into a list of tickers.
+    Raises ValueError if the file has no ticker table.
     """
-    
-    url = "https://www.ishares.com/us/products/239714/ishares-russell-3000-etf/1467271812596.ajax?fileType=csv&fileName=IWV_holdings&dataType=fund"
+
+    lines = csv_data.splitlines()
+
+    header = [i for i,l in enumerate(lines) if l.strip().startswith('Ticker,')]
+
+    if not header:
+        raise ValueError('could not find ticker header in ishares csv.')
+
+    csv_clean = '\n'.join(lines[header[0]:])
+
+    table = pd.read_csv(StringIO(csv_clean))
+
+    tickeridentify = re.compile(r'^[A-Z0-9\.\-]{1,6}$')
+
+    tickers = (
+        table['Ticker']
+        .dropna()
+        .astype(str)
+        .str.strip()
+        .tolist()
+        )
+
+    return [t for t in tickers if tickeridentify.match(t)]
+
+def fetch_iwv_tickers(as_of_date=None):
+    """
+    Downloads the IShares Russell 3000 ETF holdings, as of as_of_date
+    when given (iShares serves past month-end holdings), and raises
+    on any failure instead of returning an empty universe.
+    """
+
+    url = IWV_URL
+    if as_of_date is not None:
+        url += '&asOfDate=' + pd.Timestamp(as_of_date).strftime('%Y%m%d')
+
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
         }
-    try:
-        response = requests.get(url, headers=headers)
-        csv_data = response.text
-        lines = csv_data.splitlines()
 
+    response = requests.get(url, headers=headers, timeout=30)
+    response.raise_for_status()
 
-        start = [i for i,l in enumerate(lines) if l.strip().startswith('Ticker,')][0]
+    tickers = parse_iwv_holdings(response.text)
 
-        if not start:
-            print('could not find ticker header in ishares csv.')
-            return []
+    if not tickers:
+        raise ValueError('ishares csv has no tickers.')
 
-        csv_clean = '\n'.join(lines[start:])
-    
-        table = pd.read_csv(StringIO(csv_clean))
+    return tickers
 
-        tickeridentify = re.compile(r'^[A-Z0-9\.\-]{1,6}$')
-    
-        tickers = (
-            table['Ticker']
-            .dropna()
-            .astype(str)
-            .str.strip()
-            .tolist()
-            )
-        tickers = [t for t in tickers if tickeridentify.match(t)]
+def get_iwv_tickers():
+    """
+    Scrapes the IShares Russell 3000 ETF holdings to get a current list
+    of the 3000 largest publicly traded US companies.
+    """
 
-        return tickers
+    try:
+        return fetch_iwv_tickers()
     except Exception as e:
         print(f'error fetchin tickers: {e}')
         return []
-             
-
-    
-    
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import contextlib
+
+class Metrics:
+    """
+    Counters, gauges and stage timings collected during one run.
+
+    Stages, filter funnels, download batches and cache stats are
+    recorded as they happen; write() appends the run's events and a
+    closing summary to jsonl_path and replaces prom_path with the
+    current values in Prometheus text format (for a node_exporter
+    textfile collector or any scheduler that can scrape a file).
+    Counters only go up and end in _total; gauges hold the last value.
+    write() can be called more than once, each call appends only the
+    events recorded since the last one. Safe to share between threads.
+    """
+
+    def __init__(self, run='screener', jsonl_path=None, prom_path=None, prefix='continuation_screener'):
+        self.run = run
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.prefix = prefix
+        self.started = time.time()
+
+        self.counters = {}
+        self.gauges = {}
+        self.events = []
+        self._written = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def get(self, name, **labels):
+        """
+        Current value of a counter or gauge, 0 if never recorded.
+        """
+
+        key = self._key(name, labels)
+        with self._lock:
+            return self.counters.get(key, self.gauges.get(key, 0))
+
+    def event(self, name, **fields):
+        record = {'ts': round(time.time(), 3), 'run': self.run, 'event': name, **fields}
+        with self._lock:
+            self.events.append(record)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Times the enclosed block as stage name.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.set('stage_seconds', seconds, stage=name)
+            self.event('stage', stage=name, seconds=round(seconds, 6))
+
+    def funnel(self, total, fails, stages, passed=0):
+        """
+        Records tickers in and out of each filter stage, in stages order,
+        from the screen_snapshot fail counts and the number of tickers
+        that passed every stage. Tickers without data count as dropped
+        by a leading 'download' stage.
+        """
+
+        screened = sum(fails.values()) + passed
+        alive = total
+        for stage, removed in [('download', total - screened)] + [(s, fails.get(s, 0)) for s in stages]:
+            self.set('filter_tickers_in', alive, stage=stage)
+            alive -= removed
+            self.set('filter_tickers_out', alive, stage=stage)
+            self.event('filter', stage=stage, tickers_in=alive + removed, tickers_out=alive)
+
+    def download_batch(self, data, tickers, complete, seconds, retry=False):
+        """
+        Records one provider.daily() call: rows and bytes received and
+        how many of its tickers came back complete.
+        """
+
+        kind = 'retry' if retry else 'batch'
+        rows = 0 if data is None else len(data)
+        nbytes = 0 if data is None else int(data.memory_usage(index=True).sum())
+
+        self.inc('download_batches_total', kind=kind)
+        self.inc('download_rows_total', rows)
+        self.inc('download_bytes_total', nbytes)
+        self.inc('download_seconds_total', seconds)
+        self.inc('download_tickers_total', complete, status='complete')
+        self.inc('download_tickers_total', tickers - complete, status='incomplete')
+        self.event('download', kind=kind, tickers=tickers, complete=complete, rows=rows, bytes=nbytes, seconds=round(seconds, 6))
+
+    def cache(self, stats, name='bar_cache'):
+        """
+        Records a BarCache.stats() snapshot as gauges.
+        """
+
+        for key, value in stats.items():
+            self.set(f'{name}_{key}', value)
+
+    def summary(self):
+        """
+        Every counter and gauge as a flat {name{labels}: value} dict.
+        """
+
+        with self._lock:
+            items = list(self.counters.items()) + list(self.gauges.items())
+
+        return {_series(name, labels): value for (name, labels), value in sorted(items)}
+
+    def to_jsonl(self, start=0, stop=None):
+        with self._lock:
+            events = self.events[start:stop]
+
+        closing = {
+            'ts': round(time.time(), 3),
+            'run': self.run,
+            'event': 'summary',
+            'seconds': round(time.time() - self.started, 6),
+            'metrics': self.summary(),
+        }
+
+        return ''.join(json.dumps(record, default=str) + '\n' for record in events + [closing])
+
+    def to_prometheus(self):
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+
+        lines = []
+        for kind, items in (('counter', counters), ('gauge', gauges)):
+            seen = set()
+            for (name, labels), value in items:
+                full = f'{self.prefix}_{name}'
+                if full not in seen:
+                    lines.append(f'# TYPE {full} {kind}')
+                    seen.add(full)
+                labels = (('run', self.run),) + labels
+                lines.append(f'{_series(full, labels)} {float(value):g}')
+
+        full = f'{self.prefix}_last_run_timestamp_seconds'
+        lines.append(f'# TYPE {full} gauge')
+        lines.append(f'{full}{{run="{self.run}"}} {time.time():.3f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self):
+        """
+        Appends the JSON lines to jsonl_path and atomically replaces
+        prom_path. Paths left as None are skipped.
+        """
+
+        if self.jsonl_path is not None:
+            _makedirs(self.jsonl_path)
+            with self._lock:
+                start = self._written
+                stop = self._written = len(self.events)
+            with open(self.jsonl_path, 'a') as f:
+                f.write(self.to_jsonl(start, stop))
+
+        if self.prom_path is not None:
+            root = _makedirs(self.prom_path)
+            fd, tmp = tempfile.mkstemp(dir=root, suffix='.prom')
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, self.prom_path)
+
+def _series(name, labels):
+    if not labels:
+        return name
+    body = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f'{name}{{{body}}}'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _makedirs(path):
+    root = os.path.dirname(os.path.abspath(path))
+    os.makedirs(root, exist_ok=True)
+    return root
@@ -0,0 +1,169 @@
+import os
+import json
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+from continuation_screener.utils.get_iwv import fetch_iwv_tickers
+
+class UniverseStore:
+    """
+    Local snapshots of the screening universe, one csv per holdings date.
+
+    current() serves the latest snapshot and only refetches once it is
+    older than ttl; as_of() returns the constituents in force on a past
+    date, fetching that date's holdings when no snapshot is close enough.
+    A failed fetch falls back to the cached snapshot, and with nothing
+    cached it raises instead of returning an empty universe.
+    fetch(as_of_date=None) must return a list of tickers or raise.
+    """
+
+    def __init__(self, root, ttl=pd.Timedelta(days=1), max_age=pd.Timedelta(days=45), fetch=fetch_iwv_tickers):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.ttl = pd.Timedelta(ttl)
+        self.max_age = pd.Timedelta(max_age)
+        self.fetch = fetch
+        self._manifest_path = os.path.join(self.root, 'manifest.json')
+        self.manifest = self._load_manifest()
+        self._snapshots = {}
+        self._failed_months = set()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        if not os.path.exists(self._manifest_path):
+            return {}
+        with open(self._manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, self._manifest_path)
+
+    def dates(self):
+        """
+        Sorted holdings dates of the stored snapshots.
+        """
+
+        return pd.DatetimeIndex(sorted(pd.Timestamp(d) for d in self.manifest))
+
+    def write(self, date, tickers):
+        """
+        Stores the holdings for date and returns them.
+        """
+
+        if not tickers:
+            raise ValueError(f'refusing to store an empty universe for {date}')
+
+        key = pd.Timestamp(date).strftime('%Y-%m-%d')
+
+        with self._lock:
+            path = os.path.join(self.root, f'{key}.csv')
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.csv')
+            os.close(fd)
+            pd.DataFrame({'Ticker': tickers}).to_csv(tmp, index=False)
+            os.replace(tmp, path)
+
+            self.manifest[key] = {'fetched': pd.Timestamp.now().isoformat(), 'count': len(tickers)}
+            self._save_manifest()
+            self._snapshots[key] = list(tickers)
+
+        return list(tickers)
+
+    def read(self, date):
+        """
+        Tickers of the snapshot stored for exactly date.
+        """
+
+        key = pd.Timestamp(date).strftime('%Y-%m-%d')
+
+        if key not in self._snapshots:
+            path = os.path.join(self.root, f'{key}.csv')
+            self._snapshots[key] = pd.read_csv(path)['Ticker'].dropna().astype(str).tolist()
+
+        return list(self._snapshots[key])
+
+    def _refresh(self, date, as_of_date):
+        try:
+            return self.write(date, self.fetch(as_of_date=as_of_date))
+        except Exception as e:
+            print(f'error fetching universe for {date.date()}: {e}')
+            return None
+
+    def current(self):
+        """
+        Latest constituents, refetched only when the newest snapshot
+        was fetched more than ttl ago.
+        """
+
+        dates = self.dates()
+
+        if len(dates):
+            latest = dates[-1]
+            fetched = pd.Timestamp(self.manifest[latest.strftime('%Y-%m-%d')]['fetched'])
+            if pd.Timestamp.now() - fetched <= self.ttl:
+                return self.read(latest)
+
+        tickers = self._refresh(pd.Timestamp.now().normalize(), None)
+        if tickers is not None:
+            return tickers
+
+        if not len(dates):
+            raise RuntimeError('universe unavailable: fetch failed and no snapshot is cached.')
+
+        print(f'using cached universe from {dates[-1].date()}')
+        return self.read(dates[-1])
+
+    def snapshot_date(self, date):
+        """
+        Date of the latest stored snapshot on or before date, or None.
+        """
+
+        dates = self.dates()
+        pos = dates.searchsorted(pd.Timestamp(date).normalize(), side='right') - 1
+        return dates[pos] if pos >= 0 else None
+
+    def as_of(self, date):
+        """
+        Constituents in force on date. Holdings for date are fetched when
+        the nearest earlier snapshot is older than max_age.
+        """
+
+        date = pd.Timestamp(date).normalize()
+        snap = self.snapshot_date(date)
+
+        # one failed fetch per month, not one per backtest day
+        month = (date.year, date.month)
+        if (snap is None or date - snap > self.max_age) and month not in self._failed_months:
+            tickers = self._refresh(date, date)
+            if tickers is not None:
+                return tickers
+            self._failed_months.add(month)
+
+        if snap is None:
+            raise RuntimeError(f'universe unavailable: no snapshot on or before {date.date()}.')
+
+        return self.read(snap)
+
+    def membership(self, dates):
+        """
+        (dates x tickers) boolean frame of point-in-time membership, over
+        the union of constituents of every date.
+        """
+
+        dates = pd.DatetimeIndex(dates).normalize()
+
+        members = {}
+        for date in dates:
+            members[date] = self.as_of(date)
+
+        tickers = pd.Index(sorted(set().union(*members.values()))) if members else pd.Index([])
+
+        mask = np.zeros((len(dates), len(tickers)), dtype=bool)
+        for i, date in enumerate(dates):
+            mask[i, tickers.get_indexer(members[date])] = True
+
+        return pd.DataFrame(mask, index=dates, columns=tickers)
@@ -0,0 +1,93 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import numpy as np
+from continuation_screener.data.bar_cache import BarCache
+
+class FakeSource:
+    def __init__(self):
+        index = pd.date_range('2024-01-01', '2024-06-30', freq='15min', tz='America/New_York')
+        index = index[(index.dayofweek < 5) & (index.hour >= 9) & (index.hour < 16)]
+        self.bars = pd.DataFrame({'Close': np.arange(len(index), dtype=float)}, index=index)
+        self.calls = []
+
+    def fetch(self, start, end):
+        self.calls.append((start, end))
+        naive = self.bars.index.tz_localize(None)
+        return self.bars.loc[(naive >= start) & (naive < end)]
+
+class TestBarCache(unittest.TestCase):
+    def setUp(self):
+        self.source = FakeSource()
+        self.cache = BarCache()
+
+    def get(self, start, end, ticker='AAA'):
+        return self.cache.get(ticker, '15m', pd.Timestamp(start), pd.Timestamp(end), self.source.fetch)
+
+    def test_sub_range_served_from_memory(self):
+        full = self.get('2024-03-01', '2024-03-15')
+        sub = self.get('2024-03-04', '2024-03-08')
+        self.assertEqual(len(self.source.calls), 1)
+        pd.testing.assert_frame_equal(sub, self.source.fetch(pd.Timestamp('2024-03-04'), pd.Timestamp('2024-03-08')))
+        self.assertTrue(len(full) > len(sub))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_counters_are_thread_safe(self):
+        self.get('2024-03-01', '2024-03-15')
+        calls = 4000
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: self.get('2024-03-04', '2024-03-08'), range(calls)))
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], calls)
+        self.assertEqual(stats['requests'], calls + 1)
+
+    def test_fetches_only_gaps(self):
+        self.get('2024-03-04', '2024-03-15')
+        result = self.get('2024-03-05', '2024-03-19')
+        self.assertEqual(self.source.calls[-1][1], pd.Timestamp('2024-03-19'))
+        self.assertTrue(self.source.calls[-1][0] < pd.Timestamp('2024-03-15'))
+        pd.testing.assert_frame_equal(result, self.source.fetch(pd.Timestamp('2024-03-05'), pd.Timestamp('2024-03-19')))
+        self.assertEqual(self.cache.stats()['partial_hits'], 1)
+
+    def test_weekend_gap_not_fetched(self):
+        self.get('2024-03-04', '2024-03-09')
+        self.get('2024-03-04', '2024-03-11')
+        self.assertEqual(len(self.source.calls), 1)
+
+    def test_holiday_gaps_next_to_cached_bars(self):
+        # Good Friday: a business day without a session
+        naive = self.source.bars.index.tz_localize(None)
+        self.source.bars = self.source.bars[naive.normalize() != pd.Timestamp('2024-03-29')]
+
+        def fetch(start, end):
+            df = self.source.fetch(start, end)
+            return None if df.empty else df
+
+        get = lambda start, end: self.cache.get('AAA', '15m', pd.Timestamp(start), pd.Timestamp(end), fetch)
+
+        get('2024-04-01', '2024-04-10')
+        leading = get('2024-03-29', '2024-04-10')
+        self.assertIsNotNone(leading)
+        pd.testing.assert_frame_equal(leading, self.source.fetch(pd.Timestamp('2024-04-01'), pd.Timestamp('2024-04-10')))
+
+        get('2024-03-20', '2024-03-29')
+        trailing = get('2024-03-20', '2024-04-01')
+        self.assertIsNotNone(trailing)
+        self.assertEqual(self.cache.stats()['failed_fetches'], 0)
+
+    def test_evicts_least_recently_used(self):
+        self.get('2024-03-01', '2024-03-15', 'AAA')
+        one_key = self.cache.nbytes
+        self.cache.max_bytes = int(one_key * 2.5)
+        self.get('2024-03-01', '2024-03-15', 'BBB')
+        self.get('2024-03-01', '2024-03-15', 'AAA')
+        self.get('2024-03-01', '2024-03-15', 'CCC')
+
+        self.assertLessEqual(self.cache.nbytes, self.cache.max_bytes)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        calls = len(self.source.calls)
+        self.get('2024-03-01', '2024-03-15', 'AAA')
+        self.assertEqual(len(self.source.calls), calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+from entry_exit_test import make_case
+from continuation_screener.simulator.backtester_oneday import simulate_trade
+from continuation_screener.simulator.batch import simulate_batch, trade_record, TRADE_DTYPE
+
+class TestBatchSimulation(unittest.TestCase):
+    def test_matches_single_candidate_simulation(self):
+        cases = [make_case(seed) for seed in range(120)]
+        tickers = [f'T{seed}' for seed in range(len(cases))]
+        cases[3] = (cases[3][0], None)
+        cases[4] = (None, cases[4][1])
+
+        trades = simulate_batch(tickers, [daily for _, daily in cases], [intraday for intraday, _ in cases])
+        self.assertEqual(trades.dtype, TRADE_DTYPE)
+
+        by_candidate = {int(t['candidate']): trade_record(t) for t in trades}
+        expected = {}
+        for i, (intraday, daily) in enumerate(cases):
+            record = simulate_trade(tickers[i], daily, intraday)
+            if record is not None:
+                expected[i] = record
+
+        self.assertGreater(len(expected), 20)
+        self.assertEqual(by_candidate, expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(len(simulate_batch([], [], [])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+from continuation_screener.data.synthetic import SyntheticProvider
+from continuation_screener.simulator.checkpoint import Checkpoint
+from continuation_screener.simulator.run_backtester import run_backtester
+from continuation_screener.utils.metrics import Metrics
+
+START = '2023-06-01'
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'checkpoint.jsonl')
+        self.provider = SyntheticProvider(120)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_bt(self, end, checkpoint=None):
+        metrics = Metrics(run='backtester')
+        trades, summary = run_backtester(START, end, provider=self.provider, engine='batch', metrics=metrics, checkpoint=checkpoint)
+        return trades, summary, metrics
+
+    def test_resume_after_crash(self):
+        expected, expected_summary, metrics = self.run_bt('2024-06-28')
+        candidates = metrics.get('candidates')
+
+        with Checkpoint(self.path, provider=self.provider) as checkpoint:
+            self.run_bt('2024-06-28', checkpoint)
+        self.assertEqual(sum(checkpoint.counts().values()), candidates)
+
+        # keep the first half and a torn line, as if the run died mid-write
+        with open(self.path) as f:
+            lines = f.readlines()
+        with open(self.path, 'w') as f:
+            f.writelines(lines[:len(lines) // 2])
+            f.write(lines[len(lines) // 2][:20])
+
+        with Checkpoint(self.path, provider=self.provider) as checkpoint:
+            self.assertEqual(len(checkpoint), len(lines) // 2)
+            trades, summary, metrics = self.run_bt('2024-06-28', checkpoint)
+
+        self.assertEqual(metrics.get('checkpoint_hits'), len(lines) // 2)
+        pd.testing.assert_frame_equal(trades, expected)
+        pd.testing.assert_frame_equal(summary, expected_summary)
+
+    def test_extending_end_date_only_evaluates_new_days(self):
+        with Checkpoint(self.path, provider=self.provider) as checkpoint:
+            self.run_bt('2024-03-28', checkpoint)
+            first = len(checkpoint)
+
+        expected, _, _ = self.run_bt('2024-06-28')
+
+        with Checkpoint(self.path, provider=self.provider) as checkpoint:
+            trades, _, metrics = self.run_bt('2024-06-28', checkpoint)
+
+        self.assertGreater(first, 0)
+        self.assertEqual(metrics.get('checkpoint_hits'), first)
+        self.assertGreater(metrics.get('candidates'), first)
+        pd.testing.assert_frame_equal(trades, expected)
+
+    def test_key_and_data_failures(self):
+        day = pd.Timestamp('2024-01-05')
+        frame = pd.DataFrame({'Close': [1.]})
+
+        with Checkpoint(self.path, provider=self.provider) as checkpoint:
+            self.assertEqual(checkpoint.record(day, 'A', None, None, None), 'data_failure')
+            self.assertEqual(checkpoint.record(day, 'B', None, frame, frame), 'no_entry')
+            self.assertIsNone(checkpoint.record(pd.Timestamp.now(), 'C', None, frame, frame))
+
+        checkpoint = Checkpoint(self.path, provider=self.provider)
+        self.assertEqual(checkpoint.outcome(day, 'A'), 'data_failure')
+        self.assertFalse(checkpoint.done(day, 'A'))
+        self.assertTrue(checkpoint.done(day, 'B'))
+        self.assertIsNone(checkpoint.outcome(pd.Timestamp.now(), 'C'))
+
+        self.assertEqual(len(Checkpoint(self.path, provider=SyntheticProvider(120, seed=1))), 0)
+        self.assertEqual(len(Checkpoint(self.path, provider=self.provider, params={'note': 'v2'})), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+from panel_test import make_panel
+from providers_test import write_daily
+from continuation_screener.data.panel import Panel
+from continuation_screener.data.dailydata import download_daily, download_panel, get_daily_data
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.screener.run_screener import screen_snapshot
+from continuation_screener.screener.run_screener_bt import screen_history
+from continuation_screener.trend_screener import history_mask
+from continuation_screener.utils.metrics import Metrics
+
+class FlakyProvider(LocalProvider):
+    """
+    Leaves BBB out of the first batch that asks for it.
+    """
+
+    dropped = False
+
+    def daily(self, tickers, start, end, threads=True):
+        data = super().daily(tickers, start, end, threads)
+        if 'BBB' in tickers and not self.dropped:
+            self.dropped = True
+            data = data.drop(columns='BBB', level=1)
+        return data
+
+class TestPanel(unittest.TestCase):
+    def setUp(self):
+        # float32-exact prices so both representations hold the same bars
+        self.frame = make_panel(n_tickers=30, seed=0).astype(np.float32).astype(np.float64)
+        self.frame.loc[:, 'Volume'] = self.frame['Volume'].to_numpy() * 2
+        self.panel = Panel.from_yfinance(self.frame)
+
+    def test_layout(self):
+        self.assertEqual(self.panel.shape, (5, 260, 30))
+        self.assertEqual(self.panel.values.dtype, np.float32)
+        self.assertTrue(np.shares_memory(self.panel['Close'].to_numpy(), self.panel.values))
+        self.assertLess(self.panel.nbytes, self.frame.memory_usage().sum() * 0.55)
+        self.assertEqual(self.panel.memory_usage().sum(), self.panel.nbytes)
+
+        frame = self.panel.to_frame()
+        pd.testing.assert_frame_equal(frame, self.frame.reindex(columns=frame.columns), check_freq=False)
+        pd.testing.assert_frame_equal(
+            self.panel.ticker('T3'), self.frame.xs('T3', level=1, axis=1).astype(np.float32),
+            check_freq=False, check_names=False
+        )
+
+    def test_row_selection(self):
+        cut = self.panel.index[200]
+        self.assertEqual(len(self.panel.loc[self.panel.index <= cut]), 201)
+        self.assertEqual(list(self.panel.iloc[-20:].index), list(self.frame.index[-20:]))
+        with self.assertRaises(TypeError):
+            self.panel.loc[:, 'Close']
+
+    def test_screens_match_frame(self):
+        self.frame.loc[self.frame.index[100:103], ('High', 'T4')] = np.nan
+        panel = Panel.from_yfinance(self.frame)
+
+        pd.testing.assert_frame_equal(history_mask(panel), history_mask(self.frame))
+        self.assertEqual(screen_snapshot(panel), screen_snapshot(self.frame))
+
+        start, end = self.frame.index[212], self.frame.index[-1]
+        pd.testing.assert_frame_equal(screen_history(panel, start, end), screen_history(self.frame, start, end))
+
+class TestDownloadPanel(unittest.TestCase):
+    def test_matches_download_daily(self):
+        with tempfile.TemporaryDirectory() as root:
+            for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+                write_daily(root, ticker, seed=i + 1)
+            write_daily(root, 'NEW', periods=10)
+            provider = LocalProvider(root)
+
+            tickers = ['AAA', 'BBB', 'NEW', 'CCC', 'ZZZ']
+            frames, failed = download_daily(tickers, '2024-01-01', '2024-06-29', batch_size=2, provider=provider)
+            panel, panel_failed = download_panel(tickers, '2024-01-01', '2024-06-29', batch_size=2, provider=provider)
+
+            self.assertEqual(sorted(panel_failed), sorted(failed))
+            self.assertEqual(list(panel.tickers), list(frames))
+            for ticker, df in frames.items():
+                np.testing.assert_array_equal(panel['Close'][ticker].to_numpy(), df['Close'].to_numpy(dtype=np.float32))
+
+            compact = get_daily_data(['AAA', 'BBB'], '2024-06-28', provider=provider, compact=True)
+            self.assertIsInstance(compact, Panel)
+            self.assertEqual(list(compact.tickers), ['AAA', 'BBB'])
+
+    def test_both_downloads_share_the_retry_loop(self):
+        with tempfile.TemporaryDirectory() as root:
+            for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+                write_daily(root, ticker, seed=i + 1)
+
+            counts = []
+            for download in (download_daily, download_panel):
+                metrics = Metrics()
+                result, failed = download(['AAA', 'BBB', 'CCC', 'ZZZ'], '2024-01-01', '2024-06-29', batch_size=2, provider=FlakyProvider(root), metrics=metrics)
+
+                self.assertEqual(failed, ['ZZZ'])
+                self.assertEqual(sorted(result if download is download_daily else result.tickers), ['AAA', 'BBB', 'CCC'])
+                counts.append([
+                    metrics.get('download_batches_total', kind=kind) for kind in ('batch', 'retry')
+                    ] + [metrics.get('download_failed_tickers_total')])
+
+            self.assertEqual(counts[0], counts[1])
+            self.assertEqual(counts[0], [2, 3, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import pandas as pd
+import numpy as np
+from continuation_screener.data.indicators import add_atr, add_emas
+from continuation_screener.simulator.entry_exit import entry, exits
+
+def loop_entry(intraday_df, daily_df):
+    """Bar-by-bar reference of the original entry() loop."""
+    today_date = intraday_df.index[0].normalize()
+    intraday_df = intraday_df[intraday_df.index.normalize() == today_date]
+    if today_date not in daily_df.index:
+        return None, None, None
+    daily_ema9 = daily_df.loc[today_date, 'EMA_9']
+    ema_break = False
+    for time, row in intraday_df.iterrows():
+        ema_touch = abs(row['Low'] - daily_ema9) <= 0.2 * row['ATR_14']
+        if not ema_break:
+            if ema_touch and row['Close'] > daily_ema9:
+                return None, None, None
+            elif row['Close'] < daily_ema9:
+                ema_break = True
+        elif row['Close'] >= daily_ema9:
+            return time, row['Close'], 'reclaim'
+    return None, None, None
+
+def loop_exits(entry_time, entry_price, intraday_df, daily_df, max_hold=8):
+    """Bar-by-bar reference of the original exits() loop."""
+    entry_loc = intraday_df.index.get_loc(entry_time)
+    max_exit_day = entry_time.normalize() + pd.offsets.BDay(max_hold)
+    for time in intraday_df.index[entry_loc + 1:]:
+        row = intraday_df.loc[time]
+        candle_day = time.normalize()
+        if candle_day not in daily_df.index:
+            continue
+        daily_ema9 = daily_df.loc[candle_day, 'EMA_9']
+        if row['Close'] < daily_ema9 - (row['ATR_14'] * 1.5):
+            return time, row['Close'], 'stop'
+        if row['Close'] >= entry_price * (1 + 0.04):
+            return time, row['Close'], 'take_profit'
+        final_candles = intraday_df[intraday_df.index.normalize() == max_exit_day.normalize()]
+        if not final_candles.empty and time == final_candles.index[-1]:
+            return time, row['Close'], 'max_hold_exit'
+    last_time = intraday_df.index[-1]
+    return last_time, intraday_df.loc[last_time, 'Close'], 'max_hold_exit'
+
+def make_case(seed):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2024-03-01', periods=14)
+    daily = pd.DataFrame({'Close': 100 + np.cumsum(rng.normal(0, 1, len(days)))}, index=days)
+    daily['Open'] = daily['High'] = daily['Low'] = daily['Close']
+    daily = add_emas(daily)
+    if seed % 5 == 0:
+        daily = daily.drop(days[6])
+
+    stamps = [d + pd.Timedelta(hours=9, minutes=30 + 15 * k) for d in days[3:] for k in range(26)]
+    ema = daily['EMA_9'].reindex(days).ffill().loc[days[3]]
+    sigma = 0.6 if seed % 3 else 0.05
+    price = ema + np.cumsum(rng.normal(0, sigma, len(stamps))) + rng.normal(0, 1)
+    intraday = pd.DataFrame({
+        'Open': price, 'High': price + 0.3, 'Low': price - rng.uniform(0, 1.5, len(stamps)), 'Close': price,
+    }, index=pd.DatetimeIndex(stamps))
+    return add_atr(intraday), daily
+
+class TestEntryExit(unittest.TestCase):
+    def test_matches_bar_loop(self):
+        entries = 0
+        exit_types = set()
+        for seed in range(120):
+            intraday, daily = make_case(seed)
+
+            expected = loop_entry(intraday, daily)
+            result = entry(intraday, daily)
+            self.assertEqual(result, expected)
+
+            if expected[0] is None:
+                continue
+            entries += 1
+
+            expected_exit = loop_exits(expected[0], expected[1], intraday, daily)
+            self.assertEqual(exits(expected[0], expected[1], intraday, daily), expected_exit)
+            exit_types.add(expected_exit[2])
+
+        self.assertGreater(entries, 20)
+        self.assertEqual(exit_types, {'stop', 'take_profit', 'max_hold_exit'})
+
+    def test_bounce_cancels_entry(self):
+        index = pd.date_range('2024-03-04 09:30', periods=4, freq='15min')
+        intraday = pd.DataFrame({
+            'Low': [100.1, 98.0, 98.0, 99.0],
+            'Close': [101.0, 99.0, 100.5, 101.0],
+            'ATR_14': [1.0] * 4,
+        }, index=index)
+        daily = pd.DataFrame({'EMA_9': [100.0]}, index=pd.DatetimeIndex(['2024-03-04']))
+        self.assertEqual(entry(intraday, daily), (None, None, None))
+
+        intraday.loc[index[0], 'Low'] = 101.0
+        self.assertEqual(entry(intraday, daily), (index[2], 100.5, 'reclaim'))
+
+if __name__ == '__main__':
+    unittest.main()
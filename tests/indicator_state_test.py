@@ -0,0 +1,83 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+from panel_test import make_panel
+from providers_test import write_daily
+from continuation_screener.data.indicators import panel_indicators, wilder_averages
+from continuation_screener.data.indicator_state import IndicatorState, STATE_TAIL, STATE_INDICATORS
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.screener.run_screener import screen_snapshot, run_screener
+
+class TestIndicatorState(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel(periods=300, seed=3)
+        self.state = IndicatorState.from_panel(self.panel.iloc[:250])
+
+    def test_update_matches_full_recompute(self):
+        dropped = self.state.update(self.panel.iloc[249:])
+        self.assertEqual(dropped, [])
+
+        ind = panel_indicators(self.panel)
+        for name in STATE_INDICATORS:
+            np.testing.assert_array_equal(self.state.tail[name], ind[name].to_numpy()[-STATE_TAIL:])
+
+        avg_gain, _ = wilder_averages(self.panel['Close'])
+        np.testing.assert_array_equal(self.state.avg_gain, avg_gain.to_numpy()[-1])
+        self.assertTrue((self.state.n_bars == 300).all())
+
+        tail, tail_ind = self.state.tail_panel()
+        self.assertEqual(
+            screen_snapshot(tail, tail_ind, self.state.valid(self.panel.index[-1])),
+            screen_snapshot(self.panel)
+        )
+
+    def test_adjusted_prices_are_dropped(self):
+        new_bars = self.panel.iloc[249:].copy()
+        new_bars.loc[:, ('Close', 'T2')] *= 0.5
+        new_bars = new_bars.drop(columns='T5', level=1)
+
+        dropped = self.state.update(new_bars)
+
+        self.assertEqual(dropped, ['T2', 'T5'])
+        self.assertNotIn('T2', self.state)
+        self.assertEqual(len(self.state), 10)
+
+    def test_stale(self):
+        last = self.panel.index[249]
+        self.assertFalse(self.state.stale(last + pd.offsets.BDay(5)).any())
+        self.assertTrue(self.state.stale(last + pd.offsets.BDay(6)).all())
+        self.assertTrue(self.state.stale(last - pd.offsets.BDay(1)).all())
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.state.save(root)
+            loaded = IndicatorState.load(root)
+        self.assertEqual(list(loaded.tickers), list(self.state.tickers))
+        np.testing.assert_array_equal(loaded.date, self.state.date)
+        for name, values in self.state.tail.items():
+            np.testing.assert_array_equal(loaded.tail[name], values)
+
+class TestRunScreenerState(unittest.TestCase):
+    def test_second_run_is_incremental(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_daily(root, 'SPY', drift=0.002)
+            for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+                write_daily(root, ticker, seed=i + 1)
+            pd.DataFrame({'Ticker': ['AAA', 'BBB', 'CCC']}).to_csv(os.path.join(root, 'universe.csv'), index=False)
+
+            provider = LocalProvider(root)
+            state_dir = os.path.join(root, 'state')
+
+            run_screener('2024-06-25', provider=provider, state_dir=state_dir)
+            self.assertEqual(len(IndicatorState.load(state_dir)), 3)
+
+            result = run_screener('2024-06-28', provider=provider, state_dir=state_dir)
+            self.assertIsInstance(result, pd.DataFrame)
+
+            state = IndicatorState.load(state_dir)
+            self.assertTrue((state.date == np.datetime64('2024-06-28')).all())
+
+if __name__ == '__main__':
+    unittest.main()
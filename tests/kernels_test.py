@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+from entry_exit_test import make_case
+from panel_test import make_panel
+from continuation_screener.data import kernels
+from continuation_screener.data.indicators import add_emas, add_atr, add_rsi, panel_indicators, ewm_alpha
+from continuation_screener.simulator.backtester_oneday import simulate_trade
+from continuation_screener.simulator.batch import simulate_batch, trade_record
+
+BACKENDS = ['numpy'] + (['numba'] if kernels.numba is not None else [])
+
+def gappy_values(seed=0):
+    rng = np.random.default_rng(seed)
+    values = 50 + rng.standard_normal((300, 12)).cumsum(axis=0)
+    values[5:9, 1] = np.nan
+    values[:40, 2] = np.nan
+    values[100, 3] = np.nan
+    values[-3:, 4] = np.nan
+    values[60:70, 5] = values[59, 5]
+    values[:, 6] = np.nan
+    return values
+
+class TestKernels(unittest.TestCase):
+    def setUp(self):
+        self.backend = kernels.backend()
+
+    def tearDown(self):
+        kernels.set_backend(self.backend)
+
+    def test_ewm_matches_pandas_bit_for_bit(self):
+        values = gappy_values()
+        frame = pd.DataFrame(values)
+        for name in BACKENDS:
+            kernels.set_backend(name)
+            for kwargs in ({'span': 9}, {'span': 200}, {'alpha': 1 / 14}):
+                with self.subTest(backend=name, **kwargs):
+                    expected = frame.ewm(adjust=False, **kwargs).mean().to_numpy()
+                    alpha = ewm_alpha(**kwargs)
+                    np.testing.assert_array_equal(kernels.ewm(values, alpha), expected)
+                    np.testing.assert_array_equal(kernels.ewm(values[:, 0], alpha), expected[:, 0])
+
+    def test_indicators_match_pandas(self):
+        panel = make_panel(n_tickers=6)
+        for name in BACKENDS:
+            kernels.set_backend(name)
+            ind = panel_indicators(panel)
+            for ticker in panel['Close'].columns:
+                df = panel.xs(ticker, axis=1, level=1).copy()
+                close = df['Close']
+                with self.subTest(backend=name, ticker=ticker):
+                    pd.testing.assert_series_equal(ind['EMA_50'][ticker], close.ewm(span=50, adjust=False).mean(), check_names=False, check_exact=True)
+                    df = add_rsi(add_atr(add_emas(df)))
+                    for col in ('EMA_9', 'EMA_200', 'ATR_14', 'RSI_14'):
+                        pd.testing.assert_series_equal(ind[col][ticker], df[col], check_names=False, check_exact=True)
+
+    def test_simulation_matches_across_backends(self):
+        cases = [make_case(seed) for seed in range(60)]
+        tickers = [f'T{seed}' for seed in range(len(cases))]
+        expected = None
+        for name in BACKENDS:
+            kernels.set_backend(name)
+            single = [simulate_trade(t, daily, intraday) for t, (intraday, daily) in zip(tickers, cases)]
+            batch = simulate_batch(tickers, [daily for _, daily in cases], [intraday for intraday, _ in cases])
+            with self.subTest(backend=name):
+                self.assertEqual([trade_record(t) for t in batch], [r for r in single if r is not None])
+                if expected is None:
+                    expected = single
+                self.assertEqual(single, expected)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            kernels.set_backend('fortran')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+from entry_exit_test import make_case
+from continuation_screener.data.indicators import add_ema
+from continuation_screener.data.intraday_bt import prepare_daily, prepare_intraday, INTRADAY_PRELOAD
+from continuation_screener.data.synthetic import SyntheticProvider, synthetic_tickers
+from continuation_screener.simulator.backtester_oneday import backtest_windows, simulate_trade
+from continuation_screener.simulator.live import LiveSignalEngine, replay, replay_frame, read_replay
+
+class TestLiveSignalEngine(unittest.TestCase):
+    def test_replay_matches_simulate_trade(self):
+        cases = [make_case(seed) for seed in range(120)]
+        tickers = [f'T{seed}' for seed in range(len(cases))]
+
+        engine = LiveSignalEngine()
+        for ticker, (_, daily) in zip(tickers, cases):
+            engine.watch(ticker, daily)
+
+        bars = replay_frame({ticker: intraday for ticker, (intraday, _) in zip(tickers, cases)})
+        signals = replay(engine, bars)
+
+        expected = [simulate_trade(t, daily, intraday) for t, (intraday, daily) in zip(tickers, cases)]
+        expected = sorted((r for r in expected if r is not None), key=lambda r: r['Ticker'])
+        trades = sorted(engine.trades, key=lambda r: r['Ticker'])
+
+        self.assertGreater(len(expected), 20)
+        self.assertEqual(trades, expected)
+        self.assertEqual(sum(s['Signal'] == 'entry' for s in signals), len(expected))
+        self.assertEqual(engine.positions, {})
+
+    def test_csv_replay_with_warmup_bars(self):
+        provider = SyntheticProvider(40)
+        eval_date = pd.Timestamp('2024-05-06')
+        (d_start, d_end), (i_start, i_end) = backtest_windows(eval_date)
+
+        engine = LiveSignalEngine()
+        raw, expected = {}, []
+        for ticker in synthetic_tickers(40):
+            daily = prepare_daily(provider.daily([ticker], d_start, d_end))
+            raw[ticker] = provider.intraday(ticker, i_start - INTRADAY_PRELOAD, i_end)
+            engine.watch(ticker, daily, session=eval_date)
+
+            record = simulate_trade(ticker, daily, prepare_intraday(raw[ticker], i_start))
+            if record is not None:
+                expected.append(record)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bars.csv')
+            replay_frame(raw).to_csv(path, index=False)
+            replay(engine, read_replay(path))
+
+        key = lambda r: r['Ticker']
+        self.assertGreater(len(expected), 3)
+        self.assertEqual(sorted(engine.trades, key=key), sorted(expected, key=key))
+
+    def test_provisional_daily_ema_after_the_daily_frame(self):
+        intraday, daily = make_case(1)
+        days = daily.index
+        daily = daily.loc[:days[4]]
+
+        engine = LiveSignalEngine()
+        engine.watch('T', daily, session=days[5])
+
+        bars = intraday.loc[intraday.index.normalize() <= days[6]]
+        for time, row in bars.iterrows():
+            engine.on_bar('T', time, row['High'], row['Low'], row['Close'])
+
+        state = engine.states['T']
+        last_day5 = bars.loc[bars.index.normalize() == days[5], 'Close'].iloc[-1]
+        closes = pd.concat([daily['Close'], pd.Series([last_day5, bars['Close'].iloc[-1]], index=days[5:7])])
+        expected = add_ema(closes.to_frame('Close'), 9)['EMA_9'].iloc[-1]
+
+        self.assertEqual(engine._daily_ema(state, days[6], bars['Close'].iloc[-1]), expected)
+
+    def test_unwatched_tickers_are_ignored(self):
+        engine = LiveSignalEngine()
+        self.assertEqual(engine.on_bar('ZZZ', pd.Timestamp('2024-03-04 09:30'), 1.0, 0.5, 0.8), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import json
+import unittest
+import tempfile
+import pandas as pd
+from continuation_screener.data.regime import regime_mask, clear_regime_cache
+from continuation_screener.data.synthetic import SyntheticProvider
+from continuation_screener.screener.run_screener import run_screener, FAIL_STAGES
+from continuation_screener.utils.metrics import Metrics
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.jsonl = os.path.join(self.tmp.name, 'metrics.jsonl')
+        self.prom = os.path.join(self.tmp.name, 'metrics.prom')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_jsonl(self):
+        with open(self.jsonl) as f:
+            return [json.loads(line) for line in f]
+
+    def test_prometheus_text(self):
+        metrics = Metrics(prom_path=self.prom)
+        metrics.inc('download_batches_total', kind='batch')
+        metrics.inc('download_batches_total', 2, kind='batch')
+        metrics.inc('download_batches_total', kind='retry')
+        metrics.set('filter_tickers_out', 7, stage='vol')
+        metrics.write()
+
+        with open(self.prom) as f:
+            text = f.read()
+
+        self.assertIn('# TYPE continuation_screener_download_batches_total counter', text)
+        self.assertIn('continuation_screener_download_batches_total{run="screener",kind="batch"} 3', text)
+        self.assertIn('continuation_screener_download_batches_total{run="screener",kind="retry"} 1', text)
+        self.assertIn('# TYPE continuation_screener_filter_tickers_out gauge', text)
+        self.assertIn('continuation_screener_filter_tickers_out{run="screener",stage="vol"} 7', text)
+        self.assertEqual(text.count('# TYPE continuation_screener_download_batches_total'), 1)
+
+    def test_repeated_writes_append_only_new_events(self):
+        metrics = Metrics(jsonl_path=self.jsonl)
+        with metrics.stage('download'):
+            pass
+        metrics.write()
+        with metrics.stage('screen'):
+            pass
+        metrics.write()
+
+        records = self.read_jsonl()
+        self.assertEqual([r['event'] for r in records], ['stage', 'summary', 'stage', 'summary'])
+        self.assertEqual([r.get('stage') for r in records if r['event'] == 'stage'], ['download', 'screen'])
+        self.assertIn('stage_seconds{stage="screen"}', records[-1]['metrics'])
+
+    def test_run_screener_records_funnel_and_downloads(self):
+        clear_regime_cache()
+        provider = SyntheticProvider(120)
+        # a regime-on day where one synthetic ticker passes every stage
+        as_of = pd.Timestamp('2024-04-10')
+        self.assertTrue(regime_mask(as_of, as_of, provider=provider).all())
+
+        metrics = Metrics(jsonl_path=self.jsonl, prom_path=self.prom)
+        result = run_screener(as_of, provider=provider, metrics=metrics)
+        self.assertGreater(len(result), 0)
+
+        self.assertEqual(metrics.get('tickers_total'), 120)
+        self.assertEqual(metrics.get('tickers_passed'), len(result))
+        self.assertEqual(metrics.get('download_batches_total', kind='batch'), 1)
+        self.assertEqual(metrics.get('download_tickers_total', status='complete'), 120)
+        self.assertGreater(metrics.get('download_rows_total'), 200)
+        self.assertGreater(metrics.get('download_bytes_total'), 0)
+
+        self.assertEqual(metrics.get('filter_tickers_in', stage='download'), 120)
+        for prev, stage in zip(('download',) + FAIL_STAGES, FAIL_STAGES):
+            self.assertEqual(metrics.get('filter_tickers_in', stage=stage), metrics.get('filter_tickers_out', stage=prev))
+        self.assertEqual(metrics.get('filter_tickers_out', stage='bounce'), len(result))
+
+        stages = [r['stage'] for r in self.read_jsonl() if r['event'] == 'stage']
+        self.assertEqual(stages, ['regime', 'universe', 'download', 'screen'])
+        self.assertTrue(os.path.exists(self.prom))
+
+if __name__ == '__main__':
+    unittest.main()
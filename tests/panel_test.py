@@ -0,0 +1,89 @@
+import unittest
+import pandas as pd
+import numpy as np
+from continuation_screener.data.indicators import add_emas, add_atr, add_rsi, panel_indicators
+from continuation_screener.trend_screener import (
+    stacked_emas, balanced_atr, balanced_rsi, ema_bounce_score, avg_volume, screen_masks
+)
+from continuation_screener.screener.run_screener_bt import screen_history
+
+def make_panel(n_tickers=12, periods=260, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start="2022-01-03", periods=periods, freq="B")
+    frames = []
+    for i in range(n_tickers):
+        drift = rng.uniform(-0.002, 0.006)
+        noise = rng.uniform(0.002, 0.02)
+        close = 40 * np.exp(np.cumsum(drift + noise * rng.standard_normal(periods)))
+        df = pd.DataFrame(index=dates)
+        df['Open'] = close * (1 - rng.uniform(-0.01, 0.01, periods))
+        df['High'] = np.maximum(df['Open'], close) * (1 + rng.uniform(0, 0.02, periods))
+        df['Low'] = np.minimum(df['Open'], close) * (1 - rng.uniform(0, 0.02, periods))
+        df['Close'] = close
+        df['Volume'] = rng.integers(500_000, 3_000_000, periods).astype(float)
+        df.columns = pd.MultiIndex.from_product([df.columns, [f'T{i}']])
+        frames.append(df)
+    return pd.concat(frames, axis=1)
+
+class TestPanelIndicators(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel()
+        self.tickers = self.panel.columns.get_level_values(1).unique()
+
+    def test_indicators_match_per_ticker(self):
+        ind = panel_indicators(self.panel)
+        for ticker in self.tickers:
+            df = self.panel.xs(ticker, axis=1, level=1).copy()
+            df = add_rsi(add_atr(add_emas(df)))
+            for col in ('EMA_9', 'EMA_20', 'EMA_50', 'EMA_200', 'TR', 'ATR_14', 'RSI_14'):
+                pd.testing.assert_series_equal(ind[col][ticker], df[col], check_names=False)
+
+    def test_masks_match_filters(self):
+        masks, scores = screen_masks(self.panel)
+        for cut in (215, 240, 260):
+            for ticker in self.tickers:
+                df = self.panel.xs(ticker, axis=1, level=1).iloc[:cut].copy()
+                day = df.index[-1]
+
+                self.assertEqual(avg_volume(df.copy()) is not None, masks['vol'].loc[day, ticker])
+
+                df = stacked_emas(df.copy(), bt=True)[0]
+                self.assertEqual(stacked_emas(df.copy()) is not None, masks['ema'].loc[day, ticker])
+                self.assertEqual(balanced_atr(df.copy()) is not None, masks['atr'].loc[day, ticker])
+                self.assertEqual(balanced_rsi(df.copy()) is not None, masks['rsi'].loc[day, ticker])
+
+                score = ema_bounce_score(df.copy())
+                self.assertEqual(score is not None, masks['bounce'].loc[day, ticker])
+                if score is not None:
+                    self.assertEqual(score, scores.loc[day, ticker])
+
+class TestScreenHistory(unittest.TestCase):
+    def test_matches_rolling_slices(self):
+        panel = make_panel(seed=11)
+        panel.iloc[230, 3] = np.nan
+        start_day, end_day = panel.index[212], panel.index[-1]
+
+        expected = []
+        for ticker in panel.columns.get_level_values(1).unique():
+            df = panel.xs(ticker, axis=1, level=1)
+            for day in panel.index[212:]:
+                df_slice = df.loc[df.index <= day].tail(300).copy()
+                if len(df_slice) < 210 or df_slice.isna().any().any():
+                    continue
+                if avg_volume(df_slice) is None or stacked_emas(df_slice) is None:
+                    continue
+                if balanced_atr(df_slice) is None or balanced_rsi(df_slice) is None:
+                    continue
+                score = ema_bounce_score(df_slice)
+                if score is not None:
+                    expected.append({'date': day, 'Ticker': ticker, '# of EMA BOUNCES': score})
+
+        expected = pd.DataFrame(expected).sort_values(
+            ['date', '# of EMA BOUNCES'], ascending=[True, False]
+        ).set_index(['date', 'Ticker'])
+
+        result = screen_history(panel, start_day, end_day)
+        pd.testing.assert_frame_equal(result, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import numpy as np
+import pandas as pd
+from panel_test import make_panel
+from continuation_screener.screener.parallel import shard_bounds, screen_parallel
+from continuation_screener.screener.run_screener import screen_snapshot, merge_snapshots
+from continuation_screener.screener.run_screener_bt import screen_history, screen_history_parallel
+
+class TestParallelScreen(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel(n_tickers=30, seed=5)
+        # a gap in one ticker so the NaN counter is exercised
+        self.panel.loc[self.panel.index[200:203], ('Close', 'T4')] = np.nan
+        self.start, self.end = self.panel.index[212], self.panel.index[-1]
+
+    def test_shard_bounds(self):
+        self.assertEqual(shard_bounds(10, 3), [(0, 3), (3, 7), (7, 10)])
+        self.assertEqual(shard_bounds(2, 8), [(0, 1), (1, 2)])
+
+    def test_snapshot_matches_serial(self):
+        expected = screen_snapshot(self.panel)
+        result = merge_snapshots(screen_parallel(self.panel, screen_snapshot, workers=3))
+        self.assertEqual(result, expected)
+        self.assertEqual(result[1]['nan'], 1)
+
+    def test_history_matches_serial(self):
+        expected = screen_history(self.panel, self.start, self.end)
+        result = screen_history_parallel(self.panel, self.start, self.end, workers=3)
+        self.assertIsNotNone(expected)
+        pd.testing.assert_frame_equal(result, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from panel_test import make_panel
+from providers_test import write_daily
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.data.store import BarStore
+from continuation_screener.screener.planner import FilterPlanner, LIQUIDITY_LOOKBACK
+from continuation_screener.screener.run_screener import screen_snapshot, run_screener
+from continuation_screener.utils.metrics import Metrics
+
+class TestFilterPlanner(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel(n_tickers=30, seed=9)
+        self.panel.loc[self.panel.index[100:102], ('Low', 'T7')] = np.nan
+        # keep volume above the liquidity floor so later stages see tickers
+        self.panel.loc[:, 'Volume'] = self.panel['Volume'].to_numpy() * 2
+
+    def test_matches_snapshot(self):
+        expected_strong, expected_fails = screen_snapshot(self.panel)
+        strong, fails = FilterPlanner().run(self.panel)
+
+        self.assertEqual(strong, expected_strong)
+        self.assertEqual(sum(fails.values()), sum(expected_fails.values()))
+        self.assertGreater(fails['ema'] + fails['atr'] + fails['rsi'] + fails['bounce'], 0)
+
+    def test_order_adapts_to_stats(self):
+        planner = FilterPlanner()
+        self.assertEqual(planner.order(), ['ema', 'atr', 'rsi', 'bounce'])
+
+        # (seconds, passed) per 100 tickers evaluated
+        for name, (seconds, passed) in {'ema': (4.0, 20), 'atr': (1.0, 90), 'rsi': (1.0, 10), 'bounce': (0.5, 50)}.items():
+            planner.stats[name] = {'runs': 1, 'evaluated': 100, 'passed': passed, 'seconds': seconds}
+        self.assertEqual(planner.order(), ['bounce', 'rsi', 'ema', 'atr'])
+
+        expected_strong, _ = screen_snapshot(self.panel)
+        strong, fails = planner.run(self.panel)
+        self.assertEqual(strong, expected_strong)
+        self.assertEqual(list(fails), ['vol', 'nan', 'bounce', 'rsi', 'ema', 'atr'])
+
+    def test_gate_on_recent_bars(self):
+        planner = FilterPlanner()
+        survivors, failed = planner.gate(self.panel.iloc[-25:])
+        strong, fails = planner.run(self.panel)
+
+        self.assertEqual(failed, fails['vol'])
+        self.assertTrue({row['Ticker'] for row in strong} <= set(survivors))
+
+    def test_stats_persist(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'planner.json')
+            planner = FilterPlanner(path)
+            planner.run(self.panel)
+            planner.save()
+
+            reloaded = FilterPlanner(path)
+            self.assertEqual(reloaded.stats, planner.stats)
+            self.assertEqual(reloaded.stats['vol']['evaluated'], 30)
+
+class TestPlannedScreen(unittest.TestCase):
+    def test_history_read_only_for_liquid_tickers(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_daily(root, 'SPY', drift=0.002)
+            for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+                write_daily(root, ticker, seed=i + 1)
+
+            thin = write_daily(root, 'DDD', seed=4)
+            thin['Volume'] = 1000
+            thin.to_csv(os.path.join(root, 'daily', 'DDD.csv'))
+
+            pd.DataFrame({'Ticker': ['AAA', 'BBB', 'CCC', 'DDD']}).to_csv(os.path.join(root, 'universe.csv'), index=False)
+
+            store = BarStore(os.path.join(root, 'store'))
+            planner = FilterPlanner(os.path.join(root, 'planner.json'))
+
+            for name in ('ema', 'atr', 'rsi', 'bounce'):
+                planner.stats[name] = {'runs': 1, 'evaluated': 100, 'passed': 50, 'seconds': 4.0 - len(name)}
+            stages = planner.stages()
+            self.assertEqual(stages, ['vol', 'nan', 'bounce', 'ema', 'atr', 'rsi'])
+
+            metrics = Metrics()
+            result = run_screener('2024-06-28', store=store, provider=LocalProvider(root), planner=planner, metrics=metrics)
+
+            # the funnel follows the order the planner ran, not FAIL_STAGES
+            for prev, stage in zip(['download'] + stages, stages):
+                self.assertEqual(metrics.get('filter_tickers_in', stage=stage), metrics.get('filter_tickers_out', stage=prev))
+            self.assertEqual(metrics.get('filter_tickers_out', stage=stages[-1]), len(result))
+
+            as_of = pd.Timestamp('2024-06-28')
+            self.assertEqual(store.coverage('DDD')[0], as_of - pd.Timedelta(days=LIQUIDITY_LOOKBACK))
+            self.assertEqual(planner.stats['vol']['evaluated'], 4)
+            self.assertGreaterEqual(planner.stats['vol']['evaluated'] - planner.stats['vol']['passed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
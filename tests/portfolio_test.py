@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+import pandas as pd
+from continuation_screener.simulator.portfolio import PortfolioSimulator, daily_equity, portfolio_summary
+
+def trade(ticker, entry, exit, entry_price, exit_price):
+    return {
+        'Ticker': ticker,
+        'Entry Time': pd.Timestamp(entry),
+        'Entry Price': entry_price,
+        'Exit Time': pd.Timestamp(exit),
+        'Exit Price': exit_price,
+    }
+
+class TestPortfolioSimulator(unittest.TestCase):
+    def test_limits_and_capital(self):
+        trades = [
+            trade('A', '2024-01-02 10:00', '2024-01-04 10:00', 100, 110),
+            trade('B', '2024-01-02 11:00', '2024-01-05 10:00', 50, 45),
+            # both slots taken
+            trade('C', '2024-01-03 10:00', '2024-01-03 15:00', 10, 11),
+            # A exits at the same time, so its slot is free again
+            trade('D', '2024-01-04 10:00', '2024-01-08 10:00', 20, 22),
+            # B is still held
+            trade('B', '2024-01-04 12:00', '2024-01-09 10:00', 40, 44),
+        ]
+
+        sim = PortfolioSimulator(capital=10_000, max_positions=2, allocation=0.5)
+        fills, equity = sim.run(trades)
+
+        self.assertEqual(fills['Ticker'].tolist(), ['A', 'B', 'D'])
+        self.assertEqual(sim.rejected['Reason'].tolist(), ['max_positions', 'holding'])
+        self.assertEqual(fills['Shares'].tolist(), [50, 100, 262])
+        self.assertEqual(fills['PnL'].tolist(), [500, -500, 524])
+
+        self.assertAlmostEqual(equity['Equity'].iloc[-1], 10_524)
+        self.assertLessEqual(equity['Positions'].max(), 2)
+        self.assertTrue(equity.index.is_monotonic_increasing)
+        self.assertAlmostEqual(equity['Drawdown'].min(), 10_000 / 10_500 - 1)
+
+    def test_cash_is_never_negative(self):
+        rng = np.random.default_rng(0)
+        start = pd.Timestamp('2023-01-02 10:00')
+        trades = []
+        for k in range(2000):
+            entry = start + pd.Timedelta(hours=int(rng.integers(0, 24 * 500)))
+            price = float(rng.uniform(5, 500))
+            trades.append(trade(f'T{k % 300}', entry, entry + pd.Timedelta(days=int(rng.integers(1, 12))), price, price * float(rng.uniform(0.9, 1.1))))
+
+        sim = PortfolioSimulator(capital=50_000, max_positions=8, allocation=0.2)
+        fills, equity = sim.run(trades)
+
+        self.assertEqual(len(fills) + len(sim.rejected), len(trades))
+        self.assertGreaterEqual(equity['Cash'].min(), -1e-6)
+        self.assertLessEqual(equity['Positions'].max(), 8)
+        self.assertAlmostEqual(equity['Equity'].iloc[-1], 50_000 + fills['PnL'].sum(), places=6)
+
+        daily = daily_equity(equity)
+        self.assertFalse(daily.isna().any())
+
+        summary = portfolio_summary(fills, equity, sim.capital, sim.rejected)
+        self.assertEqual(summary.set_index('Metric').loc['Trades Taken', 'Value'], len(fills))
+
+    def test_empty(self):
+        fills, equity = PortfolioSimulator().run([])
+        self.assertTrue(fills.empty)
+        self.assertTrue(portfolio_summary(fills, equity, 100_000).empty)
+
+if __name__ == '__main__':
+    unittest.main()
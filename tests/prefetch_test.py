@@ -0,0 +1,71 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.data.intraday_bt import daily_bt, intraday_bt
+from continuation_screener.simulator.backtester_oneday import backtest_windows
+from continuation_screener.simulator.prefetch import Prefetcher, merge_ranges
+
+def write_fixtures(root, ticker, seed=0):
+    rng = np.random.default_rng(seed)
+
+    days = pd.bdate_range('2024-01-02', '2024-04-30')
+    close = 50 * np.exp(np.cumsum(0.002 + 0.01 * rng.standard_normal(len(days))))
+    daily = pd.DataFrame({
+        'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.985,
+        'Close': close, 'Adj Close': close, 'Volume': 1_000_000,
+    }, index=pd.Index(days, name='Date'))
+    os.makedirs(os.path.join(root, 'daily'), exist_ok=True)
+    daily.to_csv(os.path.join(root, 'daily', f'{ticker}.csv'))
+
+    stamps = [
+        pd.Timestamp(day) + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(minutes=15 * k)
+        for day in days for k in range(26)
+    ]
+    index = pd.DatetimeIndex(stamps).tz_localize('America/New_York')
+    price = 50 * np.exp(np.cumsum(0.002 * rng.standard_normal(len(index))))
+    intraday = pd.DataFrame({
+        'Open': price, 'High': price * 1.002, 'Low': price * 0.998, 'Close': price,
+    }, index=pd.Index(index, name='Datetime'))
+    os.makedirs(os.path.join(root, 'intraday', '15m'), exist_ok=True)
+    intraday.to_csv(os.path.join(root, 'intraday', '15m', f'{ticker}.csv'))
+
+class TestPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        write_fixtures(self.tmp.name, 'AAA', seed=1)
+        write_fixtures(self.tmp.name, 'BBB', seed=2)
+        self.provider = LocalProvider(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merge_ranges(self):
+        self.assertEqual(merge_ranges([(5, 8), (1, 3), (2, 4), (8, 9)]), [(1, 4), (5, 9)])
+
+    def test_matches_per_candidate_downloads(self):
+        days = pd.to_datetime(['2024-03-04', '2024-03-05', '2024-03-06', '2024-04-01'])
+        candidates = [(day, ticker) for day in days for ticker in ('AAA', 'BBB')]
+
+        with Prefetcher(candidates, max_workers=4, provider=self.provider) as prefetcher:
+            for day, ticker in candidates:
+                daily_df, intraday_df = prefetcher.get(ticker, day)
+                (d_start, d_end), (i_start, i_end) = backtest_windows(day)
+
+                pd.testing.assert_frame_equal(daily_df, daily_bt(ticker, d_start, d_end, provider=self.provider))
+                pd.testing.assert_frame_equal(intraday_df, intraday_bt(ticker, i_start, i_end, provider=self.provider))
+
+    def test_release_skipped_candidates(self):
+        day = pd.Timestamp('2024-03-04')
+        candidates = [(day, 'AAA'), (day + pd.Timedelta(days=1), 'AAA'), (day, 'BBB')]
+
+        with Prefetcher(candidates, max_workers=2, provider=self.provider) as prefetcher:
+            prefetcher.get('AAA', day)
+            prefetcher.release('AAA')
+            prefetcher.release('BBB')
+            self.assertEqual(prefetcher._futures, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+import numpy as np
+from continuation_screener.data.providers import MarketDataProvider, LocalProvider, RecordingProvider
+from continuation_screener.screener.run_screener import run_screener
+
+def write_daily(root, ticker, periods=300, drift=0.004, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-06-28', periods=periods)
+    close = 50 * np.exp(np.cumsum(drift + 0.01 * rng.standard_normal(periods)))
+    df = pd.DataFrame({
+        'Open': close * 0.995,
+        'High': close * 1.01,
+        'Low': close * 0.985,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1_000_000, 3_000_000, periods),
+    }, index=pd.Index(dates, name='Date'))
+    os.makedirs(os.path.join(root, 'daily'), exist_ok=True)
+    df.to_csv(os.path.join(root, 'daily', f'{ticker}.csv'))
+    return df
+
+class TestLocalProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        write_daily(self.root, 'SPY', drift=0.002)
+        for i, ticker in enumerate(['AAA', 'BBB', 'CCC']):
+            write_daily(self.root, ticker, seed=i + 1)
+        pd.DataFrame({'Ticker': ['AAA', 'BBB', 'CCC']}).to_csv(os.path.join(self.root, 'universe.csv'), index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incomplete_provider_fails_on_construction(self):
+        class DailyOnly(MarketDataProvider):
+            def daily(self, tickers, start, end, threads=True):
+                return pd.DataFrame()
+
+        with self.assertRaises(TypeError):
+            DailyOnly()
+
+    def test_daily_matches_yfinance_layout(self):
+        provider = LocalProvider(self.root)
+        data = provider.daily(['AAA', 'BBB', 'ZZZ'], '2024-01-01', '2024-02-01')
+        self.assertEqual(list(data.columns.get_level_values(1).unique()), ['AAA', 'BBB'])
+        self.assertEqual(data.xs('AAA', level=1, axis=1).index.max(), pd.Timestamp('2024-01-31'))
+
+    def test_run_screener_offline(self):
+        result = run_screener('2024-06-28', provider=LocalProvider(self.root))
+        self.assertIsInstance(result, pd.DataFrame)
+
+    def test_recording_replays(self):
+        session = os.path.join(self.root, 'session')
+        recorder = RecordingProvider(LocalProvider(self.root), session)
+        recorded = recorder.daily(['AAA'], '2024-03-01', '2024-04-01')
+        recorder.universe()
+
+        replay = LocalProvider(session)
+        pd.testing.assert_frame_equal(
+            replay.daily(['AAA'], '2024-03-01', '2024-04-01'),
+            recorded,
+            check_freq=False, check_index_type=False, check_dtype=False, check_names=False
+        )
+        self.assertEqual(replay.universe(), ['AAA', 'BBB', 'CCC'])
+
+if __name__ == '__main__':
+    unittest.main()
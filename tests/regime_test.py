@@ -0,0 +1,112 @@
+import os
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+from panel_test import make_panel
+from providers_test import write_daily
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.data.store import BarStore
+from continuation_screener.data.regime import regime_from_close, regime_mask, regime_on, clear_regime_cache
+from continuation_screener.screener.run_screener_bt import screen_history
+
+class CountingProvider(LocalProvider):
+    calls = 0
+
+    def daily(self, tickers, start, end, threads=True):
+        self.calls += 1
+        return super().daily(tickers, start, end, threads)
+
+class TestRegime(unittest.TestCase):
+    def setUp(self):
+        clear_regime_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.spy = write_daily(self.root, 'SPY', periods=600, drift=0.0005, seed=3)
+        # a slow cycle so the close crosses its SMA200 inside the tested range
+        self.spy['Close'] = 400 + 60 * np.sin(np.arange(600) / 45)
+        self.spy['Adj Close'] = self.spy['Close']
+        self.spy.to_csv(os.path.join(self.root, 'daily', 'SPY.csv'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        clear_regime_cache()
+
+    def test_from_close(self):
+        close = pd.Series(np.r_[np.linspace(100, 200, 250), np.linspace(200, 120, 50)])
+        mask = regime_from_close(close)
+        self.assertFalse(mask.iloc[:199].any())
+        self.assertTrue(mask.iloc[199:250].all())
+        self.assertFalse(mask.iloc[-1])
+
+    def test_per_day_and_cached(self):
+        provider = CountingProvider(self.root)
+        start, end = self.spy.index[400], self.spy.index[-1]
+
+        mask = regime_mask(start, end, provider=provider)
+        expected = regime_from_close(self.spy['Close']).loc[start:end]
+
+        pd.testing.assert_series_equal(mask, expected, check_names=False, check_freq=False, check_index_type=False)
+        self.assertTrue(mask.any() and not mask.all())
+
+        regime_mask(self.spy.index[450], end, provider=provider)
+        self.assertEqual(regime_on(end, provider=provider), bool(expected.iloc[-1]))
+        self.assertEqual(provider.calls, 1)
+
+    def test_reads_store(self):
+        store = BarStore(os.path.join(self.root, 'store'))
+        start, end = self.spy.index[400], self.spy.index[-1]
+
+        mask = regime_mask(start, end, store=store, provider=LocalProvider(self.root))
+
+        self.assertIn('SPY', store)
+        self.assertEqual(len(mask), len(self.spy.loc[start:end]))
+
+    def test_uses_adjusted_close(self):
+        # unadjusted closes sit above the adjusted ones by the dividends paid since
+        self.spy['Close'] = self.spy['Adj Close'] * 1.005
+        self.spy.to_csv(os.path.join(self.root, 'daily', 'SPY.csv'))
+        start, end = self.spy.index[400], self.spy.index[-1]
+
+        mask = regime_mask(start, end, provider=LocalProvider(self.root))
+        expected = regime_from_close(self.spy['Adj Close']).loc[start:end]
+        pd.testing.assert_series_equal(mask, expected, check_names=False, check_freq=False, check_index_type=False)
+
+    def test_recomputed_once_a_new_session_exists(self):
+        provider = CountingProvider(self.root)
+        today = self.spy.index[-1]
+        full = self.spy
+
+        # at noon the day's bar is not there yet
+        self.spy.iloc[:-1].to_csv(os.path.join(self.root, 'daily', 'SPY.csv'))
+        with mock.patch.object(pd.Timestamp, 'now', return_value=today + pd.Timedelta(hours=12)):
+            self.assertEqual(len(regime_mask(today - pd.Timedelta(days=10), today, provider=provider).loc[today:]), 0)
+
+        full.to_csv(os.path.join(self.root, 'daily', 'SPY.csv'))
+        with mock.patch.object(pd.Timestamp, 'now', return_value=today + pd.Timedelta(hours=17)):
+            self.assertEqual(regime_on(today, provider=provider), bool(regime_from_close(full['Adj Close']).iloc[-1]))
+        self.assertEqual(provider.calls, 2)
+
+        # a historical range that ends on a holiday is not refetched
+        regime_mask(self.spy.index[400], today + pd.Timedelta(days=1), provider=provider)
+        calls = provider.calls
+        regime_mask(self.spy.index[400], today + pd.Timedelta(days=1), provider=provider)
+        self.assertEqual(provider.calls, calls)
+
+class TestScreenRegime(unittest.TestCase):
+    def test_bad_days_pass_nothing(self):
+        panel = make_panel(n_tickers=12, seed=11)
+        start, end = panel.index[212], panel.index[-1]
+        unrestricted = screen_history(panel, start, end)
+
+        regime = pd.Series(True, index=panel.index)
+        bad_day = unrestricted.index.get_level_values('date')[0]
+        regime[bad_day] = False
+
+        restricted = screen_history(panel, start, end, regime=regime)
+        self.assertNotIn(bad_day, restricted.index.get_level_values('date'))
+        self.assertEqual(len(restricted), len(unrestricted) - len(unrestricted.loc[bad_day]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import unittest
+import tempfile
+import pandas as pd
+from continuation_screener.data.store import BarStore
+from continuation_screener.data.synthetic import SyntheticProvider
+from continuation_screener.simulator.run_backtester import run_backtester
+from continuation_screener.simulator.sharded import date_shards, run_backtester_sharded
+
+class TestShardedBacktest(unittest.TestCase):
+    def test_date_shards_cover_range(self):
+        bounds = date_shards('2023-01-02', '2023-12-29', 4)
+        self.assertEqual(len(bounds), 4)
+        self.assertEqual(bounds[0][0], pd.Timestamp('2023-01-02'))
+        self.assertEqual(bounds[-1][1], pd.Timestamp('2023-12-29'))
+        for (_, last), (first, _) in zip(bounds, bounds[1:]):
+            self.assertEqual(first, last + pd.offsets.BDay(1))
+
+        self.assertEqual(len(date_shards('2023-01-02', '2023-01-04', 10)), 3)
+
+    def test_matches_single_run(self):
+        provider = SyntheticProvider(150)
+        start, end = '2023-01-03', '2024-06-28'
+
+        expected, expected_summary = run_backtester(start, end, provider=provider, engine='batch')
+        self.assertFalse(expected.empty)
+
+        for workers in (1, 2):
+            trades, summary = run_backtester_sharded(start, end, shards=3, workers=workers, provider=provider)
+            pd.testing.assert_frame_equal(trades, expected)
+            pd.testing.assert_frame_equal(summary, expected_summary)
+
+    def test_store_refreshed_once_and_read_by_workers(self):
+        provider = SyntheticProvider(150)
+        start, end = '2023-06-01', '2024-06-28'
+
+        expected, expected_summary = run_backtester(start, end, provider=provider, engine='batch')
+        self.assertFalse(expected.empty)
+
+        with tempfile.TemporaryDirectory() as root:
+            store = BarStore(os.path.join(root, 'store'))
+            trades, summary = run_backtester_sharded(start, end, shards=2, workers=2, store=store, provider=provider)
+
+            pd.testing.assert_frame_equal(trades, expected)
+            pd.testing.assert_frame_equal(summary, expected_summary)
+            self.assertIn('SPY', store)
+            self.assertEqual(sorted(os.listdir(store.root)), sorted(store.tickers() + ['manifest.json']))
+
+if __name__ == '__main__':
+    unittest.main()
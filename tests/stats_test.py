@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+import pandas as pd
+from continuation_screener.simulator.stats import (
+    METRICS, trade_metrics, bootstrap_metrics, confidence_intervals, drawdown_distribution, RunningStats, TradeStats
+    )
+
+def sample_trades(n=116, seed=0):
+    rng = np.random.default_rng(seed)
+    wins = rng.random(n) < 0.37
+    returns = np.where(wins, rng.uniform(0.01, 0.06, n), -rng.uniform(0.002, 0.015, n))
+    net = returns * rng.uniform(20, 300, n)
+    return returns, net
+
+class TestStats(unittest.TestCase):
+    def test_point_metrics_match_pandas_summary(self):
+        returns, net = sample_trades()
+        df = pd.DataFrame({'Return %': returns, 'Net': net})
+        years = 3.0
+
+        win_rate = (df['Return %'] > 0).mean()
+        avg_win = df[df['Return %'] > 0]['Return %'].mean()
+        avg_loss = df[df['Return %'] <= 0]['Return %'].mean()
+        expectancy = win_rate * avg_win + (1 - win_rate) * avg_loss
+        profit_factor = df[df['Net'] > 0]['Net'].sum() / abs(df[df['Net'] <= 0]['Net'].sum())
+        trades_yearly = len(df) / years
+        sharpe = (expectancy * trades_yearly - 0.05) / (df['Return %'].std() * np.sqrt(trades_yearly))
+
+        point = trade_metrics(returns, net, years)
+        self.assertAlmostEqual(point['win_rate'], win_rate)
+        self.assertAlmostEqual(point['avg_win'], avg_win)
+        self.assertAlmostEqual(point['avg_loss'], avg_loss)
+        self.assertAlmostEqual(point['expectancy'], expectancy)
+        self.assertAlmostEqual(point['profit_factor'], profit_factor)
+        self.assertAlmostEqual(point['annual_return'], expectancy * trades_yearly)
+        self.assertAlmostEqual(point['sharpe'], sharpe)
+
+        rows = trade_metrics(np.vstack([returns, returns]), np.vstack([net, net]), years)
+        for k in METRICS:
+            self.assertEqual(rows[k].shape, (2,))
+            self.assertAlmostEqual(rows[k][1], point[k])
+
+    def test_bootstrap_is_batched_and_seeded(self):
+        returns, net = sample_trades(39)
+        a = bootstrap_metrics(returns, net, 1.0, resamples=5000, batch=700)
+        b = bootstrap_metrics(returns, net, 1.0, resamples=5000, batch=700)
+        self.assertEqual(len(a['sharpe']), 5000)
+        np.testing.assert_array_equal(a['expectancy'], b['expectancy'])
+
+        ci = confidence_intervals(returns, net, 1.0, resamples=5000)
+        self.assertEqual(list(ci.index), list(METRICS))
+        for k in ('win_rate', 'expectancy', 'sharpe'):
+            self.assertLess(ci.loc[k, 'Low'], ci.loc[k, 'Estimate'])
+            self.assertGreater(ci.loc[k, 'High'], ci.loc[k, 'Estimate'])
+
+        drawdowns = drawdown_distribution(returns, paths=2000, batch=300)
+        self.assertEqual(len(drawdowns), 2000)
+        self.assertTrue((drawdowns <= 0).all())
+        self.assertTrue((drawdowns > -1).all())
+
+    def test_streaming_matches_full_sample(self):
+        returns, net = sample_trades(500, seed=3)
+
+        full = RunningStats().update(returns)
+        self.assertAlmostEqual(full.mean, returns.mean())
+        self.assertAlmostEqual(full.var, returns.var(ddof=1))
+
+        chunks = np.array_split(np.arange(500), 7)
+        left, right = TradeStats(), TradeStats()
+        for k, idx in enumerate(chunks):
+            (left if k % 2 else right).update(returns[idx], net[idx])
+        merged = left.merge(right)
+
+        self.assertEqual(merged.count, 500)
+        expected = trade_metrics(returns, net, 2.0)
+        streamed = merged.metrics(2.0)
+        for k in METRICS:
+            self.assertAlmostEqual(streamed[k], expected[k])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+from unittest import mock
+import pandas as pd
+import numpy as np
+from continuation_screener.data.store import BarStore
+from continuation_screener.data import dailydata
+
+def make_bars(start, periods):
+    dates = pd.bdate_range(start=start, periods=periods)
+    close = np.linspace(50, 60, periods)
+    return pd.DataFrame({
+        'Open': close * 0.99,
+        'High': close * 1.01,
+        'Low': close * 0.98,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': np.full(periods, 1_000_000),
+    }, index=dates)
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BarStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_append(self):
+        bars = make_bars('2024-01-01', 30)
+        self.store.write('AAA', bars.iloc[:20], bars.index[0], bars.index[19])
+        self.store.append('AAA', bars.iloc[18:], bars.index[-1])
+        self.store.save()
+
+        reopened = BarStore(self.tmp.name)
+        self.assertEqual(reopened.high_water_mark('AAA'), bars.index[-1])
+        pd.testing.assert_frame_equal(reopened.read('AAA'), bars, check_names=False, check_freq=False, check_index_type=False)
+
+        window = reopened.read('AAA', bars.index[5], bars.index[9])
+        self.assertEqual(len(window), 5)
+
+    def test_update_store_fetches_only_tail(self):
+        bars = make_bars('2024-01-01', 30)
+        self.store.write('AAA', bars.iloc[:25], bars.index[-1] - pd.Timedelta(days=350), bars.index[24])
+
+        calls = []
+        def fake_download(tickers, start, end, *args, **kwargs):
+            calls.append((list(tickers), start, end))
+            return {t: bars.loc[(bars.index >= start) & (bars.index < end)] for t in tickers}, []
+
+        with mock.patch.object(dailydata, 'download_daily', side_effect=fake_download):
+            panel = dailydata.get_daily_data(['AAA'], bars.index[-1], store=self.store)
+
+        # the tail starts at the last stored bar to check it was not adjusted
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][1], bars.index[24])
+        self.assertEqual(panel['Close']['AAA'].index[-1], bars.index[-1])
+        self.assertEqual(self.store.high_water_mark('AAA'), bars.index[-1])
+
+    def test_adjusted_history_is_downloaded_again(self):
+        bars = make_bars('2024-01-01', 30)
+        start = bars.index[0]
+        self.store.write('AAA', bars.iloc[:25], start, bars.index[24])
+
+        # a 2:1 split restates every past bar
+        split = bars.copy()
+        split[['Open', 'High', 'Low', 'Close', 'Adj Close']] /= 2
+
+        calls = []
+        def fake_download(tickers, start, end, *args, **kwargs):
+            calls.append((list(tickers), start, end))
+            return {t: split.loc[(split.index >= start) & (split.index < end)] for t in tickers}, []
+
+        with mock.patch.object(dailydata, 'download_daily', side_effect=fake_download):
+            failed = dailydata.update_store(self.store, ['AAA'], start, bars.index[-1])
+
+        self.assertEqual(failed, [])
+        self.assertEqual([c[1] for c in calls], [bars.index[24], start])
+        self.assertEqual(self.store.coverage('AAA'), (start, bars.index[-1]))
+        np.testing.assert_allclose(self.store.read('AAA')['Close'], split['Close'])
+
+    def test_holiday_tail_is_up_to_date(self):
+        bars = make_bars('2024-03-25', 4)
+        self.store.write('AAA', bars, bars.index[0], bars.index[-1])
+
+        # Good Friday 2024-03-29: only the overlapping bar comes back
+        def fake_download(tickers, start, end, *args, **kwargs):
+            return {t: bars.loc[(bars.index >= start) & (bars.index < end)] for t in tickers}, []
+
+        with mock.patch.object(dailydata, 'download_daily', side_effect=fake_download) as download:
+            failed = dailydata.update_store(self.store, ['AAA'], bars.index[0], pd.Timestamp('2024-03-29'))
+            self.assertEqual(failed, [])
+            self.assertEqual(self.store.high_water_mark('AAA'), pd.Timestamp('2024-03-29'))
+
+            dailydata.update_store(self.store, ['AAA'], bars.index[0], pd.Timestamp('2024-03-29'))
+            self.assertEqual(download.call_count, 1)
+
+        pd.testing.assert_frame_equal(self.store.read('AAA'), bars, check_names=False, check_freq=False, check_index_type=False)
+
+    def test_readonly_store_never_fetches(self):
+        bars = make_bars('2024-01-01', 30)
+        self.store.write('AAA', bars.iloc[:25], bars.index[0], bars.index[24])
+        self.store.save()
+
+        readonly = BarStore(self.tmp.name, readonly=True)
+        with mock.patch.object(dailydata, 'download_daily') as download:
+            failed = dailydata.update_store(readonly, ['AAA', 'BBB'], bars.index[0], bars.index[-1])
+            self.assertEqual(dailydata.update_store(readonly, ['AAA'], bars.index[0], bars.index[24]), [])
+
+        download.assert_not_called()
+        self.assertEqual(sorted(failed), ['AAA', 'BBB'])
+        with self.assertRaises(ValueError):
+            readonly.write('AAA', bars, bars.index[0], bars.index[-1])
+        with self.assertRaises(ValueError):
+            readonly.save()
+
+if __name__ == '__main__':
+    unittest.main()
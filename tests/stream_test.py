@@ -0,0 +1,65 @@
+import io
+import os
+import contextlib
+import unittest
+import tempfile
+import pandas as pd
+from providers_test import write_daily
+from continuation_screener.data.dailydata import get_daily_data, iter_daily_data
+from continuation_screener.data.providers import LocalProvider
+from continuation_screener.screener.run_screener import run_screener
+
+TICKERS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+
+class FailingProvider(LocalProvider):
+    def daily(self, tickers, start, end, threads=True):
+        raise RuntimeError('connection reset')
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        write_daily(self.root, 'SPY', drift=0.002)
+        for i, ticker in enumerate(TICKERS):
+            write_daily(self.root, ticker, seed=i + 1, drift=0.001 * i)
+        pd.DataFrame({'Ticker': TICKERS}).to_csv(os.path.join(self.root, 'universe.csv'), index=False)
+        self.provider = LocalProvider(self.root)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batches_join_to_full_panel(self):
+        batches = list(iter_daily_data(TICKERS, '2024-06-28', batch_size=2, provider=self.provider))
+        self.assertEqual([len(b.columns.get_level_values(1).unique()) for b in batches], [2, 2, 1])
+
+        full = get_daily_data(TICKERS, '2024-06-28', provider=self.provider)
+        pd.testing.assert_frame_equal(pd.concat(batches, axis=1), full)
+
+    def test_lookback_matches_batch_mode(self):
+        batches = list(iter_daily_data(TICKERS, '2024-06-28', batch_size=2, provider=self.provider, lookback=120))
+        full = get_daily_data(TICKERS, '2024-06-28', provider=self.provider, lookback=120)
+        pd.testing.assert_frame_equal(pd.concat(batches, axis=1), full)
+        self.assertGreaterEqual(full.index[0], pd.Timestamp('2024-06-28') - pd.Timedelta(days=120))
+
+    def test_early_exit(self):
+        for batch in iter_daily_data(TICKERS, '2024-06-28', batch_size=1, prefetch=1, provider=self.provider):
+            break
+        self.assertEqual(list(batch.columns.get_level_values(1).unique()), ['AAA'])
+
+    def test_errors_propagate(self):
+        with self.assertRaises(RuntimeError):
+            list(iter_daily_data(TICKERS, '2024-06-28', provider=FailingProvider(self.root)))
+
+    def test_screener_matches_batch_mode(self):
+        outputs = []
+        for stream in (False, True):
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
+                result = run_screener('2024-06-28', provider=self.provider, stream=stream)
+            outputs.append((result, [line for line in buf.getvalue().splitlines() if line.startswith('FAIL')]))
+
+        pd.testing.assert_frame_equal(outputs[1][0], outputs[0][0])
+        self.assertEqual(outputs[1][1], outputs[0][1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from panel_test import make_panel
+from continuation_screener.screener.run_screener_bt import screen_history
+from continuation_screener.screener.sweep import sweep
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.panel = make_panel(seed=11)
+        self.start, self.end = self.panel.index[212], self.panel.index[-1]
+
+    def test_defaults_match_screen_history(self):
+        result = sweep(self.panel, {'cushion': [0.005]}, self.start, self.end, processes=1)
+        expected = screen_history(self.panel, self.start, self.end)
+        self.assertEqual(result.loc[0, 'candidates'], len(expected))
+        self.assertEqual(result.loc[0, 'tickers'], expected.index.get_level_values('Ticker').nunique())
+
+    def test_grid_in_process_pool(self):
+        grid = {'min_price': [10.0, 20.0, 40.0], 'high_rsi': [70, 78], 'cushion': [0.005, 0.01]}
+        inline = sweep(self.panel, grid, self.start, self.end, processes=1)
+        pooled = sweep(self.panel, grid, self.start, self.end, processes=2, chunk_size=4)
+
+        self.assertEqual(len(inline), 12)
+        self.assertTrue(inline.equals(pooled))
+
+        by_price = inline.groupby('min_price')['candidates'].sum()
+        self.assertTrue(by_price.is_monotonic_decreasing)
+
+    def test_unknown_parameter(self):
+        with self.assertRaises(ValueError):
+            sweep(self.panel, {'period': [7]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+import pandas as pd
+from continuation_screener.data.panel import Panel
+from continuation_screener.data.synthetic import SyntheticProvider, synthetic_daily, synthetic_intraday, synthetic_tickers
+from continuation_screener.data.dailydata import get_daily_data
+from continuation_screener.screener.run_screener import screen_snapshot
+
+class TestSynthetic(unittest.TestCase):
+    def test_daily_is_deterministic_and_window_independent(self):
+        full = synthetic_daily(20, '2023-01-01', '2024-07-01', seed=3)
+        again = synthetic_daily(20, '2023-01-01', '2024-07-01', seed=3)
+        window = synthetic_daily(['S00004', 'S00011'], '2024-02-01', '2024-03-01', seed=3)
+
+        self.assertEqual(full.shape, (len(pd.bdate_range('2023-01-02', '2024-06-28')), 6 * 20))
+        pd.testing.assert_frame_equal(full, again)
+        expected = full.loc['2024-02-01':'2024-02-29'].reindex(columns=window.columns)
+        pd.testing.assert_frame_equal(window, expected, check_freq=False)
+        self.assertFalse(full.equals(synthetic_daily(20, '2023-01-01', '2024-07-01', seed=4)))
+
+        close, high, low = full['Close'], full['High'], full['Low']
+        self.assertTrue(((low <= close) & (close <= high) & (low > 0)).all().all())
+
+    def test_compact_matches_wide(self):
+        wide = synthetic_daily(8, '2024-01-01', '2024-04-01')
+        compact = synthetic_daily(8, '2024-01-01', '2024-04-01', compact=True)
+
+        self.assertIsInstance(compact, Panel)
+        np.testing.assert_allclose(compact['Close'].to_numpy(), wide['Close'].to_numpy(), rtol=1e-6)
+
+    def test_intraday_sessions_stay_inside_the_daily_bar(self):
+        bars = synthetic_intraday('S00002', '2024-03-04', '2024-03-09')
+        daily = synthetic_daily(['S00002'], '2024-03-04', '2024-03-09').xs('S00002', axis=1, level=1)
+
+        self.assertEqual(len(bars), 5 * 26)
+        self.assertEqual(str(bars.index.tz), 'America/New_York')
+
+        by_day = bars.groupby(bars.index.tz_localize(None).normalize())
+        np.testing.assert_allclose(by_day['Close'].last().to_numpy(), daily['Close'].to_numpy())
+        self.assertTrue((by_day['High'].max().to_numpy() <= daily['High'].to_numpy() + 1e-9).all())
+        self.assertTrue((by_day['Low'].min().to_numpy() >= daily['Low'].to_numpy() - 1e-9).all())
+
+    def test_provider_feeds_the_screener_offline(self):
+        provider = SyntheticProvider(300)
+        self.assertEqual(provider.universe(), synthetic_tickers(300))
+
+        raw = get_daily_data(provider.universe(), '2024-06-28', provider=provider)
+        strong, fails = screen_snapshot(raw)
+
+        self.assertEqual(len(raw.columns.get_level_values(1).unique()), 300)
+        self.assertEqual(sum(fails.values()) + len(strong), 300)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+from continuation_screener.simulator.run_backtester import collect_trades
+from continuation_screener.simulator.trade_store import TradeStore
+
+RESULTS = os.path.join(os.path.dirname(__file__), '..', 'backtest_results')
+TRADES = os.path.join(RESULTS, 'backtest_trades_2023_to_2026.csv')
+SUMMARY = os.path.join(RESULTS, 'backtest_summary_2023_to_2026.csv')
+
+class TestTradeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = TradeStore(self.tmp.name)
+        self.run = self.store.import_csv(TRADES, SUMMARY)
+
+        self.csv = pd.read_csv(TRADES, parse_dates=['Entry Time', 'Exit Time'])
+        self.csv = self.csv.sort_values('Entry Time', kind='stable').reset_index(drop=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(self.run, '2023_to_2026')
+        self.assertEqual(self.store.runs(), ['2023_to_2026'])
+        self.assertGreater(len(self.store.months()), 12)
+
+        store = TradeStore(self.tmp.name)
+        trades = store.query()
+
+        self.assertEqual(len(trades), len(self.csv))
+        self.assertIsInstance(trades['Ticker'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(trades['Exit Type'].dtype, pd.CategoricalDtype)
+        self.assertEqual(trades['Entry Time'].dtype, np.dtype('datetime64[ns]'))
+
+        for column in self.csv.columns:
+            expected = self.csv[column]
+            if expected.dtype == object:
+                self.assertEqual(trades[column].astype(str).tolist(), expected.tolist())
+            else:
+                np.testing.assert_array_equal(trades[column].to_numpy(), expected.to_numpy())
+
+        summary = store.summary(self.run)
+        self.assertEqual(summary.loc[summary['Metric'] == 'Total Trades', 'Value'].item(), '116')
+
+    def test_query_and_aggregate(self):
+        trades = self.store.query(start='2024-01-01', end='2024-06-30', exit_types=['stop'], columns=['Ticker', 'Entry Time', 'Net'])
+        expected = self.csv[
+            (self.csv['Entry Time'] >= '2024-01-01') & (self.csv['Entry Time'] < '2024-07-01') & (self.csv['Exit Type'] == 'stop')
+            ]
+
+        self.assertEqual(list(trades.columns), ['Ticker', 'Entry Time', 'Net'])
+        self.assertEqual(trades['Ticker'].astype(str).tolist(), expected['Ticker'].tolist())
+        np.testing.assert_allclose(trades['Net'], expected['Net'])
+
+        ticker = self.csv['Ticker'].iloc[0]
+        self.assertEqual(len(self.store.query(tickers=ticker)), (self.csv['Ticker'] == ticker).sum())
+        self.assertTrue(self.store.query(tickers='NOPE').empty)
+
+        by_exit = self.store.aggregate('exit_type')
+        grouped = self.csv.groupby('Exit Type')
+        self.assertEqual(by_exit['Trades'].to_dict(), grouped.size().to_dict())
+        np.testing.assert_allclose(by_exit['Net'].rename(index=str).sort_index(), grouped['Net'].sum().sort_index())
+
+        by_month = self.store.aggregate('month', start='2023-01-01', end='2023-12-31')
+        self.assertEqual(by_month['Trades'].sum(), (self.csv['Entry Time'].dt.year == 2023).sum())
+
+        with self.assertRaises(ValueError):
+            self.store.aggregate('weekday')
+
+    def test_rewriting_a_run_replaces_its_rows(self):
+        self.store.import_csv(os.path.join(RESULTS, 'backtest_trades_2025_to_2026.csv'))
+        total = len(self.store.query())
+
+        self.store.write(self.csv.head(10), self.run)
+
+        self.assertEqual(len(self.store.query(runs=self.run)), 10)
+        self.assertEqual(len(self.store.query()), total - len(self.csv) + 10)
+        self.assertIsNone(self.store.summary(self.run))
+
+    def test_crash_before_manifest_keeps_previous_state(self):
+        before = self.store.query()
+        trades = self.csv.head(10).copy()
+        trades['Ticker'] = 'NEW'
+
+        with mock.patch.object(TradeStore, 'save', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.store.write(trades, self.run)
+
+        reopened = TradeStore(self.tmp.name)
+        pd.testing.assert_frame_equal(reopened.query(), before)
+
+        reopened.write(trades, self.run)
+        self.assertEqual(reopened.query()['Ticker'].astype(str).unique().tolist(), ['NEW'])
+        self.assertEqual(len(TradeStore(self.tmp.name).query()), 10)
+
+    def test_collect_trades_adds_hold_time(self):
+        day = pd.Timestamp('2024-01-02')
+        record = {
+            'Ticker': 'A', 'Entry Time': pd.Timestamp('2024-01-02 10:00'), 'Entry Price': 10.,
+            'Entry Method': 'reclaim', 'Exit Time': pd.Timestamp('2024-01-03 16:00'), 'Exit Price': 11.,
+            'Exit Type': 'take_profit', 'Net': 1.,
+        }
+        trades = collect_trades([(day, 'A')], lambda i, day, ticker: dict(record))
+        self.assertAlmostEqual(trades[0]['Hold_Time'], 1.25)
+
+    def test_collect_trades_reports_skipped_candidates(self):
+        day = pd.Timestamp('2024-01-02')
+        record = {
+            'Ticker': 'GOOG', 'Entry Time': pd.Timestamp('2024-01-02 10:00'), 'Entry Price': 10.,
+            'Exit Time': pd.Timestamp('2024-01-03 16:00'), 'Exit Price': 11.,
+        }
+        skipped = []
+        trades = collect_trades(
+            [(day, 'GOOG'), (day, 'GOOGL')],
+            lambda i, day, ticker: dict(record),
+            lambda i, day, ticker: skipped.append(ticker)
+            )
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(skipped, ['GOOGL'])
+
+if __name__ == '__main__':
+    unittest.main()
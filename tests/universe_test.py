@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+import pandas as pd
+from panel_test import make_panel
+from continuation_screener.utils.get_iwv import parse_iwv_holdings
+from continuation_screener.utils.universe import UniverseStore
+from continuation_screener.screener.run_screener_bt import screen_history
+
+HOLDINGS = """iShares Russell 3000 ETF
+Fund Holdings as of,"Jun 28, 2024"
+
+Ticker,Name,Sector
+AAPL,APPLE INC,Information Technology
+BRK.B,BERKSHIRE HATHAWAY INC CLASS B,Financials
+,US DOLLAR,Cash
+"""
+
+class FakeFetch:
+    def __init__(self, snapshots=None, fail=False):
+        self.snapshots = snapshots or {}
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, as_of_date=None):
+        self.calls.append(as_of_date)
+        if self.fail:
+            raise ConnectionError('offline')
+        return self.snapshots.get(as_of_date, ['AAA', 'BBB'])
+
+class TestUniverseStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_holdings(self):
+        self.assertEqual(parse_iwv_holdings(HOLDINGS), ['AAPL', 'BRK.B'])
+        with self.assertRaises(ValueError):
+            parse_iwv_holdings('<html>maintenance</html>')
+
+    def test_current_respects_ttl(self):
+        fetch = FakeFetch()
+        self.assertEqual(UniverseStore(self.root, fetch=fetch).current(), ['AAA', 'BBB'])
+        self.assertEqual(UniverseStore(self.root, fetch=fetch).current(), ['AAA', 'BBB'])
+        self.assertEqual(len(fetch.calls), 1)
+
+        UniverseStore(self.root, ttl=pd.Timedelta(0), fetch=fetch).current()
+        self.assertEqual(len(fetch.calls), 2)
+
+    def test_failed_fetch_falls_back_or_raises(self):
+        with self.assertRaises(RuntimeError):
+            UniverseStore(self.root, fetch=FakeFetch(fail=True)).current()
+
+        with self.assertRaises(RuntimeError):
+            UniverseStore(self.root, fetch=lambda as_of_date=None: []).current()
+
+        UniverseStore(self.root, fetch=FakeFetch()).current()
+        stale = UniverseStore(self.root, ttl=pd.Timedelta(0), fetch=FakeFetch(fail=True))
+        self.assertEqual(stale.current(), ['AAA', 'BBB'])
+
+    def test_point_in_time(self):
+        fetch = FakeFetch({pd.Timestamp('2024-03-20'): ['AAA', 'CCC']})
+        store = UniverseStore(self.root, fetch=fetch)
+        store.write('2024-01-31', ['AAA', 'BBB'])
+
+        self.assertEqual(store.as_of('2024-02-15'), ['AAA', 'BBB'])
+        self.assertEqual(fetch.calls, [])
+
+        self.assertEqual(store.as_of('2024-03-20'), ['AAA', 'CCC'])
+        self.assertEqual(fetch.calls, [pd.Timestamp('2024-03-20')])
+
+        with self.assertRaises(RuntimeError):
+            UniverseStore(self.root, fetch=FakeFetch(fail=True)).as_of('2023-12-29')
+
+        members = store.membership(['2024-02-15', '2024-03-21'])
+        self.assertEqual(list(members.columns), ['AAA', 'BBB', 'CCC'])
+        self.assertEqual(members.values.tolist(), [[True, True, False], [True, False, True]])
+
+class TestScreenMembership(unittest.TestCase):
+    def test_excludes_non_members(self):
+        panel = make_panel(n_tickers=12, seed=11)
+        start, end = panel.index[212], panel.index[-1]
+        unrestricted = screen_history(panel, start, end)
+
+        tickers = panel.columns.get_level_values(1).unique()
+        membership = pd.DataFrame(True, index=panel.index, columns=tickers)
+        dropped = unrestricted.index.get_level_values('Ticker')[0]
+        membership.loc[:, dropped] = False
+
+        restricted = screen_history(panel, start, end, membership=membership)
+        self.assertNotIn(dropped, restricted.index.get_level_values('Ticker'))
+        self.assertEqual(len(restricted), len(unrestricted) - (unrestricted.index.get_level_values('Ticker') == dropped).sum())
+
+if __name__ == '__main__':
+    unittest.main()